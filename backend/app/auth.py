@@ -1,5 +1,9 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Dict, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+import asyncio
+import threading
+import time
 import jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
@@ -13,9 +17,25 @@ SECRET_KEY = os.getenv("SECRET_KEY", "tu-clave-secreta-muy-segura-cambiar-en-pro
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 
+# Pool acotado para bcrypt: hilos del pool (bcrypt libera el GIL) y máximo de tareas en cola
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", os.cpu_count() or 2))
+HASH_MAX_PENDIENTES = int(os.getenv("HASH_MAX_PENDIENTES", 64))
+HASH_RETRY_AFTER = int(os.getenv("HASH_RETRY_AFTER", 2))
+
 # Contexto para hash de contraseñas
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+_hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_lock = threading.Lock()
+_hash_metricas = {
+    "pendientes": 0,
+    "en_ejecucion": 0,
+    "completadas": 0,
+    "rechazadas": 0,
+    "tiempo_total_ms": 0.0,
+    "tiempo_max_ms": 0.0,
+}
+
 
 def hash_password(password: str) -> str:
     """Hashear contraseña"""
@@ -27,6 +47,77 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def _ejecutar_medido(operacion: Callable, *args):
+    """Ejecutar una operación bcrypt dentro del pool registrando su duración"""
+    with _hash_lock:
+        _hash_metricas["pendientes"] -= 1
+        _hash_metricas["en_ejecucion"] += 1
+
+    inicio = time.perf_counter()
+    try:
+        return operacion(*args)
+    finally:
+        duracion_ms = (time.perf_counter() - inicio) * 1000
+        with _hash_lock:
+            _hash_metricas["en_ejecucion"] -= 1
+            _hash_metricas["completadas"] += 1
+            _hash_metricas["tiempo_total_ms"] += duracion_ms
+            _hash_metricas["tiempo_max_ms"] = max(_hash_metricas["tiempo_max_ms"], duracion_ms)
+
+
+def _al_terminar(futuro: Future) -> None:
+    """Descontar tareas canceladas antes de empezar (cliente desconectado)"""
+    if futuro.cancelled():
+        with _hash_lock:
+            _hash_metricas["pendientes"] -= 1
+
+
+async def _en_pool_hash(operacion: Callable, *args):
+    """
+    Encolar una operación bcrypt en el pool acotado
+    
+    Raises:
+        HTTPException: 503 con Retry-After si la cola está llena
+    """
+    with _hash_lock:
+        if _hash_metricas["pendientes"] >= HASH_MAX_PENDIENTES:
+            _hash_metricas["rechazadas"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servicio de autenticación saturado, reintentar en unos segundos",
+                headers={"Retry-After": str(HASH_RETRY_AFTER)},
+            )
+        _hash_metricas["pendientes"] += 1
+
+    futuro = _hash_executor.submit(_ejecutar_medido, operacion, *args)
+    futuro.add_done_callback(_al_terminar)
+    return await asyncio.wrap_future(futuro)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hashear contraseña en el pool de bcrypt"""
+    return await _en_pool_hash(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verificar contraseña en el pool de bcrypt"""
+    return await _en_pool_hash(verify_password, plain_password, hashed_password)
+
+
+def obtener_metricas_hash() -> dict:
+    """Métricas del pool de bcrypt: profundidad de cola y tiempos de hash"""
+    with _hash_lock:
+        metricas = dict(_hash_metricas)
+
+    completadas = metricas["completadas"]
+    metricas["tiempo_promedio_ms"] = (
+        metricas["tiempo_total_ms"] / completadas if completadas else 0.0
+    )
+    metricas["workers"] = HASH_WORKERS
+    metricas["max_pendientes"] = HASH_MAX_PENDIENTES
+    return metricas
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Crear JWT token
@@ -45,7 +136,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    # iat con fracción de segundo para compararlo con las revocaciones
+    to_encode.update({"exp": expire, "iat": time.time()})
     
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
@@ -66,7 +158,7 @@ def verify_token(token: str) -> dict:
     """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = payload.get("sub")
+        user_id: str = payload.get("sub")
         user_email: str = payload.get("email")
         user_rol: str = payload.get("rol")
         
@@ -78,9 +170,13 @@ def verify_token(token: str) -> dict:
             )
         
         return {
-            "user_id": user_id,
+            "user_id": int(user_id),
             "email": user_email,
-            "rol": user_rol
+            "rol": user_rol,
+            "nombre": payload.get("nombre"),
+            "fecha_creacion": payload.get("fecha_creacion"),
+            "fecha_actualizacion": payload.get("fecha_actualizacion"),
+            "iat": payload.get("iat")
         }
     
     except jwt.ExpiredSignatureError:
@@ -96,3 +192,34 @@ def verify_token(token: str) -> dict:
             detail="Token inválido",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+
+# ==================== REVOCACIÓN DE TOKENS ====================
+
+# usuario_id -> instante de revocación; los tokens emitidos antes quedan invalidados.
+# Es un registro en memoria por proceso: con varios workers cada uno mantiene el suyo.
+_revocaciones: Dict[int, float] = {}
+_revocaciones_lock = threading.Lock()
+
+
+def revocar_tokens_usuario(usuario_id: int) -> None:
+    """Invalidar los tokens emitidos hasta ahora para un usuario"""
+    ahora = time.time()
+    limite = ahora - ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+    with _revocaciones_lock:
+        # Las revocaciones más viejas que la vida de un token ya no afectan a nadie
+        for uid in [uid for uid, instante in _revocaciones.items() if instante < limite]:
+            del _revocaciones[uid]
+        _revocaciones[usuario_id] = ahora
+
+
+def token_revocado(usuario_id: int, emitido_en: Optional[float]) -> bool:
+    """Verificar si un token emitido en `emitido_en` fue revocado"""
+    with _revocaciones_lock:
+        revocado_en = _revocaciones.get(usuario_id)
+
+    if revocado_en is None:
+        return False
+
+    return emitido_en is None or emitido_en <= revocado_en
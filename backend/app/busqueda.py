@@ -0,0 +1,96 @@
+"""
+Búsqueda de texto en equipos e intervenciones, ordenada por relevancia
+- PostgreSQL: tsvector ponderado con índice GIN (models.documento_busqueda), ts_rank
+- SQLite: tablas FTS5 mantenidas por triggers (models.sentencias_fts), bm25
+Paginación keyset sobre (puntaje, id): el cursor es el puntaje y el id del último resultado
+"""
+
+import re
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import Float, and_, cast, column, func, literal_column, or_, table
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Peso de cada letra de COLUMNAS_BUSQUEDA en bm25 (SQLite); en PostgreSQL los aplica ts_rank
+_PESOS_BM25 = {"A": 4.0, "B": 2.0, "C": 1.0}
+
+# (entidad, puntaje): mayor puntaje = más relevante
+Resultado = Tuple[object, float]
+
+
+def terminos(texto: str) -> List[str]:
+    """Palabras de la búsqueda, sin operadores ni signos"""
+    return re.findall(r"\w+", texto.lower())
+
+
+def _indice_busqueda(modelo):
+    """Expresión tsvector del índice GIN de la tabla (la consulta debe ser idéntica para usarlo)"""
+    return models.documento_busqueda(modelo.__table__)
+
+
+def _buscar(
+    db: Session,
+    modelo,
+    texto: str,
+    limit: int,
+    cursor: Optional[Tuple[float, int]],
+    filtros: Sequence = ()
+) -> List[Resultado]:
+    palabras = terminos(texto)
+    if not palabras:
+        return []
+
+    tabla = modelo.__table__
+    if db.get_bind().dialect.name == "postgresql":
+        consulta_ts = func.plainto_tsquery(
+            literal_column(f"'{models.BUSQUEDA_IDIOMA}'::regconfig"), " ".join(palabras)
+        )
+        documento = _indice_busqueda(modelo)
+        # float8: el cursor vuelve con el valor exacto para la comparación keyset
+        puntaje = cast(func.ts_rank(documento, consulta_ts), Float)
+        query = db.query(modelo, puntaje.label("puntaje")).filter(documento.op("@@")(consulta_ts))
+    else:
+        fts = table(f"{tabla.name}_fts", column("rowid"))
+        pesos = [_PESOS_BM25[peso] for _, peso in models.COLUMNAS_BUSQUEDA[tabla.name]]
+        # Cada palabra como prefijo: "rodamiento" encuentra "rodamientos" (sin stemming en FTS5)
+        expresion = " ".join(f'"{palabra}"*' for palabra in palabras)
+        puntaje = -func.bm25(literal_column(fts.name), *pesos)
+        query = (
+            db.query(modelo, puntaje.label("puntaje"))
+            .join(fts, fts.c.rowid == modelo.id)
+            .filter(literal_column(fts.name).op("MATCH")(expresion))
+        )
+
+    query = query.filter(*filtros)
+    if cursor is not None:
+        ultimo_puntaje, ultimo_id = cursor
+        query = query.filter(or_(
+            puntaje < ultimo_puntaje,
+            and_(puntaje == ultimo_puntaje, modelo.id > ultimo_id)
+        ))
+
+    return [tuple(fila) for fila in query.order_by(literal_column("puntaje").desc(), modelo.id).limit(limit).all()]
+
+
+def buscar_equipos(
+    db: Session,
+    texto: str,
+    limit: int = 20,
+    cursor: Optional[Tuple[float, int]] = None
+) -> List[Resultado]:
+    """Equipos activos cuyo nombre, modelo, serie, fabricante o descripción contienen las palabras"""
+    return _buscar(db, models.Equipo, texto, limit, cursor, [models.Equipo.activo == True])
+
+
+def buscar_intervenciones(
+    db: Session,
+    texto: str,
+    limit: int = 20,
+    cursor: Optional[Tuple[float, int]] = None,
+    equipo_id: Optional[int] = None
+) -> List[Resultado]:
+    """Intervenciones cuya descripción u observaciones contienen las palabras"""
+    filtros = [models.Intervencion.equipo_id == equipo_id] if equipo_id is not None else []
+    return _buscar(db, models.Intervencion, texto, limit, cursor, filtros)
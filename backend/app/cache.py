@@ -0,0 +1,158 @@
+"""
+Caches en memoria del proceso y sobre Redis
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class CacheTTL:
+    """
+    Cache con expiración (TTL) y desalojo LRU, segura entre hilos
+
+    Args:
+        max_entradas: Cantidad máxima de entradas (tope de memoria)
+        ttl_segundos: Vida de cada entrada, None para no expirar
+    """
+
+    def __init__(self, max_entradas: int = 1024, ttl_segundos: Optional[float] = 30.0):
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self._datos: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.expiraciones = 0
+        self.invalidaciones = 0
+
+    def obtener(self, clave: Hashable) -> Optional[Any]:
+        """Obtener un valor vigente, None si no existe o expiró"""
+        with self._lock:
+            entrada = self._datos.get(clave)
+
+            if entrada is None:
+                self.fallos += 1
+                return None
+
+            expira_en, valor = entrada
+            if expira_en is not None and expira_en <= time.monotonic():
+                del self._datos[clave]
+                self.expiraciones += 1
+                self.fallos += 1
+                return None
+
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+
+    def guardar(self, clave: Hashable, valor: Any) -> None:
+        """Guardar un valor, desalojando la entrada menos usada si se supera el tope"""
+        expira_en = None
+        if self.ttl_segundos is not None:
+            expira_en = time.monotonic() + self.ttl_segundos
+
+        with self._lock:
+            self._datos[clave] = (expira_en, valor)
+            self._datos.move_to_end(clave)
+
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+                self.desalojos += 1
+
+    def invalidar(self, clave: Hashable) -> None:
+        """Eliminar una entrada"""
+        with self._lock:
+            if self._datos.pop(clave, None) is not None:
+                self.invalidaciones += 1
+
+    def invalidar_donde(self, predicado: Callable[[Hashable], bool]) -> None:
+        """Eliminar todas las entradas cuya clave cumpla el predicado"""
+        with self._lock:
+            for clave in [clave for clave in self._datos if predicado(clave)]:
+                del self._datos[clave]
+                self.invalidaciones += 1
+
+    def limpiar(self) -> None:
+        """Vaciar la cache"""
+        with self._lock:
+            self._datos.clear()
+
+    def estadisticas(self) -> dict:
+        """Contadores de uso de la cache"""
+        with self._lock:
+            return {
+                "entradas": len(self._datos),
+                "max_entradas": self.max_entradas,
+                "ttl_segundos": self.ttl_segundos,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+                "expiraciones": self.expiraciones,
+                "invalidaciones": self.invalidaciones,
+            }
+
+
+class CacheRedis:
+    """
+    Cache sobre un cliente compatible con Redis (redis-py o un fake con get/set/delete/scan_iter)
+    Misma interfaz que CacheTTL; compartida entre workers y procesos
+
+    Args:
+        cliente: Cliente Redis síncrono
+        prefijo: Prefijo de las claves (separa caches en la misma instancia)
+        ttl_segundos: Vida de cada entrada, None para no expirar
+    """
+
+    def __init__(self, cliente: Any, prefijo: str, ttl_segundos: Optional[float] = 300.0):
+        self.cliente = cliente
+        self.prefijo = prefijo
+        self.ttl_segundos = ttl_segundos
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+
+    def _clave(self, clave: Hashable) -> str:
+        partes = clave if isinstance(clave, tuple) else (clave,)
+        return self.prefijo + ":".join(str(parte) for parte in partes)
+
+    def obtener(self, clave: Hashable) -> Optional[bytes]:
+        """Obtener un valor, None si no existe o expiró"""
+        valor = self.cliente.get(self._clave(clave))
+        with self._lock:
+            if valor is None:
+                self.fallos += 1
+            else:
+                self.aciertos += 1
+        return valor
+
+    def guardar(self, clave: Hashable, valor: bytes) -> None:
+        """Guardar un valor (bytes) con el TTL configurado"""
+        expira = max(1, int(self.ttl_segundos)) if self.ttl_segundos is not None else None
+        self.cliente.set(self._clave(clave), valor, ex=expira)
+
+    def invalidar(self, clave: Hashable) -> None:
+        """Eliminar una entrada"""
+        if self.cliente.delete(self._clave(clave)):
+            with self._lock:
+                self.invalidaciones += 1
+
+    def limpiar(self) -> None:
+        """Eliminar todas las entradas del prefijo"""
+        claves = list(self.cliente.scan_iter(match=self.prefijo + "*"))
+        if claves:
+            self.cliente.delete(*claves)
+
+    def estadisticas(self) -> dict:
+        """Contadores de uso de la cache (de este proceso)"""
+        with self._lock:
+            return {
+                "backend": "redis",
+                "ttl_segundos": self.ttl_segundos,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "invalidaciones": self.invalidaciones,
+            }
@@ -0,0 +1,78 @@
+"""
+Cache de lectura de equipos para el escaneo de QR
+Guarda el JSON ya serializado de EquipoResponse bajo ("id", id) y ("qr", codigo_qr)
+"""
+
+import os
+from typing import Awaitable, Callable, Optional, Union
+
+from . import crud, models, schemas
+from .cache import CacheRedis, CacheTTL
+
+# Backend: "memoria" (LRU por proceso), "redis" (compartida, requiere REDIS_URL) u "off"
+EQUIPOS_CACHE = os.getenv("EQUIPOS_CACHE", "memoria")
+EQUIPOS_CACHE_TTL = float(os.getenv("EQUIPOS_CACHE_TTL", 300))
+EQUIPOS_CACHE_MAX = int(os.getenv("EQUIPOS_CACHE_MAX", 20000))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+def crear_cache(backend: str = EQUIPOS_CACHE) -> Optional[Union[CacheTTL, CacheRedis]]:
+    """Crear el backend de cache configurado"""
+    if backend == "off":
+        return None
+
+    if backend == "redis":
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("EQUIPOS_CACHE=redis requiere el paquete redis (pip install redis)") from e
+        return CacheRedis(redis.Redis.from_url(REDIS_URL), "equipos:", EQUIPOS_CACHE_TTL)
+
+    return CacheTTL(max_entradas=EQUIPOS_CACHE_MAX, ttl_segundos=EQUIPOS_CACHE_TTL)
+
+
+cache_equipos = crear_cache()
+
+
+def _invalidar_equipo(accion: str, equipo: models.Equipo) -> None:
+    """Descartar las entradas de un equipo creado, modificado o eliminado"""
+    if cache_equipos is not None:
+        cache_equipos.invalidar(("id", equipo.id))
+        cache_equipos.invalidar(("qr", equipo.codigo_qr))
+
+
+crud.registrar_observador("equipo", _invalidar_equipo)
+
+
+async def obtener_equipo_json(
+    clave: tuple,
+    cargar: Callable[[], Awaitable[Optional[models.Equipo]]]
+) -> Optional[bytes]:
+    """
+    JSON de EquipoResponse desde la cache; si falta se carga con `cargar`,
+    se serializa una vez y se guarda bajo su id y su código QR
+
+    Returns:
+        Bytes JSON o None si el equipo no existe
+    """
+    if cache_equipos is not None:
+        datos = cache_equipos.obtener(clave)
+        if datos is not None:
+            return datos
+
+    equipo = await cargar()
+    if equipo is None:
+        return None
+
+    datos = schemas.EquipoResponse.from_orm(equipo).model_dump_json().encode()
+    if cache_equipos is not None:
+        cache_equipos.guardar(("id", equipo.id), datos)
+        cache_equipos.guardar(("qr", equipo.codigo_qr), datos)
+    return datos
+
+
+def estadisticas() -> dict:
+    """Contadores de la cache de equipos"""
+    if cache_equipos is None:
+        return {"backend": "off"}
+    return cache_equipos.estadisticas()
@@ -3,13 +3,46 @@ CRUD operations para el sistema de mantenimiento
 Contiene todas las operaciones de base de datos
 """
 
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, or_, desc, tuple_, func, select, update, delete, insert
+from sqlalchemy.exc import IntegrityError
+from collections import defaultdict
 from datetime import datetime
-from typing import List, Optional
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 from . import models, schemas
-from .auth import hash_password, verify_password
+from .auth import hash_password, verify_password, revocar_tokens_usuario
+
+# Campos del usuario incluidos en los claims del token
+CAMPOS_TOKEN_USUARIO = {"nombre", "rol", "activo"}
+
+# Estadísticas desde la tabla de contadores (O(1)) en lugar de la consulta agregada
+ESTADISTICAS_CONTADORES = os.getenv("ESTADISTICAS_CONTADORES", "false").lower() == "true"
+
+# Máximo de intervenciones por sincronización en lote
+INTERVENCIONES_LOTE_MAX = int(os.getenv("INTERVENCIONES_LOTE_MAX", "500"))
+
+# /api/cambios no entrega lo modificado en los últimos segundos: una transacción
+# con fecha_actualizacion anterior al corte puede no haber hecho commit todavía
+CAMBIOS_MARGEN_SEGUNDOS = float(os.getenv("CAMBIOS_MARGEN_SEGUNDOS", "5"))
+
+
+# ==================== OBSERVADORES ====================
+
+# Callbacks (accion, objeto) por entidad, tras cada escritura confirmada (caches, eventos en vivo)
+_observadores: Dict[str, List[Callable[[str, Any], None]]] = defaultdict(list)
+
+
+def registrar_observador(entidad: str, callback: Callable[[str, Any], None]) -> None:
+    """Registrar un callback que se ejecuta al modificar una entidad"""
+    _observadores[entidad].append(callback)
+
+
+def _notificar(entidad: str, accion: str, objeto: Any) -> None:
+    """Notificar a los observadores de una entidad"""
+    for callback in _observadores[entidad]:
+        callback(accion, objeto)
 
 
 # ==================== USUARIOS ====================
@@ -39,8 +72,12 @@ def obtener_todos_usuarios(
     return query.offset(skip).limit(limit).all()
 
 
-def crear_usuario(db: Session, usuario: schemas.UsuarioCreate) -> models.Usuario:
-    """Crear nuevo usuario"""
+def crear_usuario(
+    db: Session,
+    usuario: schemas.UsuarioCreate,
+    hashed_password: Optional[str] = None
+) -> models.Usuario:
+    """Crear nuevo usuario (hashed_password permite hashear fuera de la sesión)"""
     # Verificar que el email no exista
     if obtener_usuario_por_email(db, usuario.email):
         raise ValueError(f"El email {usuario.email} ya está registrado")
@@ -49,7 +86,7 @@ def crear_usuario(db: Session, usuario: schemas.UsuarioCreate) -> models.Usuario
         email=usuario.email,
         nombre=usuario.nombre,
         rol=usuario.rol,
-        hashed_password=hash_password(usuario.password)
+        hashed_password=hashed_password or hash_password(usuario.password)
     )
     db.add(db_usuario)
     db.commit()
@@ -60,9 +97,10 @@ def crear_usuario(db: Session, usuario: schemas.UsuarioCreate) -> models.Usuario
 def actualizar_usuario(
     db: Session,
     usuario_id: int,
-    usuario_update: schemas.UsuarioUpdate
+    usuario_update: schemas.UsuarioUpdate,
+    hashed_password: Optional[str] = None
 ) -> Optional[models.Usuario]:
-    """Actualizar usuario"""
+    """Actualizar usuario (hashed_password permite hashear fuera de la sesión)"""
     db_usuario = obtener_usuario_por_id(db, usuario_id)
     
     if not db_usuario:
@@ -72,7 +110,8 @@ def actualizar_usuario(
     
     # Hashear nueva contraseña si se proporciona
     if "password" in update_data:
-        update_data["hashed_password"] = hash_password(update_data.pop("password"))
+        password = update_data.pop("password")
+        update_data["hashed_password"] = hashed_password or hash_password(password)
     
     # Actualizar campos
     for campo, valor in update_data.items():
@@ -81,6 +120,12 @@ def actualizar_usuario(
     db_usuario.fecha_actualizacion = datetime.utcnow()
     db.commit()
     db.refresh(db_usuario)
+    
+    # Los tokens emitidos con los datos anteriores dejan de ser válidos
+    if CAMPOS_TOKEN_USUARIO & update_data.keys():
+        revocar_tokens_usuario(usuario_id)
+    
+    _notificar("usuario", "actualizado", db_usuario)
     return db_usuario
 
 
@@ -93,6 +138,8 @@ def eliminar_usuario(db: Session, usuario_id: int) -> bool:
     
     db_usuario.activo = False
     db.commit()
+    revocar_tokens_usuario(usuario_id)
+    _notificar("usuario", "eliminado", db_usuario)
     return True
 
 
@@ -134,9 +181,13 @@ def obtener_todos_equipos(
     limit: int = 100,
     solo_activos: bool = True,
     tipo: Optional[str] = None,
-    ubicacion: Optional[str] = None
+    ubicacion: Optional[str] = None,
+    cursor: Optional[int] = None
 ) -> List[models.Equipo]:
-    """Obtener todos los equipos con filtros opcionales"""
+    """
+    Obtener todos los equipos con filtros opcionales
+    Con cursor (id del último equipo recibido) pagina por keyset e ignora skip
+    """
     query = db.query(models.Equipo)
     
     if solo_activos:
@@ -148,6 +199,11 @@ def obtener_todos_equipos(
     if ubicacion:
         query = query.filter(models.Equipo.ubicacion == ubicacion)
     
+    query = query.order_by(models.Equipo.id)
+    
+    if cursor is not None:
+        return query.filter(models.Equipo.id > cursor).limit(limit).all()
+    
     return query.offset(skip).limit(limit).all()
 
 
@@ -159,11 +215,54 @@ def crear_equipo(db: Session, equipo: schemas.EquipoCreate) -> models.Equipo:
     
     db_equipo = models.Equipo(**equipo.dict())
     db.add(db_equipo)
+    _ajustar_contadores(db, total_equipos=1)
     db.commit()
     db.refresh(db_equipo)
+    _notificar("equipo", "creado", db_equipo)
     return db_equipo
 
 
+def _insert_ignorando_conflictos(db: Session, tabla, columna: str):
+    """INSERT ... ON CONFLICT DO NOTHING del dialecto en uso (INSERT simple si no lo soporta)"""
+    dialecto = db.get_bind().dialect.name
+    if dialecto == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as insert_dialecto
+    elif dialecto == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as insert_dialecto
+    else:
+        return insert(tabla)
+    return insert_dialecto(tabla).on_conflict_do_nothing(index_elements=[columna])
+
+
+def insertar_equipos_lote(db: Session, equipos: List[schemas.EquipoCreate]) -> List[str]:
+    """
+    Insertar un lote de equipos en una sola transacción
+    Los códigos QR ya existentes se omiten sin abortar el lote
+
+    Returns:
+        Códigos QR efectivamente insertados
+    """
+    if not equipos:
+        return []
+    
+    # Descartar en una consulta los QR que ya existen
+    existentes = set(db.scalars(
+        select(models.Equipo.codigo_qr)
+        .where(models.Equipo.codigo_qr.in_([e.codigo_qr for e in equipos]))
+    ))
+    filas = [e.dict() for e in equipos if e.codigo_qr not in existentes]
+    
+    insertados = []
+    if filas:
+        # ON CONFLICT cubre los QR creados por otra transacción entre la consulta y el INSERT
+        stmt = _insert_ignorando_conflictos(db, models.Equipo.__table__, "codigo_qr")
+        insertados = list(db.scalars(stmt.returning(models.Equipo.codigo_qr), filas))
+    
+    _ajustar_contadores(db, total_equipos=len(insertados))
+    db.commit()
+    return insertados
+
+
 def actualizar_equipo(
     db: Session,
     equipo_id: int,
@@ -176,13 +275,16 @@ def actualizar_equipo(
         return None
     
     update_data = equipo_update.dict(exclude_unset=True)
+    estaba_activo = bool(db_equipo.activo)
     
     for campo, valor in update_data.items():
         setattr(db_equipo, campo, valor)
     
     db_equipo.fecha_actualizacion = datetime.utcnow()
+    _ajustar_contadores(db, total_equipos=int(bool(db_equipo.activo)) - int(estaba_activo))
     db.commit()
     db.refresh(db_equipo)
+    _notificar("equipo", "actualizado", db_equipo)
     return db_equipo
 
 
@@ -193,11 +295,36 @@ def eliminar_equipo(db: Session, equipo_id: int) -> bool:
     if not db_equipo:
         return False
     
+    if db_equipo.activo:
+        _ajustar_contadores(db, total_equipos=-1)
+    
     db_equipo.activo = False
     db.commit()
+    _notificar("equipo", "eliminado", db_equipo)
     return True
 
 
+def obtener_codigos_qr(
+    db: Session,
+    tipo: Optional[str] = None,
+    ubicacion: Optional[str] = None,
+    ids: Optional[List[int]] = None
+) -> List[str]:
+    """Códigos QR de los equipos activos que cumplen el filtro, ordenados por id"""
+    query = select(models.Equipo.codigo_qr).where(models.Equipo.activo == True)
+    
+    if tipo:
+        query = query.where(models.Equipo.tipo == tipo)
+    
+    if ubicacion:
+        query = query.where(models.Equipo.ubicacion == ubicacion)
+    
+    if ids is not None:
+        query = query.where(models.Equipo.id.in_(ids))
+    
+    return list(db.scalars(query.order_by(models.Equipo.id)))
+
+
 def obtener_equipos_por_ubicacion(db: Session, ubicacion: str) -> List[models.Equipo]:
     """Obtener equipos por ubicación"""
     return db.query(models.Equipo).filter(
@@ -284,12 +411,50 @@ def eliminar_tipo_intervencion(db: Session, tipo_id: int) -> bool:
         return False
     
     db.delete(db_tipo)
+    _registrar_eliminacion(db, "tipo_intervencion", tipo_id)
     db.commit()
     return True
 
 
 # ==================== INTERVENCIONES ====================
 
+# Estados de cada intervención en la creación por lote
+LOTE_CREADA = "creada"
+LOTE_EXISTENTE = "existente"
+LOTE_ERROR = "error"
+
+# Más recientes primero, id como desempate (coincide con los índices de models.Intervencion)
+ORDEN_INTERVENCIONES = (desc(models.Intervencion.fecha_inicio), desc(models.Intervencion.id))
+
+# Relaciones que se pueden cargar junto al listado (?expand=equipo,usuario,tipo)
+RELACIONES_EXPANDIBLES = {
+    "equipo": models.Intervencion.equipo,
+    "usuario": models.Intervencion.usuario,
+    "tipo": models.Intervencion.tipo_intervencion,
+}
+
+
+def _paginar_intervenciones(
+    query,
+    skip: int,
+    limit: int,
+    cursor: Optional[Tuple[datetime, int]]
+) -> List[models.Intervencion]:
+    """
+    Ordenar y paginar un listado de intervenciones
+    Con cursor (fecha_inicio, id) pagina por keyset sobre el índice e ignora skip
+    """
+    query = query.order_by(*ORDEN_INTERVENCIONES)
+    
+    if cursor is not None:
+        query = query.filter(
+            tuple_(models.Intervencion.fecha_inicio, models.Intervencion.id) < tuple_(*cursor)
+        )
+        return query.limit(limit).all()
+    
+    return query.offset(skip).limit(limit).all()
+
+
 def obtener_intervencion_por_id(
     db: Session,
     intervencion_id: int
@@ -300,16 +465,35 @@ def obtener_intervencion_por_id(
     ).first()
 
 
+def obtener_intervencion_detalle(
+    db: Session,
+    intervencion_id: int
+) -> Optional[models.Intervencion]:
+    """Obtener intervención con equipo, usuario y tipo cargados en la misma consulta"""
+    return db.query(models.Intervencion).options(
+        *[joinedload(relacion) for relacion in RELACIONES_EXPANDIBLES.values()]
+    ).filter(
+        models.Intervencion.id == intervencion_id
+    ).first()
+
+
 def obtener_todas_intervenciones(
     db: Session,
     skip: int = 0,
     limit: int = 100,
     equipo_id: Optional[int] = None,
     usuario_id: Optional[int] = None,
-    solo_activas: bool = False
+    solo_activas: bool = False,
+    cursor: Optional[Tuple[datetime, int]] = None,
+    expandir: Sequence[str] = ()
 ) -> List[models.Intervencion]:
-    """Obtener todas las intervenciones con filtros opcionales"""
-    query = db.query(models.Intervencion)
+    """
+    Obtener todas las intervenciones con filtros opcionales
+    expandir: relaciones de RELACIONES_EXPANDIBLES a cargar con JOIN en la misma consulta
+    """
+    query = db.query(models.Intervencion).options(
+        *[joinedload(RELACIONES_EXPANDIBLES[nombre]) for nombre in expandir]
+    )
     
     if equipo_id:
         query = query.filter(models.Intervencion.equipo_id == equipo_id)
@@ -320,31 +504,35 @@ def obtener_todas_intervenciones(
     if solo_activas:
         query = query.filter(models.Intervencion.completada == False)
     
-    return query.order_by(desc(models.Intervencion.fecha_inicio)).offset(skip).limit(limit).all()
+    return _paginar_intervenciones(query, skip, limit, cursor)
 
 
 def obtener_historial_equipo(
     db: Session,
     equipo_id: int,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[Tuple[datetime, int]] = None
 ) -> List[models.Intervencion]:
     """Obtener historial de intervenciones de un equipo"""
-    return db.query(models.Intervencion).filter(
+    query = db.query(models.Intervencion).filter(
         models.Intervencion.equipo_id == equipo_id
-    ).order_by(desc(models.Intervencion.fecha_inicio)).offset(skip).limit(limit).all()
+    )
+    return _paginar_intervenciones(query, skip, limit, cursor)
 
 
 def obtener_intervenciones_usuario(
     db: Session,
     usuario_id: int,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[Tuple[datetime, int]] = None
 ) -> List[models.Intervencion]:
     """Obtener intervenciones realizadas por un usuario"""
-    return db.query(models.Intervencion).filter(
+    query = db.query(models.Intervencion).filter(
         models.Intervencion.usuario_id == usuario_id
-    ).order_by(desc(models.Intervencion.fecha_inicio)).offset(skip).limit(limit).all()
+    )
+    return _paginar_intervenciones(query, skip, limit, cursor)
 
 
 def crear_intervencion(
@@ -366,11 +554,99 @@ def crear_intervencion(
         usuario_id=usuario_id
     )
     db.add(db_intervencion)
+    _ajustar_contadores(db, total_intervenciones=1, intervenciones_pendientes=1)
     db.commit()
     db.refresh(db_intervencion)
+    _notificar("intervencion", "creado", db_intervencion)
     return db_intervencion
 
 
+def _crear_intervenciones_lote(
+    db: Session,
+    intervenciones: List[schemas.IntervencionLoteItem],
+    usuario_id: int
+) -> List[schemas.ResultadoLoteIntervencion]:
+    equipos = set(db.scalars(
+        select(models.Equipo.id)
+        .where(models.Equipo.id.in_({i.equipo_id for i in intervenciones}))
+    ))
+    tipos = set(db.scalars(
+        select(models.TipoIntervencion.id)
+        .where(models.TipoIntervencion.id.in_({i.tipo_id for i in intervenciones}))
+    ))
+    
+    claves = {i.clave_idempotencia for i in intervenciones if i.clave_idempotencia}
+    por_clave: Dict[str, models.Intervencion] = {}
+    if claves:
+        por_clave = {
+            i.clave_idempotencia: i
+            for i in db.scalars(
+                select(models.Intervencion).where(
+                    models.Intervencion.usuario_id == usuario_id,
+                    models.Intervencion.clave_idempotencia.in_(claves)
+                )
+            )
+        }
+    
+    # (indice, estado, intervención, error)
+    resultados = []
+    creadas = 0
+    for indice, item in enumerate(intervenciones):
+        clave = item.clave_idempotencia
+        if clave in por_clave:
+            resultados.append((indice, LOTE_EXISTENTE, por_clave[clave], None))
+        elif item.equipo_id not in equipos:
+            resultados.append((indice, LOTE_ERROR, None, "El equipo no existe"))
+        elif item.tipo_id not in tipos:
+            resultados.append((indice, LOTE_ERROR, None, "El tipo de intervención no existe"))
+        else:
+            db_intervencion = models.Intervencion(**item.dict(exclude_none=True), usuario_id=usuario_id)
+            db.add(db_intervencion)
+            if clave:
+                por_clave[clave] = db_intervencion
+            resultados.append((indice, LOTE_CREADA, db_intervencion, None))
+            creadas += 1
+    
+    # Un solo flush inserta todas las filas; se serializa antes del commit para no recargarlas
+    db.flush()
+    respuesta = [
+        schemas.ResultadoLoteIntervencion(
+            indice=indice,
+            estado=estado,
+            intervencion=schemas.IntervencionResponse.from_orm(intervencion) if intervencion else None,
+            error=error
+        )
+        for indice, estado, intervencion, error in resultados
+    ]
+    _ajustar_contadores(db, total_intervenciones=creadas, intervenciones_pendientes=creadas)
+    db.commit()
+    for resultado in respuesta:
+        if resultado.estado == LOTE_CREADA:
+            _notificar("intervencion", "creado", resultado.intervencion)
+    return respuesta
+
+
+def crear_intervenciones_lote(
+    db: Session,
+    intervenciones: List[schemas.IntervencionLoteItem],
+    usuario_id: int
+) -> List[schemas.ResultadoLoteIntervencion]:
+    """
+    Crear varias intervenciones en una transacción (sincronización sin conexión)
+
+    Equipos y tipos se validan con una consulta IN cada uno; las intervenciones
+    con referencias inválidas se informan como error sin afectar al resto.
+    Una clave_idempotencia ya usada por el usuario devuelve la intervención
+    existente en lugar de duplicarla.
+    """
+    try:
+        return _crear_intervenciones_lote(db, intervenciones, usuario_id)
+    except IntegrityError:
+        # Otra sincronización insertó la misma clave en paralelo: al reintentar se ve como existente
+        db.rollback()
+        return _crear_intervenciones_lote(db, intervenciones, usuario_id)
+
+
 def actualizar_intervencion(
     db: Session,
     intervencion_id: int,
@@ -383,13 +659,16 @@ def actualizar_intervencion(
         return None
     
     update_data = intervencion_update.dict(exclude_unset=True)
+    estaba_completada = bool(db_intervencion.completada)
     
     for campo, valor in update_data.items():
         setattr(db_intervencion, campo, valor)
     
     db_intervencion.fecha_actualizacion = datetime.utcnow()
+    _ajustar_contadores_completada(db, estaba_completada, bool(db_intervencion.completada))
     db.commit()
     db.refresh(db_intervencion)
+    _notificar("intervencion", "actualizado", db_intervencion)
     return db_intervencion
 
 
@@ -405,6 +684,7 @@ def completar_intervencion(
     if not db_intervencion:
         return None
     
+    _ajustar_contadores_completada(db, bool(db_intervencion.completada), True)
     db_intervencion.completada = True
     db_intervencion.fecha_fin = datetime.utcnow()
     
@@ -417,6 +697,7 @@ def completar_intervencion(
     db_intervencion.fecha_actualizacion = datetime.utcnow()
     db.commit()
     db.refresh(db_intervencion)
+    _notificar("intervencion", "completado", db_intervencion)
     return db_intervencion
 
 
@@ -427,30 +708,161 @@ def eliminar_intervencion(db: Session, intervencion_id: int) -> bool:
     if not db_intervencion:
         return False
     
+    if db_intervencion.completada:
+        _ajustar_contadores(db, total_intervenciones=-1, intervenciones_completadas=-1)
+    else:
+        _ajustar_contadores(db, total_intervenciones=-1, intervenciones_pendientes=-1)
+    
     db.delete(db_intervencion)
+    _registrar_eliminacion(db, "intervencion", intervencion_id)
     db.commit()
+    _notificar("intervencion", "eliminado", db_intervencion)
     return True
 
 
+# ==================== CAMBIOS ====================
+
+# Fuente de /api/cambios -> (modelo, columna de fecha de modificación)
+FUENTES_CAMBIOS = {
+    "equipos": (models.Equipo, models.Equipo.fecha_actualizacion),
+    "tipos_intervencion": (models.TipoIntervencion, models.TipoIntervencion.fecha_actualizacion),
+    "intervenciones": (models.Intervencion, models.Intervencion.fecha_actualizacion),
+    "eliminados": (models.Eliminacion, models.Eliminacion.fecha_eliminacion),
+}
+
+# (fecha, id) de la última fila entregada de una fuente
+PosicionCambios = Tuple[datetime, int]
+
+
+def _registrar_eliminacion(db: Session, entidad: str, entidad_id: int) -> None:
+    """Dejar constancia de un borrado físico, en la misma transacción"""
+    db.add(models.Eliminacion(entidad=entidad, entidad_id=entidad_id))
+
+
+def obtener_cambios(
+    db: Session,
+    since: Optional[datetime],
+    hasta: datetime,
+    posiciones: Dict[str, Optional[PosicionCambios]],
+    limit: int = 100
+) -> Tuple[Dict[str, list], Dict[str, PosicionCambios]]:
+    """
+    Una página de cada fuente pendiente: filas modificadas en [since, hasta)
+    ordenadas por (fecha, id) a continuación de su posición (None: desde el principio)
+
+    Returns:
+        (filas por fuente, posición de las fuentes que todavía tienen filas)
+    """
+    if set(posiciones) - set(FUENTES_CAMBIOS):
+        raise ValueError("Cursor inválido")
+
+    cambios = {fuente: [] for fuente in FUENTES_CAMBIOS}
+    pendientes = {}
+    for fuente, despues in posiciones.items():
+        modelo, fecha = FUENTES_CAMBIOS[fuente]
+        query = db.query(modelo).filter(fecha < hasta)
+        if since is not None:
+            query = query.filter(fecha >= since)
+        if despues is not None:
+            query = query.filter(tuple_(fecha, modelo.id) > tuple_(*despues))
+
+        # Una fila de más indica si hace falta otra página
+        filas = query.order_by(fecha, modelo.id).limit(limit + 1).all()
+        cambios[fuente] = filas[:limit]
+        if len(filas) > limit:
+            ultima = filas[limit - 1]
+            pendientes[fuente] = (getattr(ultima, fecha.key), ultima.id)
+
+    return cambios, pendientes
+
+
+# ==================== ESTADÍSTICAS ====================
+
+CONTADORES = (
+    "total_equipos",
+    "total_intervenciones",
+    "intervenciones_completadas",
+    "intervenciones_pendientes"
+)
+
+
+def _ajustar_contadores(db: Session, **deltas: int) -> None:
+    """Sumar deltas a los contadores materializados dentro de la transacción en curso"""
+    if not ESTADISTICAS_CONTADORES:
+        return
+    
+    for nombre, delta in deltas.items():
+        if delta:
+            db.execute(
+                update(models.ContadorEstadistica)
+                .where(models.ContadorEstadistica.nombre == nombre)
+                .values(valor=models.ContadorEstadistica.valor + delta)
+            )
+
+
+def _ajustar_contadores_completada(db: Session, antes: bool, despues: bool) -> None:
+    """Mover una intervención entre pendientes y completadas"""
+    if antes != despues:
+        delta = 1 if despues else -1
+        _ajustar_contadores(
+            db,
+            intervenciones_completadas=delta,
+            intervenciones_pendientes=-delta
+        )
+
+
+def calcular_estadisticas(db: Session) -> dict:
+    """Calcular estadísticas con una única consulta agregada"""
+    total_equipos = (
+        select(func.count(models.Equipo.id))
+        .where(models.Equipo.activo == True)
+        .scalar_subquery()
+    )
+    
+    fila = db.execute(
+        select(
+            total_equipos.label("total_equipos"),
+            func.count(models.Intervencion.id).label("total_intervenciones"),
+            func.count(models.Intervencion.id).filter(
+                models.Intervencion.completada == True
+            ).label("intervenciones_completadas"),
+            func.count(models.Intervencion.id).filter(
+                models.Intervencion.completada == False
+            ).label("intervenciones_pendientes"),
+        ).select_from(models.Intervencion)
+    ).one()
+    
+    return dict(fila._mapping)
+
+
+def reconstruir_contadores(db: Session) -> dict:
+    """
+    Recalcular los contadores materializados desde las tablas
+    Bloquea las filas de contadores para que las escrituras concurrentes se apliquen después
+    """
+    db.execute(select(models.ContadorEstadistica).with_for_update()).all()
+    
+    valores = calcular_estadisticas(db)
+    db.execute(delete(models.ContadorEstadistica))
+    db.execute(
+        insert(models.ContadorEstadistica),
+        [{"nombre": nombre, "valor": valor} for nombre, valor in valores.items()]
+    )
+    db.commit()
+    return valores
+
+
 def obtener_estadisticas_equipos(db: Session) -> dict:
     """Obtener estadísticas de equipos y mantenimientos"""
-    total_equipos = db.query(models.Equipo).filter(
-        models.Equipo.activo == True
-    ).count()
-    
-    total_intervenciones = db.query(models.Intervencion).count()
-    
-    intervenciones_completadas = db.query(models.Intervencion).filter(
-        models.Intervencion.completada == True
-    ).count()
-    
-    intervenciones_pendientes = db.query(models.Intervencion).filter(
-        models.Intervencion.completada == False
-    ).count()
-    
-    return {
-        "total_equipos": total_equipos,
-        "total_intervenciones": total_intervenciones,
-        "intervenciones_completadas": intervenciones_completadas,
-        "intervenciones_pendientes": intervenciones_pendientes
-    }
+    if not ESTADISTICAS_CONTADORES:
+        return calcular_estadisticas(db)
+    
+    valores = dict(db.execute(
+        select(models.ContadorEstadistica.nombre, models.ContadorEstadistica.valor)
+    ).all())
+    
+    # Primera lectura tras activar los contadores: inicializarlos
+    if len(valores) < len(CONTADORES):
+        valores = reconstruir_contadores(db)
+    
+    return {nombre: valores[nombre] for nombre in CONTADORES}
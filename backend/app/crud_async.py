@@ -0,0 +1,394 @@
+"""
+Versiones asíncronas de las operaciones CRUD
+Ninguna función bloquea el event loop:
+- Con AsyncSession (DB_ASYNC=true) la operación corre sobre el driver asíncrono
+  mediante AsyncSession.run_sync
+- Con Session síncrona la operación se ejecuta en el threadpool
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime
+from typing import Any, AsyncIterator, BinaryIO, Callable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from . import busqueda, crud, exportacion, importacion, models, schemas
+from .auth import hash_password_async, verify_password_async
+
+DbSession = Union[Session, AsyncSession]
+
+
+async def ejecutar(db: DbSession, operacion: Callable[..., Any], *args, **kwargs) -> Any:
+    """Ejecutar una operación síncrona de crud sin bloquear el event loop"""
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(operacion, *args, **kwargs)
+    return await run_in_threadpool(operacion, db, *args, **kwargs)
+
+
+async def liberar_conexion(db: DbSession) -> None:
+    """Devolver la conexión al pool; la sesión se puede seguir usando (conexiones de larga duración)"""
+    if isinstance(db, AsyncSession):
+        await db.close()
+    else:
+        await run_in_threadpool(db.close)
+
+
+# ==================== USUARIOS ====================
+
+async def obtener_usuario_por_id(db: DbSession, usuario_id: int) -> Optional[models.Usuario]:
+    """Obtener usuario por ID"""
+    return await ejecutar(db, crud.obtener_usuario_por_id, usuario_id)
+
+
+async def obtener_usuario_por_email(db: DbSession, email: str) -> Optional[models.Usuario]:
+    """Obtener usuario por email"""
+    return await ejecutar(db, crud.obtener_usuario_por_email, email)
+
+
+async def obtener_todos_usuarios(
+    db: DbSession,
+    skip: int = 0,
+    limit: int = 100,
+    solo_activos: bool = True
+) -> List[models.Usuario]:
+    """Obtener todos los usuarios con paginación"""
+    return await ejecutar(
+        db, crud.obtener_todos_usuarios, skip=skip, limit=limit, solo_activos=solo_activos
+    )
+
+
+async def crear_usuario(db: DbSession, usuario: schemas.UsuarioCreate) -> models.Usuario:
+    """Crear nuevo usuario (bcrypt en el pool de hashing)"""
+    hashed_password = await hash_password_async(usuario.password)
+    return await ejecutar(db, crud.crear_usuario, usuario, hashed_password=hashed_password)
+
+
+async def actualizar_usuario(
+    db: DbSession,
+    usuario_id: int,
+    usuario_update: schemas.UsuarioUpdate
+) -> Optional[models.Usuario]:
+    """Actualizar usuario (bcrypt en el pool de hashing)"""
+    hashed_password = None
+    if usuario_update.password:
+        hashed_password = await hash_password_async(usuario_update.password)
+    return await ejecutar(
+        db, crud.actualizar_usuario, usuario_id, usuario_update, hashed_password=hashed_password
+    )
+
+
+async def eliminar_usuario(db: DbSession, usuario_id: int) -> bool:
+    """Eliminar usuario (soft delete)"""
+    return await ejecutar(db, crud.eliminar_usuario, usuario_id)
+
+
+async def autenticar_usuario(
+    db: DbSession,
+    email: str,
+    password: str
+) -> Optional[models.Usuario]:
+    """Autenticar usuario con email y contraseña (bcrypt en el pool de hashing)"""
+    usuario = await obtener_usuario_por_email(db, email)
+    
+    if not usuario:
+        return None
+    
+    if not usuario.activo:
+        return None
+    
+    if not await verify_password_async(password, usuario.hashed_password):
+        return None
+    
+    return usuario
+
+
+# ==================== EQUIPOS ====================
+
+async def obtener_equipo_por_id(db: DbSession, equipo_id: int) -> Optional[models.Equipo]:
+    """Obtener equipo por ID"""
+    return await ejecutar(db, crud.obtener_equipo_por_id, equipo_id)
+
+
+async def obtener_equipo_por_qr(db: DbSession, codigo_qr: str) -> Optional[models.Equipo]:
+    """Obtener equipo por código QR"""
+    return await ejecutar(db, crud.obtener_equipo_por_qr, codigo_qr)
+
+
+async def obtener_todos_equipos(
+    db: DbSession,
+    skip: int = 0,
+    limit: int = 100,
+    solo_activos: bool = True,
+    tipo: Optional[str] = None,
+    ubicacion: Optional[str] = None,
+    cursor: Optional[int] = None
+) -> List[models.Equipo]:
+    """Obtener todos los equipos con filtros opcionales"""
+    return await ejecutar(
+        db,
+        crud.obtener_todos_equipos,
+        skip=skip,
+        limit=limit,
+        solo_activos=solo_activos,
+        tipo=tipo,
+        ubicacion=ubicacion,
+        cursor=cursor
+    )
+
+
+async def crear_equipo(db: DbSession, equipo: schemas.EquipoCreate) -> models.Equipo:
+    """Crear nuevo equipo"""
+    return await ejecutar(db, crud.crear_equipo, equipo)
+
+
+async def obtener_codigos_qr(
+    db: DbSession,
+    tipo: Optional[str] = None,
+    ubicacion: Optional[str] = None,
+    ids: Optional[List[int]] = None
+) -> List[str]:
+    """Códigos QR de los equipos activos que cumplen el filtro"""
+    return await ejecutar(db, crud.obtener_codigos_qr, tipo=tipo, ubicacion=ubicacion, ids=ids)
+
+
+async def importar_equipos(
+    db: DbSession,
+    archivo: BinaryIO,
+    formato: str
+) -> schemas.ImportacionResponse:
+    """Importar equipos desde un archivo CSV o NDJSON"""
+    return await ejecutar(db, importacion.importar_equipos, archivo, formato)
+
+
+async def actualizar_equipo(
+    db: DbSession,
+    equipo_id: int,
+    equipo_update: schemas.EquipoUpdate
+) -> Optional[models.Equipo]:
+    """Actualizar equipo"""
+    return await ejecutar(db, crud.actualizar_equipo, equipo_id, equipo_update)
+
+
+async def eliminar_equipo(db: DbSession, equipo_id: int) -> bool:
+    """Eliminar equipo (soft delete)"""
+    return await ejecutar(db, crud.eliminar_equipo, equipo_id)
+
+
+# ==================== TIPOS DE INTERVENCIÓN ====================
+
+async def obtener_tipo_intervencion_por_id(
+    db: DbSession,
+    tipo_id: int
+) -> Optional[models.TipoIntervencion]:
+    """Obtener tipo de intervención por ID"""
+    return await ejecutar(db, crud.obtener_tipo_intervencion_por_id, tipo_id)
+
+
+async def obtener_todos_tipos_intervencion(
+    db: DbSession,
+    skip: int = 0,
+    limit: int = 100
+) -> List[models.TipoIntervencion]:
+    """Obtener todos los tipos de intervención"""
+    return await ejecutar(db, crud.obtener_todos_tipos_intervencion, skip=skip, limit=limit)
+
+
+async def crear_tipo_intervencion(
+    db: DbSession,
+    tipo: schemas.TipoIntervencionCreate
+) -> models.TipoIntervencion:
+    """Crear nuevo tipo de intervención"""
+    return await ejecutar(db, crud.crear_tipo_intervencion, tipo)
+
+
+async def actualizar_tipo_intervencion(
+    db: DbSession,
+    tipo_id: int,
+    tipo_update: schemas.TipoIntervencionUpdate
+) -> Optional[models.TipoIntervencion]:
+    """Actualizar tipo de intervención"""
+    return await ejecutar(db, crud.actualizar_tipo_intervencion, tipo_id, tipo_update)
+
+
+async def eliminar_tipo_intervencion(db: DbSession, tipo_id: int) -> bool:
+    """Eliminar tipo de intervención"""
+    return await ejecutar(db, crud.eliminar_tipo_intervencion, tipo_id)
+
+
+# ==================== INTERVENCIONES ====================
+
+async def obtener_intervencion_por_id(
+    db: DbSession,
+    intervencion_id: int
+) -> Optional[models.Intervencion]:
+    """Obtener intervención por ID"""
+    return await ejecutar(db, crud.obtener_intervencion_por_id, intervencion_id)
+
+
+async def obtener_intervencion_detalle(
+    db: DbSession,
+    intervencion_id: int
+) -> Optional[schemas.IntervencionDetailResponse]:
+    """Obtener intervención con sus relaciones, serializada dentro de la sesión"""
+    def _detalle(session: Session, intervencion_id: int):
+        intervencion = crud.obtener_intervencion_detalle(session, intervencion_id)
+        if not intervencion:
+            return None
+        return schemas.IntervencionDetailResponse.from_orm(intervencion)
+
+    return await ejecutar(db, _detalle, intervencion_id)
+
+
+async def obtener_todas_intervenciones(
+    db: DbSession,
+    skip: int = 0,
+    limit: int = 100,
+    equipo_id: Optional[int] = None,
+    usuario_id: Optional[int] = None,
+    solo_activas: bool = False,
+    cursor: Optional[Tuple[datetime, int]] = None,
+    expandir: Sequence[str] = ()
+) -> List[models.Intervencion]:
+    """Obtener todas las intervenciones con filtros opcionales"""
+    return await ejecutar(
+        db,
+        crud.obtener_todas_intervenciones,
+        skip=skip,
+        limit=limit,
+        equipo_id=equipo_id,
+        usuario_id=usuario_id,
+        solo_activas=solo_activas,
+        cursor=cursor,
+        expandir=expandir
+    )
+
+
+def exportar_intervenciones(
+    db: DbSession,
+    formato: str,
+    since: Optional[datetime] = None
+) -> Union[Iterator[bytes], AsyncIterator[bytes]]:
+    """
+    Bloques de la exportación para StreamingResponse
+    Con Session síncrona Starlette recorre el iterador en el threadpool
+    """
+    if isinstance(db, AsyncSession):
+        return exportacion.exportar_intervenciones_async(db, formato, since)
+    return exportacion.exportar_intervenciones(db, formato, since)
+
+
+async def obtener_historial_equipo(
+    db: DbSession,
+    equipo_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[Tuple[datetime, int]] = None
+) -> List[models.Intervencion]:
+    """Obtener historial de intervenciones de un equipo"""
+    return await ejecutar(
+        db, crud.obtener_historial_equipo, equipo_id, skip=skip, limit=limit, cursor=cursor
+    )
+
+
+async def obtener_intervenciones_usuario(
+    db: DbSession,
+    usuario_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[Tuple[datetime, int]] = None
+) -> List[models.Intervencion]:
+    """Obtener intervenciones realizadas por un usuario"""
+    return await ejecutar(
+        db, crud.obtener_intervenciones_usuario, usuario_id, skip=skip, limit=limit, cursor=cursor
+    )
+
+
+async def crear_intervencion(
+    db: DbSession,
+    intervencion: schemas.IntervencionCreate,
+    usuario_id: int
+) -> models.Intervencion:
+    """Crear nueva intervención"""
+    return await ejecutar(db, crud.crear_intervencion, intervencion, usuario_id)
+
+
+async def crear_intervenciones_lote(
+    db: DbSession,
+    intervenciones: List[schemas.IntervencionLoteItem],
+    usuario_id: int
+) -> List[schemas.ResultadoLoteIntervencion]:
+    """Crear varias intervenciones en una transacción"""
+    return await ejecutar(db, crud.crear_intervenciones_lote, intervenciones, usuario_id)
+
+
+async def actualizar_intervencion(
+    db: DbSession,
+    intervencion_id: int,
+    intervencion_update: schemas.IntervencionUpdate
+) -> Optional[models.Intervencion]:
+    """Actualizar intervención"""
+    return await ejecutar(db, crud.actualizar_intervencion, intervencion_id, intervencion_update)
+
+
+async def completar_intervencion(
+    db: DbSession,
+    intervencion_id: int,
+    observaciones: Optional[str] = None,
+    tiempo_duracion: Optional[int] = None
+) -> Optional[models.Intervencion]:
+    """Completar una intervención"""
+    return await ejecutar(
+        db,
+        crud.completar_intervencion,
+        intervencion_id,
+        observaciones=observaciones,
+        tiempo_duracion=tiempo_duracion
+    )
+
+
+async def eliminar_intervencion(db: DbSession, intervencion_id: int) -> bool:
+    """Eliminar intervención"""
+    return await ejecutar(db, crud.eliminar_intervencion, intervencion_id)
+
+
+# ==================== BÚSQUEDA ====================
+
+async def buscar_equipos(
+    db: DbSession,
+    texto: str,
+    limit: int = 20,
+    cursor: Optional[Tuple[float, int]] = None
+) -> List[busqueda.Resultado]:
+    """Búsqueda de texto en equipos, por relevancia"""
+    return await ejecutar(db, busqueda.buscar_equipos, texto, limit=limit, cursor=cursor)
+
+
+async def buscar_intervenciones(
+    db: DbSession,
+    texto: str,
+    limit: int = 20,
+    cursor: Optional[Tuple[float, int]] = None,
+    equipo_id: Optional[int] = None
+) -> List[busqueda.Resultado]:
+    """Búsqueda de texto en intervenciones, por relevancia"""
+    return await ejecutar(
+        db, busqueda.buscar_intervenciones, texto, limit=limit, cursor=cursor, equipo_id=equipo_id
+    )
+
+
+# ==================== CAMBIOS ====================
+
+async def obtener_cambios(
+    db: DbSession,
+    since: Optional[datetime],
+    hasta: datetime,
+    posiciones: dict,
+    limit: int = 100
+) -> Tuple[dict, dict]:
+    """Una página de cambios de cada fuente pendiente"""
+    return await ejecutar(db, crud.obtener_cambios, since, hasta, posiciones, limit=limit)
+
+
+async def obtener_estadisticas_equipos(db: DbSession) -> dict:
+    """Obtener estadísticas de equipos y mantenimientos"""
+    return await ejecutar(db, crud.obtener_estadisticas_equipos)
@@ -2,32 +2,102 @@
 Dependencias FastAPI
 """
 
+import hashlib
+import os
+from typing import Optional
+
 from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthCredentials
-from sqlalchemy.orm import Session
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+
+from . import schemas, crud, crud_async
+from .cache import CacheTTL
+from .crud_async import DbSession
+from .database import get_session
+from .auth import verify_token, token_revocado
 
-from . import schemas, crud
-from .database import get_db
-from .auth import verify_token
+# Modo de autenticación:
+# - "db": se consulta el usuario en cada petición
+# - "stateless": se confía en los claims del token hasta su expiración (sin consultas)
+# - "cache": el usuario validado se guarda en memoria durante AUTH_CACHE_TTL segundos
+AUTH_MODO = os.getenv("AUTH_MODO", "db")
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", 30))
+AUTH_CACHE_MAX = int(os.getenv("AUTH_CACHE_MAX", 10000))
+
+# Claims necesarios para reconstruir el usuario sin consultar la BD
+CLAIMS_USUARIO = ("email", "rol", "nombre", "fecha_creacion", "fecha_actualizacion")
 
 security = HTTPBearer()
 
+# Usuarios validados por (usuario_id, hash del token), por proceso
+cache_usuarios = CacheTTL(max_entradas=AUTH_CACHE_MAX, ttl_segundos=AUTH_CACHE_TTL)
+
+
+def _invalidar_usuario_cache(accion: str, usuario) -> None:
+    """Descartar las entradas cacheadas de un usuario modificado"""
+    cache_usuarios.invalidar_donde(lambda clave: clave[0] == usuario.id)
+
+
+crud.registrar_observador("usuario", _invalidar_usuario_cache)
+
+
+def usuario_desde_token(token_data: dict) -> Optional[schemas.UsuarioResponse]:
+    """
+    Construir el usuario a partir de los claims del token
+    Retorna None si el token no trae todos los claims (emitido por una versión anterior)
+    """
+    if token_revocado(token_data["user_id"], token_data["iat"]):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revocado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    if not all(token_data.get(claim) for claim in CLAIMS_USUARIO):
+        return None
+    
+    return schemas.UsuarioResponse(
+        id=token_data["user_id"],
+        email=token_data["email"],
+        nombre=token_data["nombre"],
+        rol=token_data["rol"],
+        activo=True,
+        fecha_creacion=token_data["fecha_creacion"],
+        fecha_actualizacion=token_data["fecha_actualizacion"]
+    )
+
 
 async def get_current_user(
-    credentials: HTTPAuthCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: DbSession = Depends(get_session)
 ) -> schemas.UsuarioResponse:
     """
     Obtener usuario actual desde token JWT
     Verifica que el token sea válido y el usuario exista
     """
-    token = credentials.credentials
-    
+    return await usuario_de_token(credentials.credentials, db)
+
+
+async def usuario_de_token(token: str, db: DbSession) -> schemas.UsuarioResponse:
+    """
+    Validar un token JWT y obtener su usuario (también para WebSocket, donde llega en ?token=)
+    Lanza HTTPException 401 si el token o el usuario no son válidos
+    """
     # Verificar token
     token_data = verify_token(token)
     
+    if AUTH_MODO == "stateless":
+        usuario_token = usuario_desde_token(token_data)
+        if usuario_token:
+            return usuario_token
+    
+    if AUTH_MODO == "cache":
+        clave_cache = (token_data["user_id"], hashlib.sha256(token.encode()).hexdigest())
+        usuario_cache = cache_usuarios.obtener(clave_cache)
+        if usuario_cache:
+            return usuario_cache
+    
     # Obtener usuario de base de datos
-    usuario = crud.obtener_usuario_por_id(db, token_data["user_id"])
+    usuario = await crud_async.obtener_usuario_por_id(db, token_data["user_id"])
     
     if not usuario:
         raise HTTPException(
@@ -41,7 +111,12 @@ async def get_current_user(
             detail="Usuario inactivo"
         )
     
-    return schemas.UsuarioResponse.from_orm(usuario)
+    usuario_response = schemas.UsuarioResponse.from_orm(usuario)
+    
+    if AUTH_MODO == "cache":
+        cache_usuarios.guardar(clave_cache, usuario_response)
+    
+    return usuario_response
 
 
 async def get_current_admin(
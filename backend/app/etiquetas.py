@@ -0,0 +1,306 @@
+"""
+Hojas de etiquetas QR (PDF multipágina o ZIP de PNG)
+Las imágenes se generan en paralelo en un pool de procesos y la salida se
+produce en streaming: solo hay en memoria los lotes en vuelo y la página actual
+"""
+
+import os
+import re
+import struct
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from . import qr_gen
+
+# Procesos que renderizan QR (default: núcleos de CPU)
+ETIQUETAS_WORKERS = int(os.getenv("ETIQUETAS_WORKERS", str(os.cpu_count() or 1)))
+
+# Códigos por tarea enviada al pool
+ETIQUETAS_LOTE = int(os.getenv("ETIQUETAS_LOTE", "32"))
+
+FORMATOS = ("pdf", "zip")
+
+# Página A4 en puntos, grilla de etiquetas
+ANCHO_PAGINA, ALTO_PAGINA = 595, 842
+MARGEN = 36
+COLUMNAS, FILAS = 3, 5
+TAMANO_TEXTO = 9
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+_metricas_lock = threading.Lock()
+_metricas = {"generadas": 0, "segundos": 0.0}
+
+
+def _obtener_pool() -> ProcessPoolExecutor:
+    """Pool de procesos creado en el primer uso"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=ETIQUETAS_WORKERS)
+        return _pool
+
+
+def _renderizar(codigos: List[str], tamaño: int) -> List[bytes]:
+    """Tarea del pool: PNG de cada código (usa la cache en disco de qr_gen si está configurada)"""
+    return [qr_gen.obtener_qr(codigo, tamaño) for codigo in codigos]
+
+
+def generar_imagenes(codigos: Iterable[str], tamaño: int = 10) -> Iterator[Tuple[str, bytes]]:
+    """
+    PNG de cada código en el mismo orden, renderizados en paralelo
+
+    Mantiene como máximo 2 lotes en vuelo por proceso para no acumular imágenes
+    si el consumidor (la conexión del cliente) es más lento que el pool
+    """
+    pool = _obtener_pool()
+    en_vuelo = deque()
+    bloque: List[str] = []
+
+    def enviar():
+        en_vuelo.append((list(bloque), pool.submit(_renderizar, list(bloque), tamaño)))
+        bloque.clear()
+
+    try:
+        for codigo in codigos:
+            bloque.append(codigo)
+            if len(bloque) == ETIQUETAS_LOTE:
+                enviar()
+                if len(en_vuelo) >= 2 * ETIQUETAS_WORKERS:
+                    listos, futuro = en_vuelo.popleft()
+                    yield from zip(listos, futuro.result())
+
+        if bloque:
+            enviar()
+        while en_vuelo:
+            listos, futuro = en_vuelo.popleft()
+            yield from zip(listos, futuro.result())
+    finally:
+        # Cliente desconectado: descartar el trabajo pendiente
+        for _, futuro in en_vuelo:
+            futuro.cancel()
+
+
+def _medir(salida: Iterator[bytes], cantidad: int) -> Iterator[bytes]:
+    """Registrar etiquetas generadas y tiempo total al terminar la salida"""
+    inicio = time.perf_counter()
+    yield from salida
+    with _metricas_lock:
+        _metricas["generadas"] += cantidad
+        _metricas["segundos"] += time.perf_counter() - inicio
+
+
+def obtener_metricas_etiquetas() -> dict:
+    """Etiquetas generadas y rendimiento acumulado (etiquetas/seg)"""
+    with _metricas_lock:
+        segundos = _metricas["segundos"]
+        return {
+            "workers": ETIQUETAS_WORKERS,
+            "generadas": _metricas["generadas"],
+            "segundos": round(segundos, 3),
+            "por_segundo": round(_metricas["generadas"] / segundos, 1) if segundos else None,
+        }
+
+
+# ==================== ZIP ====================
+
+class _SalidaEnMemoria:
+    """Destino no posicionable para zipfile: acumula lo escrito hasta vaciarlo"""
+
+    def __init__(self):
+        self._partes: List[bytes] = []
+
+    def write(self, datos: bytes) -> int:
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self) -> None:
+        pass
+
+    def vaciar(self) -> bytes:
+        datos = b"".join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+def _nombre_archivo(indice: int, codigo: str) -> str:
+    """Nombre seguro dentro del ZIP, con el orden de impresión como prefijo"""
+    return f"{indice:05d}_{re.sub(r'[^A-Za-z0-9._-]', '_', codigo)}.png"
+
+
+def zip_etiquetas(codigos: List[str], tamaño: int = 10) -> Iterator[bytes]:
+    """ZIP (sin comprimir: los PNG ya lo están) emitido archivo por archivo"""
+    def generar():
+        salida = _SalidaEnMemoria()
+        with zipfile.ZipFile(salida, "w", compression=zipfile.ZIP_STORED) as archivo:
+            for indice, (codigo, imagen) in enumerate(generar_imagenes(codigos, tamaño), start=1):
+                archivo.writestr(_nombre_archivo(indice, codigo), imagen)
+                yield salida.vaciar()
+        yield salida.vaciar()
+
+    return _medir(generar(), len(codigos))
+
+
+# ==================== PDF ====================
+
+def _leer_png(png: bytes) -> Tuple[int, int, int, int, bytes]:
+    """
+    Ancho, alto, bits por componente, componentes de color y datos IDAT de un PNG
+
+    Los datos IDAT son un flujo zlib con los filtros de PNG, que PDF decodifica
+    directamente con FlateDecode + Predictor 15: la imagen no se recodifica
+    """
+    posicion = 8
+    idat = []
+    encabezado = None
+    while posicion < len(png):
+        (largo,) = struct.unpack(">I", png[posicion:posicion + 4])
+        tipo = png[posicion + 4:posicion + 8]
+        datos = png[posicion + 8:posicion + 8 + largo]
+        if tipo == b"IHDR":
+            encabezado = struct.unpack(">IIBBBBB", datos)
+        elif tipo == b"IDAT":
+            idat.append(datos)
+        posicion += 12 + largo
+
+    ancho, alto, profundidad, tipo_color, _, _, entrelazado = encabezado
+    componentes = {0: 1, 2: 3}.get(tipo_color)
+    if componentes is None or entrelazado:
+        raise ValueError("PNG no soportado: se espera escala de grises o RGB sin entrelazar")
+    return ancho, alto, profundidad, componentes, b"".join(idat)
+
+
+def _texto_pdf(texto: str) -> str:
+    """Escapar un texto para un literal de string PDF"""
+    texto = texto.encode("cp1252", errors="replace").decode("latin-1")
+    return texto.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+class _EscritorPDF:
+    """Escribe objetos PDF llevando los desplazamientos para la tabla xref final"""
+
+    CATALOGO, PAGINAS, FUENTE = 1, 2, 3
+
+    def __init__(self):
+        self.posicion = 0
+        self.desplazamientos = {}
+        self.siguiente = 4
+        self.paginas: List[int] = []
+
+    def numero(self) -> int:
+        numero = self.siguiente
+        self.siguiente += 1
+        return numero
+
+    def crudo(self, datos: bytes) -> bytes:
+        self.posicion += len(datos)
+        return datos
+
+    def objeto(self, numero: int, diccionario: str, flujo: Optional[bytes] = None) -> bytes:
+        self.desplazamientos[numero] = self.posicion
+        if flujo is None:
+            return self.crudo(f"{numero} 0 obj\n{diccionario}\nendobj\n".encode())
+        return self.crudo(
+            f"{numero} 0 obj\n{diccionario}\nstream\n".encode() + flujo + b"\nendstream\nendobj\n"
+        )
+
+    def pagina(self, etiquetas: List[Tuple[str, bytes]]) -> bytes:
+        """Imágenes, contenido y objeto de una página de la grilla"""
+        partes = []
+        recursos = []
+        contenido = []
+
+        ancho_celda = (ANCHO_PAGINA - 2 * MARGEN) / COLUMNAS
+        alto_celda = (ALTO_PAGINA - 2 * MARGEN) / FILAS
+        lado = min(ancho_celda, alto_celda - 2 * TAMANO_TEXTO) - 8
+
+        for posicion, (codigo, png) in enumerate(etiquetas):
+            ancho, alto, profundidad, componentes, datos = _leer_png(png)
+            imagen = self.numero()
+            espacio = "/DeviceGray" if componentes == 1 else "/DeviceRGB"
+            partes.append(self.objeto(
+                imagen,
+                f"<< /Type /XObject /Subtype /Image /Width {ancho} /Height {alto} "
+                f"/ColorSpace {espacio} /BitsPerComponent {profundidad} /Filter /FlateDecode "
+                f"/DecodeParms << /Predictor 15 /Colors {componentes} "
+                f"/BitsPerComponent {profundidad} /Columns {ancho} >> /Length {len(datos)} >>",
+                datos
+            ))
+            recursos.append(f"/Im{posicion} {imagen} 0 R")
+
+            columna, fila = posicion % COLUMNAS, posicion // COLUMNAS
+            x = MARGEN + columna * ancho_celda + (ancho_celda - lado) / 2
+            y = ALTO_PAGINA - MARGEN - (fila + 1) * alto_celda + 2 * TAMANO_TEXTO
+            ancho_texto = len(codigo) * TAMANO_TEXTO * 0.5
+            texto_x = MARGEN + columna * ancho_celda + (ancho_celda - ancho_texto) / 2
+            contenido.append(
+                f"q {lado:.2f} 0 0 {lado:.2f} {x:.2f} {y:.2f} cm /Im{posicion} Do Q\n"
+                f"BT /F1 {TAMANO_TEXTO} Tf {texto_x:.2f} {y - TAMANO_TEXTO - 2:.2f} Td "
+                f"({_texto_pdf(codigo)}) Tj ET\n"
+            )
+
+        flujo = "".join(contenido).encode()
+        numero_contenido = self.numero()
+        partes.append(self.objeto(numero_contenido, f"<< /Length {len(flujo)} >>", flujo))
+
+        numero_pagina = self.numero()
+        self.paginas.append(numero_pagina)
+        partes.append(self.objeto(
+            numero_pagina,
+            f"<< /Type /Page /Parent {self.PAGINAS} 0 R /MediaBox [0 0 {ANCHO_PAGINA} {ALTO_PAGINA}] "
+            f"/Resources << /Font << /F1 {self.FUENTE} 0 R >> /XObject << {' '.join(recursos)} >> >> "
+            f"/Contents {numero_contenido} 0 R >>"
+        ))
+        return b"".join(partes)
+
+    def cierre(self) -> bytes:
+        """Árbol de páginas, catálogo, xref y trailer"""
+        kids = " ".join(f"{n} 0 R" for n in self.paginas)
+        partes = [
+            self.objeto(self.PAGINAS, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.paginas)} >>"),
+            self.objeto(self.CATALOGO, f"<< /Type /Catalog /Pages {self.PAGINAS} 0 R >>"),
+        ]
+        inicio_xref = self.posicion
+        filas = [f"xref\n0 {self.siguiente}\n0000000000 65535 f \n"]
+        filas += [f"{self.desplazamientos[n]:010d} 00000 n \n" for n in range(1, self.siguiente)]
+        filas.append(f"trailer\n<< /Size {self.siguiente} /Root {self.CATALOGO} 0 R >>\n")
+        filas.append(f"startxref\n{inicio_xref}\n%%EOF\n")
+        partes.append(self.crudo("".join(filas).encode()))
+        return b"".join(partes)
+
+
+def pdf_etiquetas(codigos: List[str], tamaño: int = 10) -> Iterator[bytes]:
+    """PDF A4 con una grilla de etiquetas por página, emitido página por página"""
+    def generar():
+        pdf = _EscritorPDF()
+        yield pdf.crudo(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        yield pdf.objeto(
+            pdf.FUENTE,
+            "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"
+        )
+
+        por_pagina = COLUMNAS * FILAS
+        pagina: List[Tuple[str, bytes]] = []
+        for etiqueta in generar_imagenes(codigos, tamaño):
+            pagina.append(etiqueta)
+            if len(pagina) == por_pagina:
+                yield pdf.pagina(pagina)
+                pagina = []
+        if pagina:
+            yield pdf.pagina(pagina)
+
+        yield pdf.cierre()
+
+    return _medir(generar(), len(codigos))
+
+
+def generar_hoja(codigos: List[str], formato: str, tamaño: int = 10) -> Iterator[bytes]:
+    """Hoja de etiquetas en el formato pedido (pdf o zip)"""
+    if formato == "zip":
+        return zip_etiquetas(codigos, tamaño)
+    return pdf_etiquetas(codigos, tamaño)
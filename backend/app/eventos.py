@@ -0,0 +1,247 @@
+"""
+Eventos en vivo de intervenciones y equipos (SSE y WebSocket)
+crud notifica los cambios a sus observadores; este módulo los convierte en
+eventos y los reparte a las conexiones suscritas a través de un broker.
+
+Cada conexión tiene una cola acotada con coalescencia: si llegan varios eventos
+de la misma entidad antes de que el cliente lea, solo se entrega el último.
+Una conexión que acumula más de EVENTOS_COLA_MAX entidades pendientes recibe
+un evento "resync" (debe volver a sincronizar con /api/cambios) en lugar de
+frenar al resto.
+"""
+
+import asyncio
+import itertools
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, FrozenSet, List, Optional, Set
+
+import orjson
+
+from . import crud, schemas
+
+# Entidades distintas pendientes por conexión antes de descartarlas y pedir resync
+EVENTOS_COLA_MAX = int(os.getenv("EVENTOS_COLA_MAX", "1000"))
+# Segundos sin eventos tras los que se envía un ping (mantiene vivos proxies y detecta cortes)
+EVENTOS_HEARTBEAT = float(os.getenv("EVENTOS_HEARTBEAT", "15"))
+
+TIPOS_EVENTO = ("intervencion", "equipo", "estadisticas")
+
+RESYNC = {"tipo": "resync"}
+
+
+class Suscripcion:
+    """Cola de eventos de una conexión, con coalescencia por entidad"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, tipos: Optional[FrozenSet[str]] = None,
+                 max_pendientes: int = EVENTOS_COLA_MAX):
+        self.loop = loop
+        self.tipos = tipos
+        self.max_pendientes = max_pendientes
+        self._pendientes: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._hay_eventos = asyncio.Event()
+        self.coalescidos = 0
+        self.desbordes = 0
+
+    def entregar(self, evento: dict) -> None:
+        """Encolar un evento (en el hilo del event loop de la conexión)"""
+        if self.tipos is not None and evento["tipo"] not in self.tipos:
+            return
+
+        clave = (evento["tipo"], evento.get("id"))
+        if clave in self._pendientes:
+            # Conserva la posición del primero y el contenido del último
+            self._pendientes[clave] = evento
+            self.coalescidos += 1
+        elif len(self._pendientes) >= self.max_pendientes:
+            self._pendientes.clear()
+            self._pendientes[("resync", None)] = RESYNC
+            self.desbordes += 1
+        else:
+            self._pendientes[clave] = evento
+        self._hay_eventos.set()
+
+    async def esperar(self, timeout: Optional[float] = None) -> List[dict]:
+        """Todos los eventos pendientes; lista vacía si pasa `timeout` sin eventos"""
+        if not self._pendientes:
+            try:
+                await asyncio.wait_for(self._hay_eventos.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+
+        eventos = list(self._pendientes.values())
+        self._pendientes.clear()
+        self._hay_eventos.clear()
+        return eventos
+
+
+class Broker(ABC):
+    """
+    Interfaz de pub/sub de eventos
+    Otra implementación (por ejemplo sobre Redis) permite repartir entre varios workers
+    """
+
+    @abstractmethod
+    def publicar(self, evento: dict) -> None:
+        """Publicar un evento; se puede llamar desde cualquier hilo y nunca bloquea"""
+
+    @abstractmethod
+    def suscribir(self, tipos: Optional[FrozenSet[str]] = None) -> Suscripcion:
+        """Crear la suscripción de una conexión (desde su event loop)"""
+
+    @abstractmethod
+    def desuscribir(self, suscripcion: Suscripcion) -> None:
+        """Dar de baja una suscripción"""
+
+    @abstractmethod
+    def tiene_suscriptores(self) -> bool:
+        """Si hay alguien escuchando (para no construir eventos en vano)"""
+
+    def estadisticas(self) -> dict:
+        return {}
+
+
+class BrokerMemoria(Broker):
+    """Broker en el proceso: reparte a las conexiones atendidas por este worker"""
+
+    def __init__(self):
+        self._por_loop: Dict[asyncio.AbstractEventLoop, Set[Suscripcion]] = {}
+        self._lock = threading.Lock()
+        self._secuencia = itertools.count(1)
+        self.publicados = 0
+
+    def publicar(self, evento: dict) -> None:
+        with self._lock:
+            destinos = [(loop, tuple(suscripciones)) for loop, suscripciones in self._por_loop.items()]
+        if not destinos:
+            return
+
+        evento["secuencia"] = next(self._secuencia)
+        self.publicados += 1
+        # Una sola llamada por event loop, no una por conexión
+        for loop, suscripciones in destinos:
+            try:
+                loop.call_soon_threadsafe(_repartir, suscripciones, evento)
+            except RuntimeError:
+                # El loop ya se cerró: sus conexiones no volverán a leer
+                pass
+
+    def suscribir(self, tipos: Optional[FrozenSet[str]] = None) -> Suscripcion:
+        suscripcion = Suscripcion(asyncio.get_running_loop(), tipos)
+        with self._lock:
+            self._por_loop.setdefault(suscripcion.loop, set()).add(suscripcion)
+        return suscripcion
+
+    def desuscribir(self, suscripcion: Suscripcion) -> None:
+        with self._lock:
+            suscripciones = self._por_loop.get(suscripcion.loop)
+            if suscripciones is not None:
+                suscripciones.discard(suscripcion)
+                if not suscripciones:
+                    del self._por_loop[suscripcion.loop]
+
+    def tiene_suscriptores(self) -> bool:
+        return bool(self._por_loop)
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            suscripciones = [s for grupo in self._por_loop.values() for s in grupo]
+        return {
+            "suscripciones": len(suscripciones),
+            "publicados": self.publicados,
+            "coalescidos": sum(s.coalescidos for s in suscripciones),
+            "desbordes": sum(s.desbordes for s in suscripciones),
+        }
+
+
+def _repartir(suscripciones, evento: dict) -> None:
+    for suscripcion in suscripciones:
+        suscripcion.entregar(evento)
+
+
+broker: Broker = BrokerMemoria()
+
+
+# ==================== PUBLICACIÓN DESDE CRUD ====================
+
+def _publicador(tipo: str, schema):
+    """Observador de crud que publica el estado de la entidad y la invalidación de estadísticas"""
+    def publicar(accion: str, objeto) -> None:
+        if not broker.tiene_suscriptores():
+            return
+        # Se serializa en el hilo de crud, con la entidad todavía cargada en la sesión
+        datos = None if accion == "eliminado" else schema.model_validate(objeto).model_dump(mode="json")
+        broker.publicar({"tipo": tipo, "accion": accion, "id": objeto.id, "datos": datos})
+        broker.publicar({"tipo": "estadisticas", "accion": "invalidado"})
+    return publicar
+
+
+crud.registrar_observador("intervencion", _publicador("intervencion", schemas.IntervencionResponse))
+crud.registrar_observador("equipo", _publicador("equipo", schemas.EquipoResponse))
+
+
+# ==================== FORMATOS ====================
+
+def leer_tipos(tipos: Optional[str]) -> Optional[FrozenSet[str]]:
+    """?tipos=intervencion,equipo; ValueError si alguno no existe"""
+    if not tipos:
+        return None
+    pedidos = frozenset(t.strip() for t in tipos.split(",") if t.strip())
+    desconocidos = pedidos - set(TIPOS_EVENTO)
+    if desconocidos:
+        raise ValueError(
+            f"Tipo de evento inválido: {', '.join(sorted(desconocidos))}. Opciones: {', '.join(TIPOS_EVENTO)}"
+        )
+    return pedidos
+
+
+def codificar(evento: dict) -> bytes:
+    """Evento como JSON (sin la secuencia interna)"""
+    return orjson.dumps({k: v for k, v in evento.items() if k != "secuencia"})
+
+
+def formato_sse(evento: dict) -> bytes:
+    """Mensaje text/event-stream"""
+    id_evento = f"id: {evento['secuencia']}\n".encode() if "secuencia" in evento else b""
+    return id_evento + f"event: {evento['tipo']}\n".encode() + b"data: " + codificar(evento) + b"\n\n"
+
+
+async def flujo_sse(tipos: Optional[FrozenSet[str]] = None) -> AsyncIterator[bytes]:
+    """Cuerpo de la respuesta SSE; la suscripción vive lo que dura la conexión"""
+    suscripcion = broker.suscribir(tipos)
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            eventos = await suscripcion.esperar(EVENTOS_HEARTBEAT)
+            # Cada yield espera a que el cliente lea: un cliente lento acumula (y coalesce) en su cola
+            yield b"".join(formato_sse(e) for e in eventos) if eventos else b": ping\n\n"
+    finally:
+        broker.desuscribir(suscripcion)
+
+
+async def atender_websocket(websocket, tipos: Optional[FrozenSet[str]] = None) -> None:
+    """Enviar los eventos por un WebSocket ya aceptado (un mensaje JSON por evento) hasta que se cierre"""
+
+    async def recibir_hasta_cierre():
+        # El cliente no envía nada; leer es la forma de enterarse del cierre sin esperar al ping
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    async def enviar():
+        while True:
+            eventos = await suscripcion.esperar(EVENTOS_HEARTBEAT)
+            for evento in eventos or [{"tipo": "ping"}]:
+                await websocket.send_text(codificar(evento).decode())
+
+    suscripcion = broker.suscribir(tipos)
+    tareas = [asyncio.create_task(recibir_hasta_cierre()), asyncio.create_task(enviar())]
+    try:
+        await asyncio.wait(tareas, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for tarea in tareas:
+            tarea.cancel()
+        # Un envío fallido es un cliente que se fue: se trata igual que el cierre
+        await asyncio.gather(*tareas, return_exceptions=True)
+        broker.desuscribir(suscripcion)
@@ -0,0 +1,133 @@
+"""
+Exportación en streaming del historial completo de intervenciones (NDJSON o CSV)
+Las filas se leen con yield_per (cursor del lado del servidor en PostgreSQL) y se
+emiten por bloques: la memoria no depende del tamaño de la tabla
+"""
+
+import csv
+import io
+import os
+from datetime import datetime
+from typing import AsyncIterator, Callable, Iterator, Optional, Sequence
+
+import orjson
+from sqlalchemy import Row, Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from . import models
+
+# Filas por bloque leído de la BD (y por escritura en la respuesta)
+EXPORTACION_LOTE = int(os.getenv("EXPORTACION_LOTE", "1000"))
+
+# formato -> media type
+FORMATOS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# Intervención con los datos del equipo y del tipo ya resueltos (sin objetos ORM)
+_COLUMNAS = (
+    models.Intervencion.id,
+    models.Intervencion.equipo_id,
+    models.Equipo.codigo_qr.label("equipo_codigo_qr"),
+    models.Equipo.nombre.label("equipo_nombre"),
+    models.Equipo.tipo.label("equipo_tipo"),
+    models.Equipo.ubicacion.label("equipo_ubicacion"),
+    models.Intervencion.tipo_id,
+    models.TipoIntervencion.nombre.label("tipo_nombre"),
+    models.Intervencion.usuario_id,
+    models.Intervencion.descripcion,
+    models.Intervencion.observaciones,
+    models.Intervencion.tiempo_duracion,
+    models.Intervencion.completada,
+    models.Intervencion.fecha_inicio,
+    models.Intervencion.fecha_fin,
+    models.Intervencion.fecha_creacion,
+    models.Intervencion.fecha_actualizacion,
+)
+
+COLUMNAS = [columna.key for columna in _COLUMNAS]
+
+
+def consulta_exportacion(since: Optional[datetime] = None) -> Select:
+    """
+    SELECT de la exportación ordenado por (fecha_actualizacion, id)
+    Con `since` solo entran las intervenciones modificadas desde ese instante (inclusive):
+    la siguiente extracción incremental parte de la última fecha_actualizacion recibida
+    """
+    consulta = (
+        select(*_COLUMNAS)
+        .select_from(models.Intervencion)
+        .join(models.Equipo, models.Intervencion.equipo_id == models.Equipo.id)
+        .join(models.TipoIntervencion, models.Intervencion.tipo_id == models.TipoIntervencion.id)
+        .order_by(models.Intervencion.fecha_actualizacion, models.Intervencion.id)
+        .execution_options(yield_per=EXPORTACION_LOTE)
+    )
+    if since is not None:
+        consulta = consulta.where(models.Intervencion.fecha_actualizacion >= since)
+    return consulta
+
+
+def _bloque_ndjson(filas: Sequence[Row]) -> bytes:
+    """Un objeto JSON por fila"""
+    return b"".join(orjson.dumps(fila._asdict()) + b"\n" for fila in filas)
+
+
+def _valor_csv(valor):
+    """Fechas en ISO 8601 como en el NDJSON; None como celda vacía"""
+    return valor.isoformat() if isinstance(valor, datetime) else valor
+
+
+def _bloque_csv(filas: Sequence[Row]) -> bytes:
+    """Filas CSV (sin encabezado)"""
+    salida = io.StringIO()
+    csv.writer(salida).writerows([_valor_csv(v) for v in fila] for fila in filas)
+    return salida.getvalue().encode()
+
+
+def _encabezado_csv() -> bytes:
+    salida = io.StringIO()
+    csv.writer(salida).writerow(COLUMNAS)
+    return salida.getvalue().encode()
+
+
+_CODIFICADORES: dict[str, Callable[[Sequence[Row]], bytes]] = {
+    "ndjson": _bloque_ndjson,
+    "csv": _bloque_csv,
+}
+
+
+def exportar_intervenciones(
+    db: Session,
+    formato: str,
+    since: Optional[datetime] = None
+) -> Iterator[bytes]:
+    """Bloques del archivo exportado; la consulta se ejecuta al pedir el primero"""
+    codificar = _CODIFICADORES[formato]
+    resultado = db.execute(consulta_exportacion(since))
+    try:
+        if formato == "csv":
+            yield _encabezado_csv()
+        for particion in resultado.partitions():
+            yield codificar(particion)
+    finally:
+        # Si el cliente corta la descarga se libera el cursor
+        resultado.close()
+
+
+async def exportar_intervenciones_async(
+    db: AsyncSession,
+    formato: str,
+    since: Optional[datetime] = None
+) -> AsyncIterator[bytes]:
+    """Igual que exportar_intervenciones sobre AsyncSession.stream"""
+    codificar = _CODIFICADORES[formato]
+    resultado = await db.stream(consulta_exportacion(since))
+    try:
+        if formato == "csv":
+            yield _encabezado_csv()
+        async for particion in resultado.partitions():
+            yield codificar(particion)
+    finally:
+        await resultado.close()
@@ -0,0 +1,137 @@
+"""
+Importación masiva de equipos desde CSV o NDJSON
+El archivo se recorre en streaming: nunca se carga completo en memoria
+"""
+
+import codecs
+import csv
+import json
+import os
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from . import crud, schemas
+
+# Filas por transacción
+IMPORTACION_LOTE = int(os.getenv("IMPORTACION_LOTE", "5000"))
+
+FORMATOS = ("csv", "ndjson")
+
+# Extensiones y content types reconocidos para deducir el formato
+_EXTENSIONES = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+ARCHIVO_ILEGIBLE = "Archivo ilegible: se espera texto UTF-8"
+
+# (número de fila, datos, error de lectura)
+Fila = Tuple[int, Optional[dict], Optional[str]]
+
+
+def detectar_formato(nombre: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    """Deducir el formato por la extensión del archivo o su content type"""
+    extension = os.path.splitext(nombre or "")[1].lower()
+    if extension in _EXTENSIONES:
+        return _EXTENSIONES[extension]
+    return _CONTENT_TYPES.get((content_type or "").split(";")[0].strip().lower())
+
+
+def _filas_csv(archivo: BinaryIO) -> Iterator[Fila]:
+    """Filas del CSV como dicts; las celdas vacías se toman como ausentes"""
+    texto = codecs.getreader("utf-8-sig")(archivo)
+    try:
+        for numero, fila in enumerate(csv.DictReader(texto), start=1):
+            yield numero, {k: v for k, v in fila.items() if k and v not in (None, "")}, None
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ValueError(ARCHIVO_ILEGIBLE) from e
+
+
+def _filas_ndjson(archivo: BinaryIO) -> Iterator[Fila]:
+    """Un objeto JSON por línea; las líneas en blanco se ignoran"""
+    try:
+        for numero, linea in enumerate(codecs.getreader("utf-8-sig")(archivo), start=1):
+            if not linea.strip():
+                continue
+            try:
+                datos = json.loads(linea)
+            except ValueError:
+                yield numero, None, "JSON inválido"
+                continue
+            if not isinstance(datos, dict):
+                yield numero, None, "Se esperaba un objeto JSON"
+                continue
+            yield numero, datos, None
+    except UnicodeDecodeError as e:
+        raise ValueError(ARCHIVO_ILEGIBLE) from e
+
+
+def _mensaje_validacion(error: ValidationError) -> str:
+    """Resumir los errores de pydantic en una línea"""
+    return "; ".join(
+        f"{'.'.join(str(parte) for parte in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
+
+
+def importar_equipos(
+    db: Session,
+    archivo: BinaryIO,
+    formato: str,
+    tamano_lote: int = IMPORTACION_LOTE
+) -> schemas.ImportacionResponse:
+    """
+    Validar e insertar equipos por lotes, una transacción por lote
+
+    Las filas inválidas, con QR repetido en el archivo o ya existente en la BD
+    no detienen la importación: se informan en `errores` con su número de fila.
+    Un archivo ilegible lanza ValueError; los lotes anteriores quedan confirmados
+    """
+    filas = _filas_csv(archivo) if formato == "csv" else _filas_ndjson(archivo)
+
+    total = 0
+    insertados = 0
+    errores: List[schemas.ErrorImportacion] = []
+    vistos = set()
+    lote: Dict[str, Tuple[int, schemas.EquipoCreate]] = {}
+
+    def procesar_lote() -> int:
+        nuevos = set(crud.insertar_equipos_lote(db, [equipo for _, equipo in lote.values()]))
+        for codigo_qr, (numero, _) in lote.items():
+            if codigo_qr not in nuevos:
+                errores.append(schemas.ErrorImportacion(
+                    fila=numero, codigo_qr=codigo_qr, error="El código QR ya existe"
+                ))
+        lote.clear()
+        return len(nuevos)
+
+    for numero, datos, error in filas:
+        total += 1
+        codigo_qr = datos.get("codigo_qr") if datos else None
+        codigo_qr = codigo_qr if isinstance(codigo_qr, str) else None
+
+        if error is None:
+            try:
+                equipo = schemas.EquipoCreate(**datos)
+            except ValidationError as e:
+                error = _mensaje_validacion(e)
+            else:
+                if equipo.codigo_qr in vistos:
+                    error = "Código QR repetido en el archivo"
+                else:
+                    vistos.add(equipo.codigo_qr)
+                    lote[equipo.codigo_qr] = (numero, equipo)
+
+        if error is not None:
+            errores.append(schemas.ErrorImportacion(fila=numero, codigo_qr=codigo_qr, error=error))
+
+        if len(lote) >= tamano_lote:
+            insertados += procesar_lote()
+
+    insertados += procesar_lote()
+    errores.sort(key=lambda e: e.fila)
+
+    return schemas.ImportacionResponse(total_filas=total, insertados=insertados, errores=errores)
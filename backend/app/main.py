@@ -2,17 +2,18 @@
 Aplicación FastAPI - Sistema de Mantenimiento Industrial para Bodegas
 """
 
-from fastapi import FastAPI, Depends, HTTPException, status, Query
+from fastapi import FastAPI, Depends, HTTPException, status, Query, Response, UploadFile, File, Header, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from datetime import timedelta
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
 
-from . import crud, schemas
-from .database import engine, Base, get_db
-from .auth import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
-from .deps import get_current_user, get_current_admin, get_current_tecnico
-from .qr_gen import generar_qr_base64
+from . import cache_equipos, crud, crud_async, etiquetas, eventos, exportacion, importacion, paginacion, qr_gen, respuestas, schemas
+from .crud_async import DbSession
+from .database import engine, Base, get_db, get_session
+from .auth import create_access_token, obtener_metricas_hash, ACCESS_TOKEN_EXPIRE_MINUTES
+from .deps import get_current_user, get_current_admin, get_current_tecnico, cache_usuarios, usuario_de_token
 
 # Crear tablas
 Base.metadata.create_all(bind=engine)
@@ -21,7 +22,9 @@ Base.metadata.create_all(bind=engine)
 app = FastAPI(
     title="Sistema de Mantenimiento Industrial",
     description="API para gestión de mantenimiento de equipos en bodegas",
-    version="1.0.0"
+    version="1.0.0",
+    # Los dicts que devuelven las rutas se codifican con orjson
+    default_response_class=ORJSONResponse
 )
 
 # Configurar CORS
@@ -31,22 +34,117 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Total-Etiquetas"],
 )
 
+# Las imágenes QR cacheadas de un equipo se descartan al modificarlo o eliminarlo
+crud.registrar_observador(
+    "equipo",
+    lambda accion, equipo: qr_gen.invalidar_qr(equipo.codigo_qr) if accion != "creado" else None
+)
+
+
+def leer_cursor(lector: Callable, cursor: Optional[str]):
+    """Decodificar el cursor recibido en ?cursor=, 400 si es inválido"""
+    if cursor is None:
+        return None
+    
+    try:
+        return lector(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def fecha_utc(fecha: Optional[datetime]) -> Optional[datetime]:
+    """Las columnas guardan UTC sin zona: convertir un ?since= con zona horaria"""
+    if fecha is None or fecha.tzinfo is None:
+        return fecha
+    return fecha.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def agregar_siguiente_cursor(response: Response, items: list, limit: int, generar: Callable) -> None:
+    """Enviar en X-Next-Cursor la posición de la siguiente página si la actual está completa"""
+    if len(items) == limit:
+        response.headers["X-Next-Cursor"] = generar(items[-1])
+
+
+def cursor_resultado(resultado: tuple) -> str:
+    """Cursor de búsqueda a partir de un resultado (entidad, puntaje)"""
+    entidad, puntaje = resultado
+    return paginacion.cursor_busqueda(puntaje, entidad.id)
+
+
+def etag_coincide(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparar el header If-None-Match (lista de ETags, débiles o '*') con el ETag actual"""
+    if not if_none_match:
+        return False
+    
+    candidatos = [e.strip() for e in if_none_match.split(",")]
+    return "*" in candidatos or etag in [e[2:] if e.startswith("W/") else e for e in candidatos]
+
+
+# Formatos del QR de un equipo y su media type
+TIPOS_QR = {"json": "application/json", "png": "image/png", "svg": "image/svg+xml"}
+
+
+def negociar_formato_qr(accept: Optional[str]) -> str:
+    """Elegir json, png o svg según el header Accept (con q-values); json si no hay preferencia"""
+    por_tipo = {tipo: formato for formato, tipo in TIPOS_QR.items()}
+    elegido, mejor_q = "json", 0.0
+    
+    for parte in (accept or "").split(","):
+        tipo, *parametros = [p.strip() for p in parte.split(";")]
+        q = 1.0
+        for parametro in parametros:
+            if parametro.startswith("q="):
+                try:
+                    q = float(parametro[2:])
+                except ValueError:
+                    q = 0.0
+        if tipo in por_tipo and q > mejor_q:
+            elegido, mejor_q = por_tipo[tipo], q
+    
+    return elegido
+
+
+def leer_expansiones(expand: Optional[str]) -> list[str]:
+    """Validar ?expand=equipo,usuario,tipo (400 si pide una relación desconocida)"""
+    if not expand:
+        return []
+
+    expandir = list(dict.fromkeys(p.strip() for p in expand.split(",") if p.strip()))
+    desconocidas = [p for p in expandir if p not in crud.RELACIONES_EXPANDIBLES]
+    if desconocidas:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Expansión inválida: {', '.join(desconocidas)}. "
+                   f"Opciones: {', '.join(crud.RELACIONES_EXPANDIBLES)}"
+        )
+    return expandir
+
+
+def intervencion_expandida(intervencion, expandir: list[str]) -> dict:
+    """Campos de una intervención más solo las relaciones ya cargadas por expand"""
+    datos = {campo: getattr(intervencion, campo) for campo in schemas.IntervencionResponse.model_fields}
+    for nombre in expandir:
+        atributo = crud.RELACIONES_EXPANDIBLES[nombre].key
+        datos[atributo] = getattr(intervencion, atributo)
+    return datos
+
 
 # ==================== RUTAS DE AUTENTICACIÓN ====================
 
 @app.post("/api/auth/login", response_model=schemas.TokenResponse)
 async def login(
     login_data: schemas.LoginRequest,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Login con email y contraseña
     Retorna JWT token y datos del usuario
     """
     # Autenticar usuario
-    usuario = crud.autenticar_usuario(db, login_data.email, login_data.password)
+    usuario = await crud_async.autenticar_usuario(db, login_data.email, login_data.password)
     
     if not usuario:
         raise HTTPException(
@@ -58,18 +156,21 @@ async def login(
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={
-            "sub": usuario.id,
+            "sub": str(usuario.id),
             "email": usuario.email,
-            "rol": usuario.rol
+            "rol": usuario.rol,
+            "nombre": usuario.nombre,
+            "fecha_creacion": usuario.fecha_creacion.isoformat(),
+            "fecha_actualizacion": usuario.fecha_actualizacion.isoformat()
         },
         expires_delta=access_token_expires
     )
     
-    return {
+    return respuestas.json_de(schemas.TokenResponse, {
         "access_token": access_token,
         "token_type": "bearer",
-        "usuario": schemas.UsuarioResponse.from_orm(usuario)
-    }
+        "usuario": usuario
+    })
 
 
 @app.get("/api/auth/me", response_model=schemas.UsuarioResponse)
@@ -79,7 +180,7 @@ async def obtener_usuario_actual(
     """
     Obtener datos del usuario actual autenticado
     """
-    return current_user
+    return respuestas.json_de(schemas.UsuarioResponse, current_user)
 
 
 # ==================== RUTAS DE USUARIOS ====================
@@ -89,25 +190,25 @@ async def obtener_usuarios(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     current_user: schemas.UsuarioResponse = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Obtener lista de usuarios (solo ADMIN)
     """
-    usuarios = crud.obtener_todos_usuarios(db, skip=skip, limit=limit)
-    return [schemas.UsuarioResponse.from_orm(u) for u in usuarios]
+    usuarios = await crud_async.obtener_todos_usuarios(db, skip=skip, limit=limit)
+    return respuestas.json_de(list[schemas.UsuarioResponse], usuarios)
 
 
 @app.get("/api/usuarios/{usuario_id}", response_model=schemas.UsuarioResponse)
 async def obtener_usuario(
     usuario_id: int,
     current_user: schemas.UsuarioResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Obtener usuario por ID
     """
-    usuario = crud.obtener_usuario_por_id(db, usuario_id)
+    usuario = await crud_async.obtener_usuario_por_id(db, usuario_id)
     
     if not usuario:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
@@ -119,21 +220,21 @@ async def obtener_usuario(
             detail="No tienes permisos para ver este usuario"
         )
     
-    return schemas.UsuarioResponse.from_orm(usuario)
+    return respuestas.json_de(schemas.UsuarioResponse, usuario)
 
 
 @app.post("/api/usuarios", response_model=schemas.UsuarioResponse)
 async def crear_usuario(
     usuario_create: schemas.UsuarioCreate,
     current_user: schemas.UsuarioResponse = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Crear nuevo usuario (solo ADMIN)
     """
     try:
-        usuario = crud.crear_usuario(db, usuario_create)
-        return schemas.UsuarioResponse.from_orm(usuario)
+        usuario = await crud_async.crear_usuario(db, usuario_create)
+        return respuestas.json_de(schemas.UsuarioResponse, usuario)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -143,7 +244,7 @@ async def actualizar_usuario(
     usuario_id: int,
     usuario_update: schemas.UsuarioUpdate,
     current_user: schemas.UsuarioResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Actualizar usuario
@@ -155,24 +256,24 @@ async def actualizar_usuario(
             detail="No tienes permisos para actualizar este usuario"
         )
     
-    usuario = crud.actualizar_usuario(db, usuario_id, usuario_update)
+    usuario = await crud_async.actualizar_usuario(db, usuario_id, usuario_update)
     
     if not usuario:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     
-    return schemas.UsuarioResponse.from_orm(usuario)
+    return respuestas.json_de(schemas.UsuarioResponse, usuario)
 
 
 @app.delete("/api/usuarios/{usuario_id}")
 async def eliminar_usuario(
     usuario_id: int,
     current_user: schemas.UsuarioResponse = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Eliminar usuario (solo ADMIN)
     """
-    success = crud.eliminar_usuario(db, usuario_id)
+    success = await crud_async.eliminar_usuario(db, usuario_id)
     
     if not success:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
@@ -188,68 +289,164 @@ async def obtener_equipos(
     limit: int = Query(10, ge=1, le=100),
     tipo: str = Query(None),
     ubicacion: str = Query(None),
+    cursor: str = Query(None),
+    response: Response = None,
     current_user: schemas.UsuarioResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Obtener lista de equipos con filtros opcionales
+    Paginación por offset (skip) o por cursor (header X-Next-Cursor de la página anterior)
     """
-    equipos = crud.obtener_todos_equipos(
+    equipos = await crud_async.obtener_todos_equipos(
         db,
         skip=skip,
         limit=limit,
         tipo=tipo,
-        ubicacion=ubicacion
+        ubicacion=ubicacion,
+        cursor=leer_cursor(paginacion.leer_cursor_equipo, cursor)
+    )
+    agregar_siguiente_cursor(response, equipos, limit, paginacion.cursor_equipo)
+    return respuestas.json_de(list[schemas.EquipoResponse], equipos, headers=response.headers)
+
+
+@app.get("/api/equipos/buscar", response_model=list[schemas.EquipoResponse])
+async def buscar_equipos(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str = Query(None),
+    response: Response = None,
+    current_user: schemas.UsuarioResponse = Depends(get_current_user),
+    db: DbSession = Depends(get_session)
+):
+    """
+    Buscar equipos activos por nombre, modelo, serie, fabricante o descripción
+    Resultados por relevancia; la página siguiente con el header X-Next-Cursor
+    """
+    resultados = await crud_async.buscar_equipos(
+        db, q, limit=limit, cursor=leer_cursor(paginacion.leer_cursor_busqueda, cursor)
+    )
+    agregar_siguiente_cursor(response, resultados, limit, cursor_resultado)
+    return respuestas.json_de(
+        list[schemas.EquipoResponse], [equipo for equipo, _ in resultados], headers=response.headers
+    )
+
+
+@app.get("/api/equipos/etiquetas")
+async def generar_etiquetas(
+    formato: str = Query("pdf", description="pdf (hoja A4) o zip (un PNG por equipo)"),
+    ubicacion: str = Query(None),
+    tipo: str = Query(None),
+    ids: str = Query(None, description="Ids de equipo separados por coma"),
+    current_user: schemas.UsuarioResponse = Depends(get_current_tecnico),
+    db: DbSession = Depends(get_session)
+):
+    """
+    Hoja de etiquetas QR de los equipos activos que cumplen el filtro (TECNICO o ADMIN)
+    Las imágenes se generan en paralelo y la respuesta se envía en streaming
+    """
+    if formato not in etiquetas.FORMATOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Formato no soportado. Opciones: {', '.join(etiquetas.FORMATOS)}"
+        )
+
+    lista_ids = None
+    if ids:
+        try:
+            lista_ids = [int(i) for i in ids.split(",") if i.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ids debe ser una lista de enteros separados por coma")
+
+    codigos = await crud_async.obtener_codigos_qr(db, tipo=tipo, ubicacion=ubicacion, ids=lista_ids)
+    if not codigos:
+        raise HTTPException(status_code=404, detail="No hay equipos para el filtro")
+
+    return StreamingResponse(
+        etiquetas.generar_hoja(codigos, formato),
+        media_type="application/pdf" if formato == "pdf" else "application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="etiquetas.{formato}"',
+            "X-Total-Etiquetas": str(len(codigos)),
+        }
     )
-    return [schemas.EquipoResponse.from_orm(e) for e in equipos]
 
 
 @app.get("/api/equipos/{equipo_id}", response_model=schemas.EquipoResponse)
 async def obtener_equipo(
     equipo_id: int,
     current_user: schemas.UsuarioResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
-    Obtener equipo por ID
+    Obtener equipo por ID (cacheado)
     """
-    equipo = crud.obtener_equipo_por_id(db, equipo_id)
+    datos = await cache_equipos.obtener_equipo_json(
+        ("id", equipo_id), lambda: crud_async.obtener_equipo_por_id(db, equipo_id)
+    )
     
-    if not equipo:
+    if datos is None:
         raise HTTPException(status_code=404, detail="Equipo no encontrado")
     
-    return schemas.EquipoResponse.from_orm(equipo)
+    return Response(content=datos, media_type="application/json")
 
 
 @app.get("/api/equipos/qr/{codigo_qr}", response_model=schemas.EquipoResponse)
 async def obtener_equipo_por_qr(
     codigo_qr: str,
     current_user: schemas.UsuarioResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
-    Obtener equipo por código QR
+    Obtener equipo por código QR (cacheado: es la ruta de cada escaneo)
     """
-    equipo = crud.obtener_equipo_por_qr(db, codigo_qr)
+    datos = await cache_equipos.obtener_equipo_json(
+        ("qr", codigo_qr), lambda: crud_async.obtener_equipo_por_qr(db, codigo_qr)
+    )
     
-    if not equipo:
+    if datos is None:
         raise HTTPException(status_code=404, detail="Equipo no encontrado")
     
-    return schemas.EquipoResponse.from_orm(equipo)
+    return Response(content=datos, media_type="application/json")
 
 
 @app.post("/api/equipos", response_model=schemas.EquipoResponse)
 async def crear_equipo(
     equipo_create: schemas.EquipoCreate,
     current_user: schemas.UsuarioResponse = Depends(get_current_tecnico),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Crear nuevo equipo (TECNICO o ADMIN)
     """
     try:
-        equipo = crud.crear_equipo(db, equipo_create)
-        return schemas.EquipoResponse.from_orm(equipo)
+        equipo = await crud_async.crear_equipo(db, equipo_create)
+        return respuestas.json_de(schemas.EquipoResponse, equipo)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/api/equipos/importar", response_model=schemas.ImportacionResponse)
+async def importar_equipos(
+    archivo: UploadFile = File(...),
+    formato: str = Query(None, description="csv o ndjson; por defecto según el archivo"),
+    current_user: schemas.UsuarioResponse = Depends(get_current_tecnico),
+    db: DbSession = Depends(get_session)
+):
+    """
+    Importar equipos en masa desde CSV (con encabezado) o NDJSON (TECNICO o ADMIN)
+    Retorna la cantidad insertada y el detalle de las filas rechazadas
+    """
+    formato = formato or importacion.detectar_formato(archivo.filename, archivo.content_type)
+    if formato not in importacion.FORMATOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Formato no soportado. Opciones: {', '.join(importacion.FORMATOS)}"
+        )
+
+    try:
+        resumen = await crud_async.importar_equipos(db, archivo.file, formato)
+        return respuestas.json_de(schemas.ImportacionResponse, resumen)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -259,29 +456,29 @@ async def actualizar_equipo(
     equipo_id: int,
     equipo_update: schemas.EquipoUpdate,
     current_user: schemas.UsuarioResponse = Depends(get_current_tecnico),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Actualizar equipo (TECNICO o ADMIN)
     """
-    equipo = crud.actualizar_equipo(db, equipo_id, equipo_update)
+    equipo = await crud_async.actualizar_equipo(db, equipo_id, equipo_update)
     
     if not equipo:
         raise HTTPException(status_code=404, detail="Equipo no encontrado")
     
-    return schemas.EquipoResponse.from_orm(equipo)
+    return respuestas.json_de(schemas.EquipoResponse, equipo)
 
 
 @app.delete("/api/equipos/{equipo_id}")
 async def eliminar_equipo(
     equipo_id: int,
     current_user: schemas.UsuarioResponse = Depends(get_current_tecnico),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Eliminar equipo (TECNICO o ADMIN)
     """
-    success = crud.eliminar_equipo(db, equipo_id)
+    success = await crud_async.eliminar_equipo(db, equipo_id)
     
     if not success:
         raise HTTPException(status_code=404, detail="Equipo no encontrado")
@@ -292,24 +489,56 @@ async def eliminar_equipo(
 @app.get("/api/equipos/qr/{codigo_qr}/generar")
 async def generar_qr_equipo(
     codigo_qr: str,
+    formato: str = Query(None, description="json (base64), png o svg; por defecto según Accept"),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
     current_user: schemas.UsuarioResponse = Depends(get_current_tecnico),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Generar código QR para un equipo
+    - application/json (default): imagen PNG en base64 dentro del JSON
+    - image/png: bytes PNG sin codificar
+    - image/svg+xml: SVG vectorial generado sin PIL
+    Responde 304 sin generar la imagen si If-None-Match coincide con el ETag
     """
-    equipo = crud.obtener_equipo_por_qr(db, codigo_qr)
+    formato = formato or negociar_formato_qr(accept)
+    if formato not in TIPOS_QR:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Formato no soportado. Opciones: {', '.join(TIPOS_QR)}"
+        )
+    
+    equipo = await crud_async.obtener_equipo_por_qr(db, codigo_qr)
     
     if not equipo:
         raise HTTPException(status_code=404, detail="Equipo no encontrado")
     
-    qr_base64 = generar_qr_base64(codigo_qr)
-    
-    return {
-        "equipo_id": equipo.id,
-        "codigo_qr": codigo_qr,
-        "qr_image": qr_base64
+    # El JSON incluye equipo_id; las imágenes solo dependen del código
+    etag = qr_gen.etag_qr(codigo_qr, formato="svg" if formato == "svg" else "png")
+    cabeceras = {
+        "ETag": f'"{equipo.id}-{etag}"' if formato == "json" else f'"{formato}-{etag}"',
+        "Cache-Control": f"private, max-age={qr_gen.QR_CACHE_MAX_AGE}",
+        "Vary": "Accept",
     }
+    if etag_coincide(if_none_match, cabeceras["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabeceras)
+    
+    # Generar la imagen es CPU: fuera del event loop
+    if formato != "json":
+        imagen = await run_in_threadpool(qr_gen.obtener_qr, codigo_qr, 10, formato)
+        return Response(content=imagen, media_type=TIPOS_QR[formato], headers=cabeceras)
+    
+    qr_base64 = await run_in_threadpool(qr_gen.obtener_qr_base64, codigo_qr)
+    
+    return ORJSONResponse(
+        {
+            "equipo_id": equipo.id,
+            "codigo_qr": codigo_qr,
+            "qr_image": qr_base64
+        },
+        headers=cabeceras
+    )
 
 
 # ==================== RUTAS DE TIPOS DE INTERVENCIÓN ====================
@@ -319,44 +548,44 @@ async def obtener_tipos_intervencion(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     current_user: schemas.UsuarioResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Obtener lista de tipos de intervención
     """
-    tipos = crud.obtener_todos_tipos_intervencion(db, skip=skip, limit=limit)
-    return [schemas.TipoIntervencionResponse.from_orm(t) for t in tipos]
+    tipos = await crud_async.obtener_todos_tipos_intervencion(db, skip=skip, limit=limit)
+    return respuestas.json_de(list[schemas.TipoIntervencionResponse], tipos)
 
 
 @app.get("/api/tipos-intervencion/{tipo_id}", response_model=schemas.TipoIntervencionResponse)
 async def obtener_tipo_intervencion(
     tipo_id: int,
     current_user: schemas.UsuarioResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Obtener tipo de intervención por ID
     """
-    tipo = crud.obtener_tipo_intervencion_por_id(db, tipo_id)
+    tipo = await crud_async.obtener_tipo_intervencion_por_id(db, tipo_id)
     
     if not tipo:
         raise HTTPException(status_code=404, detail="Tipo de intervención no encontrado")
     
-    return schemas.TipoIntervencionResponse.from_orm(tipo)
+    return respuestas.json_de(schemas.TipoIntervencionResponse, tipo)
 
 
 @app.post("/api/tipos-intervencion", response_model=schemas.TipoIntervencionResponse)
 async def crear_tipo_intervencion(
     tipo_create: schemas.TipoIntervencionCreate,
     current_user: schemas.UsuarioResponse = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Crear nuevo tipo de intervención (solo ADMIN)
     """
     try:
-        tipo = crud.crear_tipo_intervencion(db, tipo_create)
-        return schemas.TipoIntervencionResponse.from_orm(tipo)
+        tipo = await crud_async.crear_tipo_intervencion(db, tipo_create)
+        return respuestas.json_de(schemas.TipoIntervencionResponse, tipo)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -366,29 +595,29 @@ async def actualizar_tipo_intervencion(
     tipo_id: int,
     tipo_update: schemas.TipoIntervencionUpdate,
     current_user: schemas.UsuarioResponse = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Actualizar tipo de intervención (solo ADMIN)
     """
-    tipo = crud.actualizar_tipo_intervencion(db, tipo_id, tipo_update)
+    tipo = await crud_async.actualizar_tipo_intervencion(db, tipo_id, tipo_update)
     
     if not tipo:
         raise HTTPException(status_code=404, detail="Tipo de intervención no encontrado")
     
-    return schemas.TipoIntervencionResponse.from_orm(tipo)
+    return respuestas.json_de(schemas.TipoIntervencionResponse, tipo)
 
 
 @app.delete("/api/tipos-intervencion/{tipo_id}")
 async def eliminar_tipo_intervencion(
     tipo_id: int,
     current_user: schemas.UsuarioResponse = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Eliminar tipo de intervención (solo ADMIN)
     """
-    success = crud.eliminar_tipo_intervencion(db, tipo_id)
+    success = await crud_async.eliminar_tipo_intervencion(db, tipo_id)
     
     if not success:
         raise HTTPException(status_code=404, detail="Tipo de intervención no encontrado")
@@ -398,45 +627,114 @@ async def eliminar_tipo_intervencion(
 
 # ==================== RUTAS DE INTERVENCIONES ====================
 
-@app.get("/api/intervenciones", response_model=list[schemas.IntervencionResponse])
+@app.get(
+    "/api/intervenciones",
+    response_model=list[schemas.IntervencionExpandidaResponse],
+    response_model_exclude_unset=True
+)
 async def obtener_intervenciones(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     equipo_id: int = Query(None),
     usuario_id: int = Query(None),
     solo_activas: bool = Query(False),
+    cursor: str = Query(None),
+    expand: str = Query(None),
+    response: Response = None,
     current_user: schemas.UsuarioResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Obtener lista de intervenciones con filtros opcionales
+    Paginación por offset (skip) o por cursor (header X-Next-Cursor de la página anterior)
+    ?expand=equipo,usuario,tipo incluye esas relaciones cargadas en la misma consulta
     """
-    intervenciones = crud.obtener_todas_intervenciones(
+    expandir = leer_expansiones(expand)
+    intervenciones = await crud_async.obtener_todas_intervenciones(
         db,
         skip=skip,
         limit=limit,
         equipo_id=equipo_id,
         usuario_id=usuario_id,
-        solo_activas=solo_activas
+        solo_activas=solo_activas,
+        cursor=leer_cursor(paginacion.leer_cursor_intervencion, cursor),
+        expandir=expandir
+    )
+    agregar_siguiente_cursor(response, intervenciones, limit, paginacion.cursor_intervencion)
+    if expandir:
+        return respuestas.json_de(
+            list[schemas.IntervencionExpandidaResponse],
+            [intervencion_expandida(i, expandir) for i in intervenciones],
+            exclude_unset=True,
+            headers=response.headers
+        )
+    return respuestas.json_de(list[schemas.IntervencionResponse], intervenciones, headers=response.headers)
+
+
+@app.get("/api/intervenciones/buscar", response_model=list[schemas.IntervencionResponse])
+async def buscar_intervenciones(
+    q: str = Query(..., min_length=1, max_length=200),
+    equipo_id: int = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str = Query(None),
+    response: Response = None,
+    current_user: schemas.UsuarioResponse = Depends(get_current_user),
+    db: DbSession = Depends(get_session)
+):
+    """
+    Buscar intervenciones por descripción u observaciones (opcionalmente de un equipo)
+    Resultados por relevancia; la página siguiente con el header X-Next-Cursor
+    """
+    resultados = await crud_async.buscar_intervenciones(
+        db, q, limit=limit, cursor=leer_cursor(paginacion.leer_cursor_busqueda, cursor), equipo_id=equipo_id
+    )
+    agregar_siguiente_cursor(response, resultados, limit, cursor_resultado)
+    return respuestas.json_de(
+        list[schemas.IntervencionResponse], [intervencion for intervencion, _ in resultados],
+        headers=response.headers
+    )
+
+
+@app.get("/api/intervenciones/exportar")
+async def exportar_intervenciones(
+    formato: str = Query("ndjson"),
+    since: Optional[datetime] = Query(None),
+    current_user: schemas.UsuarioResponse = Depends(get_current_user),
+    db: DbSession = Depends(get_session)
+):
+    """
+    Exportar todas las intervenciones con su equipo y tipo (NDJSON o CSV), en streaming
+    ?since= incluye solo las modificadas desde esa fecha (extracción incremental)
+    """
+    if formato not in exportacion.FORMATOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Formato no soportado. Opciones: {', '.join(exportacion.FORMATOS)}"
+        )
+
+    # La sesión sigue abierta mientras dure la respuesta: se cierra al terminar el streaming
+    return StreamingResponse(
+        crud_async.exportar_intervenciones(db, formato, fecha_utc(since)),
+        media_type=exportacion.FORMATOS[formato],
+        headers={"Content-Disposition": f'attachment; filename="intervenciones.{formato}"'}
     )
-    return [schemas.IntervencionResponse.from_orm(i) for i in intervenciones]
 
 
 @app.get("/api/intervenciones/{intervencion_id}", response_model=schemas.IntervencionDetailResponse)
 async def obtener_intervencion(
     intervencion_id: int,
     current_user: schemas.UsuarioResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Obtener intervención por ID con detalles completos
     """
-    intervencion = crud.obtener_intervencion_por_id(db, intervencion_id)
+    intervencion = await crud_async.obtener_intervencion_detalle(db, intervencion_id)
     
     if not intervencion:
         raise HTTPException(status_code=404, detail="Intervención no encontrada")
     
-    return schemas.IntervencionDetailResponse.from_orm(intervencion)
+    return respuestas.json_de(schemas.IntervencionDetailResponse, intervencion)
 
 
 @app.get("/api/equipos/{equipo_id}/historial", response_model=list[schemas.IntervencionResponse])
@@ -444,19 +742,29 @@ async def obtener_historial_equipo(
     equipo_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: str = Query(None),
+    response: Response = None,
     current_user: schemas.UsuarioResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Obtener historial de intervenciones de un equipo
+    Paginación por offset (skip) o por cursor (header X-Next-Cursor de la página anterior)
     """
     # Verificar que el equipo exista
-    equipo = crud.obtener_equipo_por_id(db, equipo_id)
+    equipo = await crud_async.obtener_equipo_por_id(db, equipo_id)
     if not equipo:
         raise HTTPException(status_code=404, detail="Equipo no encontrado")
     
-    intervenciones = crud.obtener_historial_equipo(db, equipo_id, skip=skip, limit=limit)
-    return [schemas.IntervencionResponse.from_orm(i) for i in intervenciones]
+    intervenciones = await crud_async.obtener_historial_equipo(
+        db,
+        equipo_id,
+        skip=skip,
+        limit=limit,
+        cursor=leer_cursor(paginacion.leer_cursor_intervencion, cursor)
+    )
+    agregar_siguiente_cursor(response, intervenciones, limit, paginacion.cursor_intervencion)
+    return respuestas.json_de(list[schemas.IntervencionResponse], intervenciones, headers=response.headers)
 
 
 @app.get("/api/usuarios/{usuario_id}/intervenciones", response_model=list[schemas.IntervencionResponse])
@@ -464,11 +772,14 @@ async def obtener_intervenciones_usuario(
     usuario_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: str = Query(None),
+    response: Response = None,
     current_user: schemas.UsuarioResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Obtener intervenciones realizadas por un usuario
+    Paginación por offset (skip) o por cursor (header X-Next-Cursor de la página anterior)
     """
     # Verificar permisos
     if current_user.id != usuario_id and current_user.rol != "ADMIN":
@@ -478,46 +789,75 @@ async def obtener_intervenciones_usuario(
         )
     
     # Verificar que el usuario exista
-    usuario = crud.obtener_usuario_por_id(db, usuario_id)
+    usuario = await crud_async.obtener_usuario_por_id(db, usuario_id)
     if not usuario:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     
-    intervenciones = crud.obtener_intervenciones_usuario(db, usuario_id, skip=skip, limit=limit)
-    return [schemas.IntervencionResponse.from_orm(i) for i in intervenciones]
+    intervenciones = await crud_async.obtener_intervenciones_usuario(
+        db,
+        usuario_id,
+        skip=skip,
+        limit=limit,
+        cursor=leer_cursor(paginacion.leer_cursor_intervencion, cursor)
+    )
+    agregar_siguiente_cursor(response, intervenciones, limit, paginacion.cursor_intervencion)
+    return respuestas.json_de(list[schemas.IntervencionResponse], intervenciones, headers=response.headers)
 
 
 @app.post("/api/intervenciones", response_model=schemas.IntervencionResponse)
 async def crear_intervencion(
     intervencion_create: schemas.IntervencionCreate,
     current_user: schemas.UsuarioResponse = Depends(get_current_tecnico),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Crear nueva intervención (TECNICO o ADMIN)
     """
     try:
-        intervencion = crud.crear_intervencion(db, intervencion_create, current_user.id)
-        return schemas.IntervencionResponse.from_orm(intervencion)
+        intervencion = await crud_async.crear_intervencion(db, intervencion_create, current_user.id)
+        return respuestas.json_de(schemas.IntervencionResponse, intervencion)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.post("/api/intervenciones/lote", response_model=list[schemas.ResultadoLoteIntervencion])
+async def crear_intervenciones_lote(
+    intervenciones: list[schemas.IntervencionLoteItem],
+    current_user: schemas.UsuarioResponse = Depends(get_current_tecnico),
+    db: DbSession = Depends(get_session)
+):
+    """
+    Sincronizar intervenciones registradas sin conexión (TECNICO o ADMIN)
+    Reintentar con las mismas clave_idempotencia no duplica intervenciones
+    """
+    if not intervenciones:
+        raise HTTPException(status_code=400, detail="El lote está vacío")
+    if len(intervenciones) > crud.INTERVENCIONES_LOTE_MAX:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El lote supera el máximo de {crud.INTERVENCIONES_LOTE_MAX} intervenciones"
+        )
+
+    resultados = await crud_async.crear_intervenciones_lote(db, intervenciones, current_user.id)
+    return respuestas.json_de(list[schemas.ResultadoLoteIntervencion], resultados)
+
+
 @app.put("/api/intervenciones/{intervencion_id}", response_model=schemas.IntervencionResponse)
 async def actualizar_intervencion(
     intervencion_id: int,
     intervencion_update: schemas.IntervencionUpdate,
     current_user: schemas.UsuarioResponse = Depends(get_current_tecnico),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Actualizar intervención (TECNICO o ADMIN)
     """
-    intervencion = crud.actualizar_intervencion(db, intervencion_id, intervencion_update)
+    intervencion = await crud_async.actualizar_intervencion(db, intervencion_id, intervencion_update)
     
     if not intervencion:
         raise HTTPException(status_code=404, detail="Intervención no encontrada")
     
-    return schemas.IntervencionResponse.from_orm(intervencion)
+    return respuestas.json_de(schemas.IntervencionResponse, intervencion)
 
 
 @app.post("/api/intervenciones/{intervencion_id}/completar")
@@ -526,12 +866,12 @@ async def completar_intervencion(
     observaciones: str = Query(None),
     tiempo_duracion: int = Query(None),
     current_user: schemas.UsuarioResponse = Depends(get_current_tecnico),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Marcar intervención como completada (TECNICO o ADMIN)
     """
-    intervencion = crud.completar_intervencion(
+    intervencion = await crud_async.completar_intervencion(
         db,
         intervencion_id,
         observaciones=observaciones,
@@ -543,7 +883,7 @@ async def completar_intervencion(
     
     return {
         "message": "Intervención completada",
-        "intervencion": schemas.IntervencionResponse.from_orm(intervencion)
+        "intervencion": schemas.IntervencionResponse.model_validate(intervencion).model_dump(mode="json")
     }
 
 
@@ -551,12 +891,12 @@ async def completar_intervencion(
 async def eliminar_intervencion(
     intervencion_id: int,
     current_user: schemas.UsuarioResponse = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Eliminar intervención (solo ADMIN)
     """
-    success = crud.eliminar_intervencion(db, intervencion_id)
+    success = await crud_async.eliminar_intervencion(db, intervencion_id)
     
     if not success:
         raise HTTPException(status_code=404, detail="Intervención no encontrada")
@@ -564,20 +904,124 @@ async def eliminar_intervencion(
     return {"message": "Intervención eliminada correctamente"}
 
 
+# ==================== RUTAS DE CAMBIOS ====================
+
+@app.get("/api/cambios", response_model=schemas.CambiosResponse)
+async def obtener_cambios(
+    since: Optional[datetime] = Query(None),
+    cursor: str = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    current_user: schemas.UsuarioResponse = Depends(get_current_user),
+    db: DbSession = Depends(get_session)
+):
+    """
+    Equipos, tipos e intervenciones creados o modificados desde `since` (todo si se omite)
+    Los equipos dados de baja llegan con activo=false y los borrados físicos en `eliminados`.
+    Repetir con ?cursor=siguiente_cursor hasta recibir null y guardar `hasta` como el próximo since
+    """
+    if cursor:
+        since, hasta, posiciones = leer_cursor(paginacion.leer_cursor_cambios, cursor)
+    else:
+        since = fecha_utc(since)
+        hasta = datetime.utcnow() - timedelta(seconds=crud.CAMBIOS_MARGEN_SEGUNDOS)
+        posiciones = dict.fromkeys(crud.FUENTES_CAMBIOS)
+
+    try:
+        cambios, pendientes = await crud_async.obtener_cambios(db, since, hasta, posiciones, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return respuestas.json_de(schemas.CambiosResponse, {
+        **cambios,
+        "hasta": hasta,
+        "siguiente_cursor": paginacion.cursor_cambios(since, hasta, pendientes) if pendientes else None,
+    })
+
+
+# ==================== RUTAS DE EVENTOS ====================
+
+@app.get("/api/eventos")
+async def eventos_sse(
+    tipos: str = Query(None),
+    current_user: schemas.UsuarioResponse = Depends(get_current_user),
+    db: DbSession = Depends(get_session)
+):
+    """
+    Eventos en vivo (Server-Sent Events) de intervenciones, equipos y estadísticas
+    ?tipos=intervencion,equipo,estadisticas filtra; un evento "resync" indica que se
+    perdieron eventos y hay que volver a sincronizar con /api/cambios
+    """
+    try:
+        filtro = eventos.leer_tipos(tipos)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # La conexión puede durar horas: no retener una conexión de BD mientras tanto
+    await crud_async.liberar_conexion(db)
+    return StreamingResponse(
+        eventos.flujo_sse(filtro),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.websocket("/api/eventos/ws")
+async def eventos_websocket(
+    websocket: WebSocket,
+    token: str = Query(...),
+    tipos: str = Query(None),
+    db: DbSession = Depends(get_session)
+):
+    """
+    Los mismos eventos por WebSocket, un mensaje JSON por evento
+    El navegador no puede enviar el header Authorization: el token va en ?token=
+    """
+    try:
+        filtro = eventos.leer_tipos(tipos)
+        await usuario_de_token(token, db)
+    except (ValueError, HTTPException):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    finally:
+        await crud_async.liberar_conexion(db)
+
+    await websocket.accept()
+    await eventos.atender_websocket(websocket, filtro)
+
+
 # ==================== RUTAS DE ESTADÍSTICAS ====================
 
 @app.get("/api/estadisticas")
 async def obtener_estadisticas(
     current_user: schemas.UsuarioResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """
     Obtener estadísticas generales del sistema
     """
-    stats = crud.obtener_estadisticas_equipos(db)
+    stats = await crud_async.obtener_estadisticas_equipos(db)
     return stats
 
 
+# ==================== RUTAS DE MÉTRICAS ====================
+
+@app.get("/api/metricas")
+async def obtener_metricas(
+    current_user: schemas.UsuarioResponse = Depends(get_current_admin)
+):
+    """
+    Métricas internas del servicio (solo ADMIN)
+    """
+    return {
+        "hash": obtener_metricas_hash(),
+        "cache_usuarios": cache_usuarios.estadisticas(),
+        "cache_qr": qr_gen.cache_qr.estadisticas(),
+        "cache_equipos": cache_equipos.estadisticas(),
+        "etiquetas": etiquetas.obtener_metricas_etiquetas(),
+        "eventos": eventos.broker.estadisticas()
+    }
+
+
 # ==================== RUTA RAÍZ ====================
 
 @app.get("/", tags=["Health"])
@@ -0,0 +1,124 @@
+"""
+Migraciones de esquema para bases de datos existentes
+Cada migración es idempotente y queda registrada en la tabla schema_migraciones
+"""
+
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, func, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateIndex
+
+from . import models
+
+# Tabla de control fuera de Base.metadata: create_all no la marca como aplicada
+metadata_migraciones = MetaData()
+
+schema_migraciones = Table(
+    "schema_migraciones",
+    metadata_migraciones,
+    Column("id", String, primary_key=True),
+    Column("fecha_aplicacion", DateTime, default=datetime.utcnow),
+)
+
+
+def _crear_indices(conn: Connection, tabla: Table, *nombres: str) -> None:
+    """Crear los índices declarados en el modelo que falten en la BD (todos o solo `nombres`)"""
+    for indice in sorted(tabla.indexes, key=lambda i: i.name):
+        if not nombres or indice.name in nombres:
+            conn.execute(CreateIndex(indice, if_not_exists=True))
+
+
+def _indices_intervenciones(conn: Connection) -> None:
+    """Índices compuestos para historial, intervenciones por usuario y pendientes"""
+    _crear_indices(
+        conn,
+        models.Intervencion.__table__,
+        "ix_intervenciones_equipo_fecha",
+        "ix_intervenciones_usuario_fecha",
+        "ix_intervenciones_fecha",
+        "ix_intervenciones_pendientes",
+    )
+
+
+def _agregar_columna(conn: Connection, tabla: Table, columna: str) -> None:
+    """ALTER TABLE ADD COLUMN si la columna del modelo aún no existe"""
+    existentes = {c["name"] for c in inspect(conn).get_columns(tabla.name)}
+    if columna not in existentes:
+        tipo = tabla.c[columna].type.compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE {tabla.name} ADD COLUMN {columna} {tipo}"))
+
+
+def _clave_idempotencia_intervenciones(conn: Connection) -> None:
+    """Columna clave_idempotencia y su índice único por usuario"""
+    _agregar_columna(conn, models.Intervencion.__table__, "clave_idempotencia")
+    _crear_indices(conn, models.Intervencion.__table__, "ux_intervenciones_usuario_clave")
+
+
+def _indice_actualizacion_intervenciones(conn: Connection) -> None:
+    """Índice (fecha_actualizacion, id) para la exportación incremental"""
+    _crear_indices(conn, models.Intervencion.__table__, "ix_intervenciones_actualizacion")
+
+
+def _cambios_incrementales(conn: Connection) -> None:
+    """fecha_actualizacion en tipos de intervención, tabla de eliminaciones e índices para /api/cambios"""
+    tipos = models.TipoIntervencion.__table__
+    _agregar_columna(conn, tipos, "fecha_actualizacion")
+    conn.execute(
+        tipos.update()
+        .where(tipos.c.fecha_actualizacion.is_(None))
+        .values(fecha_actualizacion=func.coalesce(tipos.c.fecha_creacion, datetime.utcnow()))
+    )
+    _crear_indices(conn, tipos, "ix_tipos_intervencion_actualizacion")
+    _crear_indices(conn, models.Equipo.__table__, "ix_equipos_actualizacion")
+    models.Eliminacion.__table__.create(conn, checkfirst=True)
+
+
+def _busqueda_texto(conn: Connection) -> None:
+    """Búsqueda de texto: índices GIN en PostgreSQL, tablas FTS5 con triggers en SQLite"""
+    for nombre in models.COLUMNAS_BUSQUEDA:
+        if conn.dialect.name == "postgresql":
+            _crear_indices(conn, models.Base.metadata.tables[nombre], f"ix_{nombre}_busqueda")
+        elif conn.dialect.name == "sqlite":
+            for sentencia in models.sentencias_fts(nombre):
+                conn.exec_driver_sql(sentencia)
+            # Indexar las filas existentes
+            conn.exec_driver_sql(f"INSERT INTO {nombre}_fts({nombre}_fts) VALUES ('rebuild')")
+
+
+# Migraciones en orden de aplicación: (id, función)
+MIGRACIONES: List[Tuple[str, Callable[[Connection], None]]] = [
+    ("0001_indices_intervenciones", _indices_intervenciones),
+    ("0002_clave_idempotencia_intervenciones", _clave_idempotencia_intervenciones),
+    ("0003_indice_actualizacion_intervenciones", _indice_actualizacion_intervenciones),
+    ("0004_cambios_incrementales", _cambios_incrementales),
+    ("0005_busqueda_texto", _busqueda_texto),
+]
+
+
+def aplicar_migraciones(engine: Engine) -> List[str]:
+    """
+    Aplicar las migraciones pendientes
+
+    Returns:
+        Ids de las migraciones aplicadas en esta ejecución
+    """
+    metadata_migraciones.create_all(bind=engine)
+
+    with engine.connect() as conn:
+        aplicadas = set(conn.execute(select(schema_migraciones.c.id)).scalars())
+
+    nuevas = []
+    for migracion_id, migracion in MIGRACIONES:
+        if migracion_id in aplicadas:
+            continue
+
+        # Cada migración en su propia transacción
+        with engine.begin() as conn:
+            migracion(conn)
+            conn.execute(schema_migraciones.insert().values(id=migracion_id))
+
+        nuevas.append(migracion_id)
+
+    return nuevas
@@ -1,8 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Enum
+from sqlalchemy import (
+    DDL, Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Enum, Index, Table,
+    event, func, literal_column,
+)
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql.elements import ColumnElement
 from datetime import datetime
 from enum import Enum as PyEnum
-from database import Base
+from functools import reduce
+from typing import List
+import os
+from .database import Base
 
 
 class RoleEnum(str, PyEnum):
@@ -50,6 +57,11 @@ class Equipo(Base):
     fecha_creacion = Column(DateTime, default=datetime.utcnow)
     fecha_actualizacion = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Sincronización incremental (/api/cambios)
+    __table_args__ = (
+        Index("ix_equipos_actualizacion", fecha_actualizacion, id),
+    )
+
     # Relaciones
     intervenciones = relationship("Intervencion", back_populates="equipo", cascade="all, delete-orphan")
 
@@ -65,6 +77,12 @@ class TipoIntervencion(Base):
     nombre = Column(String, nullable=False, unique=True)
     descripcion = Column(Text, nullable=True)
     fecha_creacion = Column(DateTime, default=datetime.utcnow)
+    fecha_actualizacion = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Sincronización incremental (/api/cambios)
+    __table_args__ = (
+        Index("ix_tipos_intervencion_actualizacion", fecha_actualizacion, id),
+    )
 
     # Relaciones
     intervenciones = relationship("Intervencion", back_populates="tipo_intervencion")
@@ -93,6 +111,26 @@ class Intervencion(Base):
     fecha_creacion = Column(DateTime, default=datetime.utcnow)
     fecha_actualizacion = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Clave enviada por el cliente al sincronizar en lote (única por usuario)
+    clave_idempotencia = Column(String, nullable=True)
+
+    # Índices para los listados ordenados por fecha_inicio DESC (id como desempate)
+    __table_args__ = (
+        Index("ix_intervenciones_equipo_fecha", equipo_id, fecha_inicio.desc(), id.desc()),
+        Index("ix_intervenciones_usuario_fecha", usuario_id, fecha_inicio.desc(), id.desc()),
+        Index("ix_intervenciones_fecha", fecha_inicio.desc(), id.desc()),
+        Index(
+            "ix_intervenciones_pendientes",
+            fecha_inicio.desc(),
+            id.desc(),
+            postgresql_where=(completada == False),
+            sqlite_where=(completada == False),
+        ),
+        Index("ux_intervenciones_usuario_clave", usuario_id, clave_idempotencia, unique=True),
+        # Exportación incremental (?since=) ordenada por fecha de modificación
+        Index("ix_intervenciones_actualizacion", fecha_actualizacion, id),
+    )
+
     # Relaciones
     equipo = relationship("Equipo", back_populates="intervenciones")
     usuario = relationship("Usuario", back_populates="intervenciones")
@@ -100,3 +138,83 @@ class Intervencion(Base):
 
     class Config:
         from_attributes = True
+
+
+class Eliminacion(Base):
+    """Filas borradas físicamente (tipos e intervenciones), para informarlas en /api/cambios"""
+    __tablename__ = "eliminaciones"
+
+    id = Column(Integer, primary_key=True)
+    entidad = Column(String, nullable=False)  # "tipo_intervencion" o "intervencion"
+    entidad_id = Column(Integer, nullable=False)
+    fecha_eliminacion = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_eliminaciones_fecha", fecha_eliminacion, id),
+    )
+
+
+class ContadorEstadistica(Base):
+    """Contadores materializados para las estadísticas generales"""
+    __tablename__ = "contadores_estadisticas"
+
+    nombre = Column(String, primary_key=True)
+    valor = Column(Integer, nullable=False, default=0)
+
+
+# ==================== BÚSQUEDA DE TEXTO ====================
+
+# Configuración de texto de PostgreSQL (stemming); cambiarla requiere recrear los índices GIN
+BUSQUEDA_IDIOMA = os.getenv("BUSQUEDA_IDIOMA", "spanish")
+
+# Columnas indexadas por tabla y su peso en el ranking (A > B > C)
+COLUMNAS_BUSQUEDA = {
+    "equipos": (("nombre", "A"), ("modelo", "B"), ("serie", "B"), ("fabricante", "B"), ("descripcion", "C")),
+    "intervenciones": (("descripcion", "A"), ("observaciones", "B")),
+}
+
+
+def documento_busqueda(tabla: Table) -> ColumnElement:
+    """
+    tsvector ponderado de PostgreSQL; el índice GIN y las consultas usan esta misma expresión
+    Sin parámetros enlazados: con asyncpg una expresión con $1 no coincidiría con la del índice
+    """
+    idioma = literal_column(f"'{BUSQUEDA_IDIOMA}'::regconfig")
+    partes = [
+        func.setweight(
+            func.to_tsvector(idioma, func.coalesce(tabla.c[columna], literal_column("''"))),
+            literal_column(f"'{peso}'")
+        )
+        for columna, peso in COLUMNAS_BUSQUEDA[tabla.name]
+    ]
+    return reduce(lambda documento, parte: documento.op("||")(parte), partes)
+
+
+def sentencias_fts(tabla: str) -> List[str]:
+    """SQLite: tabla FTS5 de contenido externo y los triggers que la mantienen sincronizada"""
+    fts = f"{tabla}_fts"
+    columnas = ", ".join(columna for columna, _ in COLUMNAS_BUSQUEDA[tabla])
+    nuevos = ", ".join(f"new.{columna}" for columna, _ in COLUMNAS_BUSQUEDA[tabla])
+    viejos = ", ".join(f"old.{columna}" for columna, _ in COLUMNAS_BUSQUEDA[tabla])
+    insertar = f"INSERT INTO {fts}(rowid, {columnas}) VALUES (new.id, {nuevos});"
+    borrar = f"INSERT INTO {fts}({fts}, rowid, {columnas}) VALUES ('delete', old.id, {viejos});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columnas}, content='{tabla}', "
+        f"content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {tabla} BEGIN {insertar} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {tabla} BEGIN {borrar} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columnas} ON {tabla} BEGIN {borrar} {insertar} END",
+    ]
+
+
+for _nombre in COLUMNAS_BUSQUEDA:
+    _tabla = Base.metadata.tables[_nombre]
+    # PostgreSQL: índice GIN de expresión (en SQLite no existe to_tsvector)
+    _tabla.append_constraint(
+        Index(f"ix_{_nombre}_busqueda", documento_busqueda(_tabla), postgresql_using="gin")
+        .ddl_if(dialect="postgresql")
+    )
+    # SQLite: FTS5 creada y borrada junto con la tabla
+    for _sentencia in sentencias_fts(_nombre):
+        event.listen(_tabla, "after_create", DDL(_sentencia).execute_if(dialect="sqlite"))
+    event.listen(_tabla, "before_drop", DDL(f"DROP TABLE IF EXISTS {_nombre}_fts").execute_if(dialect="sqlite"))
@@ -0,0 +1,105 @@
+"""
+Cursores opacos para paginación keyset
+El cliente recibe el cursor en el header X-Next-Cursor y lo devuelve en ?cursor=
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from . import models
+
+
+def _codificar(valores: list) -> str:
+    datos = json.dumps(valores, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(datos).decode().rstrip("=")
+
+
+def _decodificar(cursor: str) -> list:
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Cursor inválido") from e
+
+    if not isinstance(valores, list):
+        raise ValueError("Cursor inválido")
+    return valores
+
+
+def cursor_intervencion(intervencion: models.Intervencion) -> str:
+    """Cursor que apunta a continuación de una intervención (fecha_inicio, id)"""
+    return _codificar([intervencion.fecha_inicio.isoformat(), intervencion.id])
+
+
+def leer_cursor_intervencion(cursor: str) -> Tuple[datetime, int]:
+    """Decodificar un cursor de intervenciones"""
+    valores = _decodificar(cursor)
+    try:
+        fecha_inicio, intervencion_id = valores
+        return datetime.fromisoformat(fecha_inicio), int(intervencion_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Cursor inválido") from e
+
+
+def cursor_equipo(equipo: models.Equipo) -> str:
+    """Cursor que apunta a continuación de un equipo (id)"""
+    return _codificar([equipo.id])
+
+
+def leer_cursor_equipo(cursor: str) -> int:
+    """Decodificar un cursor de equipos"""
+    valores = _decodificar(cursor)
+    try:
+        (equipo_id,) = valores
+        return int(equipo_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Cursor inválido") from e
+
+
+def cursor_cambios(
+    since: Optional[datetime],
+    hasta: datetime,
+    posiciones: Dict[str, Tuple[datetime, int]]
+) -> str:
+    """Cursor de /api/cambios: rango [since, hasta) y posición de cada fuente pendiente"""
+    return _codificar([
+        since.isoformat() if since else None,
+        hasta.isoformat(),
+        {fuente: [fecha.isoformat(), fila_id] for fuente, (fecha, fila_id) in posiciones.items()},
+    ])
+
+
+def leer_cursor_cambios(
+    cursor: str
+) -> Tuple[Optional[datetime], datetime, Dict[str, Tuple[datetime, int]]]:
+    """Decodificar un cursor de /api/cambios"""
+    valores = _decodificar(cursor)
+    try:
+        since, hasta, posiciones = valores
+        return (
+            datetime.fromisoformat(since) if since else None,
+            datetime.fromisoformat(hasta),
+            {
+                str(fuente): (datetime.fromisoformat(fecha), int(fila_id))
+                for fuente, (fecha, fila_id) in posiciones.items()
+            },
+        )
+    except (ValueError, TypeError, AttributeError) as e:
+        raise ValueError("Cursor inválido") from e
+
+
+def cursor_busqueda(puntaje: float, fila_id: int) -> str:
+    """Cursor que apunta a continuación de un resultado de búsqueda (puntaje, id)"""
+    return _codificar([puntaje, fila_id])
+
+
+def leer_cursor_busqueda(cursor: str) -> Tuple[float, int]:
+    """Decodificar un cursor de búsqueda"""
+    valores = _decodificar(cursor)
+    try:
+        puntaje, fila_id = valores
+        return float(puntaje), int(fila_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Cursor inválido") from e
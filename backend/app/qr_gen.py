@@ -1,12 +1,48 @@
 """
 Generador de códigos QR
+Las imágenes se cachean por contenido (código, tamaño, formato) en memoria
+y opcionalmente en disco (QR_CACHE_DIR)
 """
 
 import qrcode
 import io
+import os
+import shutil
+import hashlib
+import tempfile
+from pathlib import Path
 from typing import Optional
 import base64
 
+from .cache import CacheTTL
+
+# Imágenes en memoria (LRU, sin expiración: la imagen solo depende de la clave)
+QR_CACHE_MAX = int(os.getenv("QR_CACHE_MAX", "2048"))
+
+# Directorio del nivel en disco, vacío para desactivarlo
+QR_CACHE_DIR = os.getenv("QR_CACHE_DIR", "")
+
+# Segundos que el cliente puede reutilizar la imagen sin revalidar (Cache-Control)
+QR_CACHE_MAX_AGE = int(os.getenv("QR_CACHE_MAX_AGE", "3600"))
+
+# Versión del render: cambiarla al modificar generar_qr/generar_qr_svg descarta las imágenes cacheadas
+VERSION_RENDER = "1"
+
+cache_qr = CacheTTL(max_entradas=QR_CACHE_MAX, ttl_segundos=None)
+
+
+def _crear_qr(datos: str, tamaño: int) -> qrcode.QRCode:
+    """Matriz QR con los parámetros comunes a todos los formatos"""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=tamaño,
+        border=4,
+    )
+    qr.add_data(datos)
+    qr.make(fit=True)
+    return qr
+
 
 def generar_qr(datos: str, tamaño: int = 10) -> bytes:
     """
@@ -19,14 +55,7 @@ def generar_qr(datos: str, tamaño: int = 10) -> bytes:
     Returns:
         Imagen PNG del código QR en bytes
     """
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=tamaño,
-        border=4,
-    )
-    qr.add_data(datos)
-    qr.make(fit=True)
+    qr = _crear_qr(datos, tamaño)
     
     img = qr.make_image(fill_color="black", back_color="white")
     
@@ -38,6 +67,42 @@ def generar_qr(datos: str, tamaño: int = 10) -> bytes:
     return img_bytes.getvalue()
 
 
+def generar_qr_svg(datos: str, tamaño: int = 10) -> bytes:
+    """
+    Generar código QR en SVG directamente desde la matriz (sin PIL)
+
+    Cada tramo horizontal de módulos oscuros es un subcamino de un único <path>
+
+    Args:
+        datos: Información a codificar en el QR
+        tamaño: Píxeles por módulo del ancho/alto nominal del SVG
+
+    Returns:
+        Documento SVG en bytes
+    """
+    matriz = _crear_qr(datos, tamaño).get_matrix()
+    lado = len(matriz)
+
+    tramos = []
+    for y, fila in enumerate(matriz):
+        x = 0
+        while x < lado:
+            if not fila[x]:
+                x += 1
+                continue
+            inicio = x
+            while x < lado and fila[x]:
+                x += 1
+            tramos.append(f"M{inicio} {y}h{x - inicio}v1h-{x - inicio}z")
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {lado} {lado}" '
+        f'width="{lado * tamaño}" height="{lado * tamaño}" shape-rendering="crispEdges">'
+        f'<rect width="{lado}" height="{lado}" fill="#fff"/>'
+        f'<path d="{"".join(tramos)}" fill="#000"/></svg>'
+    ).encode()
+
+
 def generar_qr_base64(datos: str, tamaño: int = 10) -> str:
     """
     Generar código QR codificado en base64
@@ -51,3 +116,74 @@ def generar_qr_base64(datos: str, tamaño: int = 10) -> str:
     """
     img_bytes = generar_qr(datos, tamaño)
     return base64.b64encode(img_bytes).decode()
+
+
+def etag_qr(datos: str, tamaño: int = 10, formato: str = "png") -> str:
+    """Hash de contenido de una imagen QR, se calcula sin generarla"""
+    clave = f"{VERSION_RENDER}|{formato}|{tamaño}|{datos}"
+    return hashlib.sha256(clave.encode()).hexdigest()[:32]
+
+
+def _directorio_disco(datos: str) -> Optional[Path]:
+    """Directorio con todas las variantes cacheadas de un código"""
+    if not QR_CACHE_DIR:
+        return None
+    digest = hashlib.sha256(datos.encode()).hexdigest()
+    return Path(QR_CACHE_DIR) / digest[:2] / digest
+
+
+def _guardar_en_disco(ruta: Path, imagen: bytes) -> None:
+    """Escritura atómica: otro proceso nunca lee un archivo a medias"""
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=ruta.parent, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as archivo:
+            archivo.write(imagen)
+        os.replace(temporal, ruta)
+    except OSError:
+        # La cache en disco es opcional: un error de escritura no debe romper la petición
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def obtener_qr(datos: str, tamaño: int = 10, formato: str = "png") -> bytes:
+    """
+    Imagen del QR (png o svg) desde la cache (memoria, luego disco); se genera solo si falta
+
+    Bloquea mientras genera: desde el event loop llamar vía threadpool
+    """
+    clave = (datos, tamaño, formato)
+    imagen = cache_qr.obtener(clave)
+    if imagen is not None:
+        return imagen
+
+    directorio = _directorio_disco(datos)
+    ruta = directorio / f"{etag_qr(datos, tamaño, formato)}.{formato}" if directorio else None
+
+    try:
+        imagen = ruta.read_bytes() if ruta else None
+    except OSError:
+        imagen = None
+
+    if imagen is None:
+        generar = generar_qr_svg if formato == "svg" else generar_qr
+        imagen = generar(datos, tamaño)
+        if ruta:
+            _guardar_en_disco(ruta, imagen)
+
+    cache_qr.guardar(clave, imagen)
+    return imagen
+
+
+def obtener_qr_base64(datos: str, tamaño: int = 10) -> str:
+    """Como generar_qr_base64 pero usando la cache de imágenes"""
+    return base64.b64encode(obtener_qr(datos, tamaño)).decode()
+
+
+def invalidar_qr(datos: str) -> None:
+    """Descartar todas las imágenes cacheadas de un código (memoria y disco)"""
+    cache_qr.invalidar_donde(lambda clave: clave[0] == datos)
+
+    directorio = _directorio_disco(datos)
+    if directorio:
+        shutil.rmtree(directorio, ignore_errors=True)
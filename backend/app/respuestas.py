@@ -0,0 +1,39 @@
+"""
+Respuestas JSON validadas y serializadas una sola vez
+Los objetos ORM se validan contra el schema y pydantic-core los codifica
+directamente a bytes, sin la segunda validación de response_model
+ni el paso por jsonable_encoder.
+"""
+
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def _adaptador(tipo: Any) -> TypeAdapter:
+    """TypeAdapter por schema (construirlo compila el validador: se hace una vez)"""
+    return TypeAdapter(tipo)
+
+
+def json_de(
+    tipo: Any,
+    datos: Any,
+    status_code: int = 200,
+    exclude_unset: bool = False,
+    headers: Optional[Mapping[str, str]] = None
+) -> Response:
+    """
+    Validar `datos` (objetos ORM, dicts o modelos) contra `tipo` y responder el JSON ya codificado
+    El response_model de la ruta queda para la documentación OpenAPI.
+    Al devolver una Response propia FastAPI no copia los headers del parámetro `response`:
+    las rutas que los usan (X-Next-Cursor) los pasan en `headers`.
+    """
+    adaptador = _adaptador(tipo)
+    contenido = adaptador.dump_json(
+        adaptador.validate_python(datos, from_attributes=True),
+        exclude_unset=exclude_unset
+    )
+    return Response(content=contenido, status_code=status_code, headers=headers, media_type="application/json")
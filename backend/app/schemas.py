@@ -88,6 +88,20 @@ class EquipoResponse(EquipoBase):
         from_attributes = True
 
 
+class ErrorImportacion(BaseModel):
+    """Fila rechazada en una importación masiva"""
+    fila: int
+    codigo_qr: Optional[str] = None
+    error: str
+
+
+class ImportacionResponse(BaseModel):
+    """Resultado de una importación masiva de equipos"""
+    total_filas: int
+    insertados: int
+    errores: List[ErrorImportacion] = []
+
+
 # ==================== TIPO INTERVENCIÓN ====================
 
 class TipoIntervencionBase(BaseModel):
@@ -111,6 +125,7 @@ class TipoIntervencionResponse(TipoIntervencionBase):
     """Schema de respuesta de tipo de intervención"""
     id: int
     fecha_creacion: datetime
+    fecha_actualizacion: datetime
 
     class Config:
         from_attributes = True
@@ -132,6 +147,12 @@ class IntervencionCreate(IntervencionBase):
     pass
 
 
+class IntervencionLoteItem(IntervencionCreate):
+    """Intervención registrada sin conexión y sincronizada en lote"""
+    clave_idempotencia: Optional[str] = Field(None, min_length=1, max_length=100)
+    fecha_inicio: Optional[datetime] = None
+
+
 class IntervencionUpdate(BaseModel):
     """Schema para actualizar intervención"""
     descripcion: Optional[str] = None
@@ -155,6 +176,14 @@ class IntervencionResponse(IntervencionBase):
         from_attributes = True
 
 
+class ResultadoLoteIntervencion(BaseModel):
+    """Resultado de una intervención del lote: creada, existente (clave ya usada) o error"""
+    indice: int
+    estado: str
+    intervencion: Optional[IntervencionResponse] = None
+    error: Optional[str] = None
+
+
 class IntervencionDetailResponse(IntervencionResponse):
     """Schema detallado de intervención con relaciones"""
     equipo: EquipoResponse
@@ -162,6 +191,35 @@ class IntervencionDetailResponse(IntervencionResponse):
     tipo_intervencion: TipoIntervencionResponse
 
 
+class IntervencionExpandidaResponse(IntervencionResponse):
+    """Schema de intervención con las relaciones pedidas en ?expand="""
+    equipo: Optional[EquipoResponse] = None
+    usuario: Optional[UsuarioResponse] = None
+    tipo_intervencion: Optional[TipoIntervencionResponse] = None
+
+
+# ==================== CAMBIOS ====================
+
+class EliminacionResponse(BaseModel):
+    """Fila borrada físicamente"""
+    entidad: str
+    entidad_id: int
+    fecha_eliminacion: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class CambiosResponse(BaseModel):
+    """Cambios desde un instante; `hasta` es el since de la próxima sincronización"""
+    equipos: List[EquipoResponse]
+    tipos_intervencion: List[TipoIntervencionResponse]
+    intervenciones: List[IntervencionResponse]
+    eliminados: List[EliminacionResponse]
+    hasta: datetime
+    siguiente_cursor: Optional[str] = None
+
+
 # ==================== AUTH ====================
 
 class TokenResponse(BaseModel):
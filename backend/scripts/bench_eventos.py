@@ -0,0 +1,82 @@
+"""
+Benchmark del reparto de eventos en vivo
+N conexiones suscritas (con lectores de distinta velocidad) y M eventos publicados
+desde un hilo, como lo hace crud: mide la latencia de entrega y cuánto se coalesce.
+
+Ejecutar: python scripts/bench_eventos.py [--conexiones 500] [--eventos 5000] [--entidades 200]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Agregar el directorio padre al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.eventos import BrokerMemoria
+
+
+async def lector(broker, demora: float, latencias: list, recibidos: list, fin: asyncio.Event):
+    """Una pantalla: lee lo pendiente y tarda `demora` en procesarlo"""
+    suscripcion = broker.suscribir()
+    try:
+        while not fin.is_set():
+            eventos = await suscripcion.esperar(timeout=0.1)
+            ahora = time.perf_counter()
+            latencias.extend(ahora - e["publicado"] for e in eventos if "publicado" in e)
+            recibidos.append(len(eventos))
+            await asyncio.sleep(demora)
+    finally:
+        broker.desuscribir(suscripcion)
+
+
+async def main(args):
+    broker = BrokerMemoria()
+    latencias, recibidos = [], []
+    fin = asyncio.Event()
+    # Un 10% de pantallas lentas (100 ms por lote)
+    lectores = [
+        asyncio.create_task(lector(broker, 0.1 if n % 10 == 0 else 0.001, latencias, recibidos, fin))
+        for n in range(args.conexiones)
+    ]
+    await asyncio.sleep(0.1)
+
+    def publicar():
+        for _ in range(args.eventos):
+            broker.publicar({
+                "tipo": "intervencion", "accion": "actualizado",
+                "id": random.randrange(args.entidades), "publicado": time.perf_counter(),
+            })
+            time.sleep(0.0002)
+
+    inicio = time.perf_counter()
+    hilo = threading.Thread(target=publicar)
+    hilo.start()
+    await asyncio.to_thread(hilo.join)
+    segundos = time.perf_counter() - inicio
+    await asyncio.sleep(0.3)
+    estadisticas = broker.estadisticas()
+    fin.set()
+    await asyncio.gather(*lectores)
+
+    entregados = len(latencias)
+    posibles = args.eventos * args.conexiones
+    latencias.sort()
+    print(f"{args.conexiones} conexiones, {args.eventos} eventos sobre {args.entidades} entidades en {segundos:.2f} s")
+    print(f"  entregados {entregados:,} de {posibles:,} ({entregados / posibles:.0%}, el resto coalescido)")
+    print(f"  latencia p50 {statistics.median(latencias) * 1000:.2f} ms, "
+          f"p99 {latencias[int(len(latencias) * 0.99)] * 1000:.2f} ms")
+    print(f"  {estadisticas}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de eventos en vivo")
+    parser.add_argument("--conexiones", type=int, default=500)
+    parser.add_argument("--eventos", type=int, default=5000)
+    parser.add_argument("--entidades", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,68 @@
+"""
+Benchmark de importación masiva de equipos
+Genera un CSV en memoria y lo importa sobre una base SQLite temporal
+(o sobre --url, que debe apuntar a una base vacía de pruebas).
+
+Ejecutar: python scripts/bench_importacion.py [--filas 100000] [--lote 5000] [--url postgresql://...]
+"""
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Agregar el directorio padre al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app import importacion
+
+
+def generar_csv(filas: int) -> bytes:
+    """CSV con `filas` equipos distintos"""
+    buffer = io.StringIO()
+    buffer.write("codigo_qr,nombre,ubicacion,tipo,modelo,serie,fabricante\n")
+    for n in range(filas):
+        buffer.write(f"BENCH-{n:07d},Equipo {n},Pasillo {n % 40},Bomba,M-{n % 7},S-{n},ACME\n")
+    return buffer.getvalue().encode()
+
+
+def main(args):
+    ruta = None
+    url = args.url
+    if not url:
+        ruta = os.path.join(tempfile.mkdtemp(), "bench_importacion.db")
+        url = f"sqlite:///{ruta}"
+
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+
+    contenido = generar_csv(args.filas)
+    print(f"CSV generado: {args.filas} filas, {len(contenido) / 1e6:.1f} MB")
+
+    db = SessionLocal()
+    inicio = time.perf_counter()
+    resultado = importacion.importar_equipos(db, io.BytesIO(contenido), "csv", tamano_lote=args.lote)
+    segundos = time.perf_counter() - inicio
+    db.close()
+
+    print(f"Insertados: {resultado.insertados}  errores: {len(resultado.errores)}")
+    print(f"Tiempo: {segundos:.2f} s  ({resultado.insertados / segundos:,.0f} filas/s)")
+
+    if ruta:
+        os.remove(ruta)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de importación masiva de equipos")
+    parser.add_argument("--filas", type=int, default=100000)
+    parser.add_argument("--lote", type=int, default=importacion.IMPORTACION_LOTE)
+    parser.add_argument("--url", default=None, help="URL de una base vacía (por defecto SQLite temporal)")
+    main(parser.parse_args())
@@ -0,0 +1,96 @@
+"""
+Benchmark de paginación: offset vs cursor (keyset) a distintas profundidades
+Usa una base SQLite temporal con las intervenciones de un mismo equipo.
+
+Ejecutar: python scripts/bench_paginacion.py [--filas 250000] [--limit 20]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Agregar el directorio padre al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app import crud, models
+
+
+def poblar(engine, filas: int) -> None:
+    """Insertar un equipo y `filas` intervenciones"""
+    with engine.begin() as conn:
+        conn.execute(insert(models.Usuario).values(
+            id=1, email="bench@example.com", nombre="Bench", rol="TECNICO", hashed_password="x"
+        ))
+        conn.execute(insert(models.Equipo).values(
+            id=1, codigo_qr="BENCH-1", nombre="Bench", ubicacion="A", tipo="Bomba"
+        ))
+        conn.execute(insert(models.TipoIntervencion).values(id=1, nombre="Bench"))
+
+        inicio = datetime(2020, 1, 1)
+        lote = 50000
+        for desde in range(0, filas, lote):
+            conn.execute(insert(models.Intervencion), [
+                {
+                    "equipo_id": 1,
+                    "usuario_id": 1,
+                    "tipo_id": 1,
+                    "descripcion": "Intervención de benchmark",
+                    "fecha_inicio": inicio + timedelta(minutes=n),
+                }
+                for n in range(desde, min(desde + lote, filas))
+            ])
+
+
+def medir(funcion, repeticiones: int = 5) -> float:
+    """Mejor tiempo en ms de varias repeticiones"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return min(tiempos)
+
+
+def main(args):
+    ruta = os.path.join(tempfile.mkdtemp(), "bench_paginacion.db")
+    engine = create_engine(f"sqlite:///{ruta}")
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+
+    print(f"Insertando {args.filas} intervenciones...")
+    poblar(engine, args.filas)
+
+    db = SessionLocal()
+    print(f"\n{'página':>8}{'offset ms':>12}{'cursor ms':>12}")
+    for pagina in (1, 10, 100, 1000, 10000):
+        skip = (pagina - 1) * args.limit
+        if skip >= args.filas:
+            break
+
+        # Cursor equivalente: última fila de la página anterior
+        cursor = None
+        if skip:
+            anterior = crud.obtener_historial_equipo(db, 1, skip=skip - 1, limit=1)[0]
+            cursor = (anterior.fecha_inicio, anterior.id)
+
+        t_offset = medir(lambda: crud.obtener_historial_equipo(db, 1, skip=skip, limit=args.limit))
+        t_cursor = medir(lambda: crud.obtener_historial_equipo(db, 1, limit=args.limit, cursor=cursor))
+        print(f"{pagina:>8}{t_offset:>12.2f}{t_cursor:>12.2f}")
+
+    db.close()
+    os.remove(ruta)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de paginación offset vs cursor")
+    parser.add_argument("--filas", type=int, default=250000)
+    parser.add_argument("--limit", type=int, default=20)
+    main(parser.parse_args())
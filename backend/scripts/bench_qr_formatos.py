@@ -0,0 +1,63 @@
+"""
+Benchmark de formatos del QR: bytes en la red y CPU por petición
+Compara JSON con PNG en base64, PNG binario y SVG, sin cache (peor caso)
+y con el tamaño gzip como referencia de un proxy que comprime.
+
+Ejecutar: python scripts/bench_qr_formatos.py [--codigos 500] [--tamano 10]
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+
+# Agregar el directorio padre al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app import qr_gen
+
+
+def cuerpo_json(codigo: str, tamaño: int) -> bytes:
+    return json.dumps({
+        "equipo_id": 1,
+        "codigo_qr": codigo,
+        "qr_image": qr_gen.generar_qr_base64(codigo, tamaño),
+    }).encode()
+
+
+FORMATOS = {
+    "json (base64)": cuerpo_json,
+    "image/png": qr_gen.generar_qr,
+    "image/svg+xml": qr_gen.generar_qr_svg,
+}
+
+
+def main(args):
+    codigos = [f"EQ-{n:06d}-BODEGA-NORTE" for n in range(args.codigos)]
+
+    print(f"{'formato':<16}{'bytes':>10}{'gzip':>10}{'CPU ms':>10}")
+    for nombre, generar in FORMATOS.items():
+        total_bytes = total_gzip = 0
+        inicio = time.process_time()
+        for codigo in codigos:
+            cuerpo = generar(codigo, args.tamano)
+            total_bytes += len(cuerpo)
+        cpu = time.process_time() - inicio
+
+        for codigo in codigos[:50]:
+            total_gzip += len(gzip.compress(generar(codigo, args.tamano)))
+
+        print(
+            f"{nombre:<16}{total_bytes / len(codigos):>10.0f}"
+            f"{total_gzip / min(50, len(codigos)):>10.0f}"
+            f"{cpu / len(codigos) * 1000:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de formatos del QR")
+    parser.add_argument("--codigos", type=int, default=500)
+    parser.add_argument("--tamano", type=int, default=10)
+    main(parser.parse_args())
@@ -0,0 +1,89 @@
+"""
+Benchmark de serialización del listado de intervenciones
+Compara la ruta anterior (from_orm por elemento + response_model + encoder json)
+con la actual (una validación y JSON codificado por pydantic-core / orjson),
+sin BD: mide solo el costo de la respuesta.
+
+Ejecutar: python scripts/bench_respuestas.py [--items 100] [--peticiones 2000]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+# Agregar el directorio padre al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+import httpx
+
+from app import respuestas, schemas
+
+
+def crear_intervenciones(cantidad: int) -> list:
+    """Objetos con los atributos de una intervención, como los entrega el ORM"""
+    inicio = datetime(2024, 3, 1, 8, 0, 0)
+    return [
+        SimpleNamespace(
+            id=n, equipo_id=n % 50 + 1, usuario_id=n % 7 + 1, tipo_id=n % 5 + 1,
+            descripcion=f"Revisión preventiva {n}", observaciones="Sin novedad", tiempo_duracion=45,
+            completada=n % 2 == 0, fecha_inicio=inicio + timedelta(minutes=n),
+            fecha_fin=inicio + timedelta(minutes=n + 45) if n % 2 == 0 else None,
+            fecha_creacion=inicio, fecha_actualizacion=inicio,
+        )
+        for n in range(cantidad)
+    ]
+
+
+def crear_app(intervenciones: list) -> FastAPI:
+    anterior = FastAPI(default_response_class=JSONResponse)
+    actual = FastAPI(default_response_class=ORJSONResponse)
+
+    @anterior.get("/intervenciones", response_model=list[schemas.IntervencionResponse])
+    async def listar_anterior():
+        return [schemas.IntervencionResponse.from_orm(i) for i in intervenciones]
+
+    @actual.get("/intervenciones", response_model=list[schemas.IntervencionResponse])
+    async def listar_actual():
+        return respuestas.json_de(list[schemas.IntervencionResponse], intervenciones)
+
+    app = FastAPI()
+    app.mount("/anterior", anterior)
+    app.mount("/actual", actual)
+    return app
+
+
+async def medir(client: httpx.AsyncClient, ruta: str, peticiones: int) -> float:
+    await client.get(ruta)
+    inicio = time.perf_counter()
+    for _ in range(peticiones):
+        await client.get(ruta)
+    return peticiones / (time.perf_counter() - inicio)
+
+
+async def main(args):
+    # Cliente ASGI en el mismo event loop: sin red ni hilos que diluyan la diferencia
+    transporte = httpx.ASGITransport(app=crear_app(crear_intervenciones(args.items)))
+    async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as client:
+        anterior = await client.get("/anterior/intervenciones")
+        actual = await client.get("/actual/intervenciones")
+        assert anterior.json() == actual.json(), "Las dos rutas deben devolver el mismo JSON"
+
+        print(f"Listado de {args.items} intervenciones, {args.peticiones} peticiones")
+        resultados = {}
+        for nombre in ("anterior", "actual"):
+            resultados[nombre] = await medir(client, f"/{nombre}/intervenciones", args.peticiones)
+            print(f"  {nombre:<10}{resultados[nombre]:>10,.0f} req/s")
+        print(f"  mejora    {resultados['actual'] / resultados['anterior']:>10.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de serialización de respuestas")
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--peticiones", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
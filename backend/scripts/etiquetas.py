@@ -0,0 +1,69 @@
+"""
+Script para generar la hoja de etiquetas QR (PDF o ZIP) desde la línea de comandos
+Con --sinteticas N no consulta la BD: sirve para medir etiquetas/seg según --workers
+
+Ejecutar: python scripts/etiquetas.py --salida etiquetas.pdf [--formato pdf|zip]
+          [--ubicacion "Pasillo 3"] [--tipo Bomba] [--ids 1,2,3] [--workers 4] [--sinteticas 5000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Agregar el directorio padre al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def obtener_codigos(args) -> list:
+    """Códigos del filtro, o N códigos de prueba con --sinteticas"""
+    if args.sinteticas:
+        return [f"BENCH-{n:07d}" for n in range(args.sinteticas)]
+
+    from app.database import SessionLocal
+    from app import crud
+
+    ids = [int(i) for i in args.ids.split(",")] if args.ids else None
+    db = SessionLocal()
+    try:
+        return crud.obtener_codigos_qr(db, tipo=args.tipo, ubicacion=args.ubicacion, ids=ids)
+    finally:
+        db.close()
+
+
+def main(args):
+    if args.workers:
+        # Antes de importar etiquetas: el pool toma el valor de la variable de entorno
+        os.environ["ETIQUETAS_WORKERS"] = str(args.workers)
+
+    from app import etiquetas
+
+    codigos = obtener_codigos(args)
+    if not codigos:
+        print("No hay equipos para el filtro")
+        return
+
+    formato = args.formato or Path(args.salida).suffix.lstrip(".") or "pdf"
+    inicio = time.perf_counter()
+    bytes_escritos = 0
+    with open(args.salida, "wb") as archivo:
+        for bloque in etiquetas.generar_hoja(codigos, formato):
+            archivo.write(bloque)
+            bytes_escritos += len(bloque)
+    segundos = time.perf_counter() - inicio
+
+    print(f"✓ {len(codigos)} etiquetas en {args.salida} ({bytes_escritos / 1e6:.1f} MB)")
+    print(f"  {segundos:.2f} s, {len(codigos) / segundos:,.0f} etiquetas/s con {etiquetas.ETIQUETAS_WORKERS} procesos")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generar hoja de etiquetas QR")
+    parser.add_argument("--salida", required=True)
+    parser.add_argument("--formato", choices=["pdf", "zip"], default=None)
+    parser.add_argument("--ubicacion", default=None)
+    parser.add_argument("--tipo", default=None)
+    parser.add_argument("--ids", default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--sinteticas", type=int, default=0)
+    main(parser.parse_args())
@@ -0,0 +1,51 @@
+"""
+Script para exportar el historial de intervenciones (NDJSON o CSV) sin pasar por la API
+Reporta filas/s y la memoria máxima del proceso: no debe crecer con la tabla
+
+Ejecutar: python scripts/exportar_intervenciones.py --salida intervenciones.ndjson
+          [--formato ndjson|csv] [--since 2024-03-01T00:00:00]
+"""
+
+import argparse
+import resource
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Agregar el directorio padre al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app import exportacion
+
+
+def main(args):
+    formato = args.formato or Path(args.salida).suffix.lstrip(".") or "ndjson"
+    since = datetime.fromisoformat(args.since) if args.since else None
+
+    db = SessionLocal()
+    inicio = time.perf_counter()
+    filas = 0
+    try:
+        with open(args.salida, "wb") as archivo:
+            for bloque in exportacion.exportar_intervenciones(db, formato, since):
+                archivo.write(bloque)
+                filas += bloque.count(b"\n")
+    finally:
+        db.close()
+    segundos = time.perf_counter() - inicio
+
+    if formato == "csv":
+        filas -= 1
+    memoria = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"✓ {filas} intervenciones en {args.salida}")
+    print(f"  {segundos:.2f} s, {filas / max(segundos, 1e-9):,.0f} filas/s, memoria máxima {memoria:.0f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exportar intervenciones")
+    parser.add_argument("--salida", required=True)
+    parser.add_argument("--formato", choices=list(exportacion.FORMATOS), default=None)
+    parser.add_argument("--since", default=None)
+    main(parser.parse_args())
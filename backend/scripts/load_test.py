@@ -0,0 +1,140 @@
+"""
+Prueba de carga con lecturas y escrituras concurrentes
+Mide latencias p50/p95/p99 contra un servidor en ejecución.
+
+Ejecutar (comparar ambos modos con la misma base de datos):
+    DB_ASYNC=false uvicorn app.main:app --port 8000
+    python scripts/load_test.py --url http://localhost:8000
+
+    DB_ASYNC=true uvicorn app.main:app --port 8000
+    python scripts/load_test.py --url http://localhost:8000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+def percentil(valores, p):
+    """Percentil p (0-100) de una lista de latencias"""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+async def preparar(client: httpx.AsyncClient, email: str, password: str) -> dict:
+    """Login y datos mínimos (equipo y tipo) para las escrituras"""
+    response = await client.post("/api/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    equipo = await client.post(
+        "/api/equipos",
+        headers=headers,
+        json={
+            "codigo_qr": f"LOAD-{uuid.uuid4().hex[:10]}",
+            "nombre": "Equipo prueba de carga",
+            "ubicacion": "Bodega carga",
+            "tipo": "Compresor"
+        }
+    )
+    equipo.raise_for_status()
+
+    tipos = await client.get("/api/tipos-intervencion", headers=headers)
+    tipos.raise_for_status()
+    if not tipos.json():
+        raise SystemExit("No hay tipos de intervención, ejecutar scripts/create_admin.py")
+
+    return {
+        "headers": headers,
+        "equipo_id": equipo.json()["id"],
+        "tipo_id": tipos.json()[0]["id"],
+    }
+
+
+async def operacion(client: httpx.AsyncClient, ctx: dict, proporcion_escritura: float):
+    """Ejecutar una operación aleatoria y devolver (nombre, latencia, status)"""
+    headers = ctx["headers"]
+
+    if random.random() < proporcion_escritura:
+        nombre = "POST /api/intervenciones"
+        peticion = client.post(
+            "/api/intervenciones",
+            headers=headers,
+            json={
+                "equipo_id": ctx["equipo_id"],
+                "tipo_id": ctx["tipo_id"],
+                "descripcion": "Intervención de prueba de carga"
+            }
+        )
+    else:
+        nombre, url = random.choice([
+            ("GET /api/intervenciones", "/api/intervenciones?limit=50"),
+            ("GET /api/equipos", "/api/equipos?limit=50"),
+            ("GET /api/estadisticas", "/api/estadisticas"),
+            ("GET /api/equipos/{id}/historial", f"/api/equipos/{ctx['equipo_id']}/historial"),
+        ])
+        peticion = client.get(url, headers=headers)
+
+    inicio = time.perf_counter()
+    try:
+        codigo = (await peticion).status_code
+    except httpx.HTTPError:
+        codigo = 599  # Conexión cortada o timeout
+    return nombre, (time.perf_counter() - inicio) * 1000, codigo
+
+
+async def main(args):
+    limites = httpx.Limits(max_connections=args.concurrencia)
+    async with httpx.AsyncClient(base_url=args.url, limits=limites, timeout=60) as client:
+        ctx = await preparar(client, args.email, args.password)
+
+        resultados = []
+        cola = asyncio.Queue()
+        for _ in range(args.peticiones):
+            cola.put_nowait(None)
+
+        async def trabajador():
+            while not cola.empty():
+                cola.get_nowait()
+                resultados.append(await operacion(client, ctx, args.escrituras))
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(trabajador() for _ in range(args.concurrencia)))
+        duracion = time.perf_counter() - inicio
+
+    errores = sum(1 for _, _, codigo in resultados if codigo >= 400)
+    print(f"\nPeticiones: {len(resultados)} | Concurrencia: {args.concurrencia} | "
+          f"Duración: {duracion:.2f}s | Throughput: {len(resultados) / duracion:.1f} req/s | "
+          f"Errores: {errores}")
+    print(f"{'operación':<34}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+
+    por_operacion = {}
+    for nombre, latencia, _ in resultados:
+        por_operacion.setdefault(nombre, []).append(latencia)
+    por_operacion["TOTAL"] = [latencia for _, latencia, _ in resultados]
+
+    for nombre, latencias in sorted(por_operacion.items()):
+        print(f"{nombre:<34}{len(latencias):>6}"
+              f"{statistics.median(latencias):>10.1f}"
+              f"{percentil(latencias, 95):>10.1f}"
+              f"{percentil(latencias, 99):>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--email", default="admin@bodega.com")
+    parser.add_argument("--password", default="Admin123!")
+    parser.add_argument("--peticiones", type=int, default=2000)
+    parser.add_argument("--concurrencia", type=int, default=100)
+    parser.add_argument("--escrituras", type=float, default=0.2,
+                        help="Proporción de escrituras (0-1)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,35 @@
+"""
+Script para aplicar migraciones de esquema pendientes
+Ejecutar: python scripts/migrar.py
+"""
+
+import sys
+from pathlib import Path
+
+# Agregar el directorio padre al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import engine, Base
+from app import models
+from app.migraciones import aplicar_migraciones
+
+
+def migrar():
+    """Crear tablas nuevas y aplicar migraciones pendientes"""
+    print("Creando tablas nuevas...")
+    Base.metadata.create_all(bind=engine)
+
+    print("Aplicando migraciones...")
+    aplicadas = aplicar_migraciones(engine)
+
+    for migracion_id in aplicadas:
+        print(f"  ✓ {migracion_id}")
+
+    if not aplicadas:
+        print("  Sin migraciones pendientes")
+
+    print("✓ Esquema actualizado")
+
+
+if __name__ == "__main__":
+    migrar()
@@ -0,0 +1,46 @@
+"""
+Script para pre-generar las imágenes QR de los equipos activos en la cache en disco
+Útil antes de imprimir etiquetas de una bodega o pasillo completo (requiere QR_CACHE_DIR)
+Ejecutar: python scripts/prerender_qr.py [--ubicacion "Pasillo 3"] [--tipo Bomba]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Agregar el directorio padre al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app import crud, qr_gen
+
+
+def prerender(ubicacion: str = None, tipo: str = None):
+    """Generar (o confirmar en cache) el QR de cada equipo activo del filtro"""
+    if not qr_gen.QR_CACHE_DIR:
+        print("⚠ QR_CACHE_DIR no está configurado: las imágenes solo quedarán en memoria de este proceso")
+
+    db = SessionLocal()
+    try:
+        codigos = [
+            e.codigo_qr
+            for e in crud.obtener_todos_equipos(db, limit=None, tipo=tipo, ubicacion=ubicacion)
+        ]
+    finally:
+        db.close()
+
+    inicio = time.perf_counter()
+    for codigo_qr in codigos:
+        qr_gen.obtener_qr(codigo_qr)
+    segundos = time.perf_counter() - inicio
+
+    print(f"✓ {len(codigos)} QR listos en {segundos:.2f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-generar imágenes QR de equipos")
+    parser.add_argument("--ubicacion", default=None)
+    parser.add_argument("--tipo", default=None)
+    args = parser.parse_args()
+    prerender(args.ubicacion, args.tipo)
@@ -0,0 +1,29 @@
+"""
+Script para reconstruir los contadores de estadísticas desde cero
+Ejecutar: python scripts/reconciliar_contadores.py (p. ej. en un cron nocturno)
+"""
+
+import sys
+from pathlib import Path
+
+# Agregar el directorio padre al path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import SessionLocal
+from app import crud
+
+
+def reconciliar():
+    """Recalcular los contadores materializados"""
+    db = SessionLocal()
+    try:
+        valores = crud.reconstruir_contadores(db)
+        for nombre, valor in valores.items():
+            print(f"  {nombre}: {valor}")
+        print("✓ Contadores reconciliados")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    reconciliar()
@@ -0,0 +1,49 @@
+"""
+Fixtures compartidas por los tests
+"""
+
+from contextlib import contextmanager
+from typing import Iterator, List
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import cache_equipos
+
+
+@contextmanager
+def _contar_consultas() -> Iterator[List[str]]:
+    """Registrar las sentencias SQL emitidas por cualquier engine dentro del bloque"""
+    consultas: List[str] = []
+
+    def registrar(conn, cursor, statement, *args):
+        consultas.append(statement)
+
+    # Escuchar la clase Engine: cada módulo de tests crea su propio engine
+    event.listen(Engine, "before_cursor_execute", registrar)
+    try:
+        yield consultas
+    finally:
+        event.remove(Engine, "before_cursor_execute", registrar)
+
+
+@pytest.fixture
+def contar_consultas():
+    """
+    Contador de sentencias SQL para detectar N+1
+
+    Uso:
+        with contar_consultas() as consultas:
+            client.get(...)
+        assert len(consultas) == 2
+    """
+    return _contar_consultas
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache_equipos():
+    """Cada test recrea la BD: los ids se reutilizan y la cache quedaría con datos de otro test"""
+    if cache_equipos.cache_equipos is not None:
+        cache_equipos.cache_equipos.limpiar()
+    yield
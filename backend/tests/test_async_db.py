@@ -0,0 +1,110 @@
+"""
+Tests para el acceso asíncrono a base de datos
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app, get_db
+from app.database import Base
+from app import crud_async, schemas
+
+
+# Misma base de datos de prueba, accedida con driver síncrono y asíncrono
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+ASYNC_SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def nueva_sesion_async():
+    """Crear engine y sesión asíncronos ligados al loop actual"""
+    async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL)
+    return async_engine, async_sessionmaker(
+        bind=async_engine, class_=AsyncSession, expire_on_commit=False
+    )
+
+
+@pytest.fixture(autouse=True)
+def setup_teardown():
+    """Setup y teardown para cada test"""
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def client_async():
+    """Cliente cuyas rutas reciben AsyncSession en lugar de Session"""
+    async def override_get_async_db():
+        async_engine, AsyncTestingSessionLocal = nueva_sesion_async()
+        async with AsyncTestingSessionLocal() as db:
+            yield db
+        await async_engine.dispose()
+
+    anterior = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_async_db
+    yield TestClient(app)
+    if anterior:
+        app.dependency_overrides[get_db] = anterior
+    else:
+        app.dependency_overrides.pop(get_db, None)
+
+
+def equipo_de_prueba(codigo_qr: str = "QR-ASYNC-1") -> schemas.EquipoCreate:
+    return schemas.EquipoCreate(
+        codigo_qr=codigo_qr,
+        nombre="Compresor",
+        ubicacion="Pasillo 1",
+        tipo="Compresor"
+    )
+
+
+def test_crud_async_con_async_session():
+    """Las operaciones crud corren sobre AsyncSession"""
+    async def escenario():
+        async_engine, AsyncTestingSessionLocal = nueva_sesion_async()
+        async with AsyncTestingSessionLocal() as db:
+            creado = await crud_async.crear_equipo(db, equipo_de_prueba())
+            encontrado = await crud_async.obtener_equipo_por_qr(db, "QR-ASYNC-1")
+            stats = await crud_async.obtener_estadisticas_equipos(db)
+        await async_engine.dispose()
+        return creado, encontrado, stats
+
+    creado, encontrado, stats = asyncio.run(escenario())
+    assert encontrado.id == creado.id
+    assert stats["total_equipos"] == 1
+
+
+def test_crud_async_con_session_sincrona():
+    """Con Session síncrona las operaciones se delegan al threadpool"""
+    async def escenario():
+        db = TestingSessionLocal()
+        try:
+            await crud_async.crear_equipo(db, equipo_de_prueba("QR-SYNC-1"))
+            return await crud_async.obtener_todos_equipos(db)
+        finally:
+            db.close()
+
+    equipos = asyncio.run(escenario())
+    assert [e.codigo_qr for e in equipos] == ["QR-SYNC-1"]
+
+
+def test_login_invalido_con_async_session(client_async):
+    """Las rutas funcionan igual con la sesión asíncrona"""
+    response = client_async.post(
+        "/api/auth/login",
+        json={
+            "email": "noexiste@example.com",
+            "password": "password123"
+        }
+    )
+    assert response.status_code == 401
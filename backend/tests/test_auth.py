@@ -9,7 +9,7 @@ from sqlalchemy.orm import sessionmaker
 
 from app.main import app, get_db
 from app.database import Base
-from app import crud, schemas
+from app import auth, crud, deps, schemas
 
 
 # Crear base de datos de prueba en memoria
@@ -83,3 +83,122 @@ def test_root_endpoint():
     response = client.get("/")
     assert response.status_code == 200
     assert "version" in response.json()
+
+
+def crear_usuario_prueba(email: str = "tecnico@example.com", password: str = "testpass123"):
+    """Crear usuario directamente en la base de datos de prueba"""
+    db = TestingSessionLocal()
+    try:
+        return crud.crear_usuario(
+            db,
+            schemas.UsuarioCreate(
+                email=email,
+                nombre="Tecnico Test",
+                rol="TECNICO",
+                password=password
+            )
+        )
+    finally:
+        db.close()
+
+
+def test_login_valido():
+    """Test login correcto con verificación bcrypt en el pool"""
+    crear_usuario_prueba()
+    completadas = auth.obtener_metricas_hash()["completadas"]
+
+    response = client.post(
+        "/api/auth/login",
+        json={"email": "tecnico@example.com", "password": "testpass123"}
+    )
+    assert response.status_code == 200
+    assert response.json()["usuario"]["email"] == "tecnico@example.com"
+    assert auth.obtener_metricas_hash()["completadas"] == completadas + 1
+
+    me = client.get(
+        "/api/auth/me",
+        headers={"Authorization": f"Bearer {response.json()['access_token']}"}
+    )
+    assert me.status_code == 200
+
+
+def test_login_pool_saturado(monkeypatch):
+    """Con la cola de bcrypt llena el login responde 503 con Retry-After"""
+    crear_usuario_prueba()
+    monkeypatch.setattr(auth, "HASH_MAX_PENDIENTES", 0)
+
+    response = client.post(
+        "/api/auth/login",
+        json={"email": "tecnico@example.com", "password": "testpass123"}
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(auth.HASH_RETRY_AFTER)
+    assert auth.obtener_metricas_hash()["rechazadas"] >= 1
+
+
+def test_auth_stateless_sin_consultas(monkeypatch, contar_consultas):
+    """En modo stateless el usuario sale del token sin consultar la BD"""
+    usuario = crear_usuario_prueba()
+    monkeypatch.setattr(deps, "AUTH_MODO", "stateless")
+
+    login = client.post(
+        "/api/auth/login",
+        json={"email": "tecnico@example.com", "password": "testpass123"}
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    with contar_consultas() as consultas:
+        response = client.get("/api/auth/me", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["id"] == usuario.id
+    assert consultas == []
+
+
+def test_auth_stateless_revocacion(monkeypatch):
+    """Cambiar el rol de un usuario revoca sus tokens anteriores"""
+    usuario = crear_usuario_prueba()
+    monkeypatch.setattr(deps, "AUTH_MODO", "stateless")
+
+    login = client.post(
+        "/api/auth/login",
+        json={"email": "tecnico@example.com", "password": "testpass123"}
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    db = TestingSessionLocal()
+    try:
+        crud.actualizar_usuario(db, usuario.id, schemas.UsuarioUpdate(rol="LECTURA"))
+    finally:
+        db.close()
+
+    response = client.get("/api/auth/me", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token revocado"
+
+
+def test_auth_cache_usuarios(monkeypatch):
+    """En modo cache el usuario se consulta una vez y se invalida al modificarlo"""
+    usuario = crear_usuario_prueba()
+    monkeypatch.setattr(deps, "AUTH_MODO", "cache")
+    deps.cache_usuarios.limpiar()
+
+    login = client.post(
+        "/api/auth/login",
+        json={"email": "tecnico@example.com", "password": "testpass123"}
+    )
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+    aciertos = deps.cache_usuarios.estadisticas()["aciertos"]
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+    assert deps.cache_usuarios.estadisticas()["aciertos"] == aciertos + 1
+
+    db = TestingSessionLocal()
+    try:
+        crud.actualizar_usuario(db, usuario.id, schemas.UsuarioUpdate(nombre="Otro Nombre"))
+    finally:
+        db.close()
+
+    response = client.get("/api/auth/me", headers=headers)
+    assert response.json()["nombre"] == "Otro Nombre"
@@ -0,0 +1,47 @@
+"""
+Tests para las caches en memoria
+"""
+
+import time
+
+from app.cache import CacheTTL
+
+
+def test_cache_lru_desaloja_menos_usada():
+    """Al superar el tope se desaloja la entrada menos usada"""
+    cache = CacheTTL(max_entradas=2, ttl_segundos=None)
+    cache.guardar("a", 1)
+    cache.guardar("b", 2)
+    cache.obtener("a")
+    cache.guardar("c", 3)
+
+    assert cache.obtener("b") is None
+    assert cache.obtener("a") == 1
+    assert cache.obtener("c") == 3
+    assert cache.estadisticas()["desalojos"] == 1
+
+
+def test_cache_ttl_expira():
+    """Las entradas expiran pasado el TTL"""
+    cache = CacheTTL(max_entradas=10, ttl_segundos=0.01)
+    cache.guardar("a", 1)
+    time.sleep(0.02)
+
+    assert cache.obtener("a") is None
+    stats = cache.estadisticas()
+    assert stats["expiraciones"] == 1
+    assert stats["fallos"] == 1
+
+
+def test_cache_invalidar_donde():
+    """Invalidar todas las entradas de un usuario"""
+    cache = CacheTTL()
+    cache.guardar((1, "token-a"), "u1")
+    cache.guardar((1, "token-b"), "u1")
+    cache.guardar((2, "token-c"), "u2")
+
+    cache.invalidar_donde(lambda clave: clave[0] == 1)
+
+    assert cache.obtener((1, "token-a")) is None
+    assert cache.obtener((2, "token-c")) == "u2"
+    assert cache.estadisticas()["invalidaciones"] == 2
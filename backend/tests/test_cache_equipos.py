@@ -0,0 +1,141 @@
+"""
+Tests para la cache de lectura de equipos (memoria y Redis)
+"""
+
+import fnmatch
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app, get_db
+from app.database import Base
+from app.auth import create_access_token
+from app.cache import CacheRedis
+from app import cache_equipos, deps, models
+
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+
+class RedisFalso:
+    """Subconjunto de la API de redis-py usado por CacheRedis"""
+
+    def __init__(self):
+        self.datos = {}
+
+    def get(self, clave):
+        valor, expira = self.datos.get(clave, (None, None))
+        if expira is not None and expira <= time.monotonic():
+            del self.datos[clave]
+            return None
+        return valor
+
+    def set(self, clave, valor, ex=None):
+        self.datos[clave] = (bytes(valor), time.monotonic() + ex if ex else None)
+        return True
+
+    def delete(self, *claves):
+        return sum(self.datos.pop(clave, None) is not None for clave in claves)
+
+    def scan_iter(self, match="*"):
+        return [clave for clave in list(self.datos) if fnmatch.fnmatch(clave, match)]
+
+
+@pytest.fixture(autouse=True)
+def setup_teardown():
+    """Setup y teardown para cada test"""
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(params=["memoria", "redis"])
+def backend(request, monkeypatch):
+    """Ejecutar cada test con los dos backends"""
+    if request.param == "redis":
+        cache = CacheRedis(RedisFalso(), "equipos:", ttl_segundos=60)
+    else:
+        cache = cache_equipos.crear_cache("memoria")
+    monkeypatch.setattr(cache_equipos, "cache_equipos", cache)
+    return cache
+
+
+@pytest.fixture
+def datos(monkeypatch):
+    """Técnico y un equipo; autenticación stateless para aislar las consultas del equipo"""
+    monkeypatch.setattr(deps, "AUTH_MODO", "stateless")
+    db = TestingSessionLocal()
+    try:
+        usuario = models.Usuario(
+            email="tecnico@example.com", nombre="Tecnico", rol="TECNICO", hashed_password="x"
+        )
+        equipo = models.Equipo(codigo_qr="QR-1", nombre="Bomba", ubicacion="A1", tipo="Bomba")
+        db.add_all([usuario, equipo])
+        db.commit()
+
+        token = create_access_token({
+            "sub": str(usuario.id),
+            "email": usuario.email,
+            "rol": "TECNICO",
+            "nombre": usuario.nombre,
+            "fecha_creacion": usuario.fecha_creacion.isoformat(),
+            "fecha_actualizacion": usuario.fecha_actualizacion.isoformat(),
+        })
+        return {"equipo_id": equipo.id, "headers": {"Authorization": f"Bearer {token}"}}
+    finally:
+        db.close()
+
+
+def test_escaneo_en_cache_sin_consultas(backend, datos, contar_consultas):
+    """Con la cache caliente el escaneo no consulta la BD, y el id comparte la entrada"""
+    primera = client.get("/api/equipos/qr/QR-1", headers=datos["headers"])
+    assert primera.status_code == 200
+
+    with contar_consultas() as consultas:
+        por_qr = client.get("/api/equipos/qr/QR-1", headers=datos["headers"])
+        por_id = client.get(f"/api/equipos/{datos['equipo_id']}", headers=datos["headers"])
+
+    assert consultas == []
+    assert por_qr.json() == por_id.json() == primera.json()
+    assert backend.estadisticas()["aciertos"] >= 2
+
+
+def test_actualizar_invalida(backend, datos):
+    """Modificar el equipo descarta las entradas por QR y por id"""
+    client.get("/api/equipos/qr/QR-1", headers=datos["headers"])
+    client.get(f"/api/equipos/{datos['equipo_id']}", headers=datos["headers"])
+
+    response = client.put(
+        f"/api/equipos/{datos['equipo_id']}", json={"ubicacion": "Z9"}, headers=datos["headers"]
+    )
+    assert response.status_code == 200
+
+    assert client.get("/api/equipos/qr/QR-1", headers=datos["headers"]).json()["ubicacion"] == "Z9"
+    assert client.get(f"/api/equipos/{datos['equipo_id']}", headers=datos["headers"]).json()["ubicacion"] == "Z9"
+
+
+def test_no_encontrado_no_se_cachea(backend, datos):
+    """Un QR inexistente responde 404 y no ocupa la cache"""
+    assert client.get("/api/equipos/qr/NO-EXISTE", headers=datos["headers"]).status_code == 404
+    assert backend.obtener(("qr", "NO-EXISTE")) is None
@@ -0,0 +1,171 @@
+"""
+Tests para el feed de cambios incremental (/api/cambios)
+"""
+
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app, get_db
+from app.database import Base
+from app.auth import create_access_token
+from app.migraciones import aplicar_migraciones, metadata_migraciones
+from app import crud, models
+
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def setup_teardown():
+    """Setup y teardown para cada test"""
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+    metadata_migraciones.drop_all(bind=engine)
+
+
+def marzo(dia: int) -> datetime:
+    return datetime(2024, 3, dia, 8, 0)
+
+
+@pytest.fixture
+def headers():
+    """Técnico, 3 equipos (modificados el 1, 2 y 3), un tipo (el 1) y 2 intervenciones (el 2 y 4)"""
+    db = TestingSessionLocal()
+    try:
+        usuario = models.Usuario(
+            email="tecnico@example.com", nombre="Tecnico", rol="TECNICO", hashed_password="x"
+        )
+        tipo = models.TipoIntervencion(nombre="Preventiva", fecha_actualizacion=marzo(1))
+        db.add_all([usuario, tipo])
+        for dia in (1, 2, 3):
+            db.add(models.Equipo(
+                codigo_qr=f"QR-{dia}", nombre="Bomba", ubicacion="A1", tipo="Bomba",
+                fecha_actualizacion=marzo(dia)
+            ))
+        db.flush()
+        for dia in (2, 4):
+            db.add(models.Intervencion(
+                equipo_id=1, usuario_id=usuario.id, tipo_id=tipo.id, descripcion=f"Revisión {dia}",
+                fecha_actualizacion=marzo(dia)
+            ))
+        db.commit()
+
+        token = create_access_token({"sub": str(usuario.id), "email": usuario.email, "rol": "TECNICO"})
+        return {"Authorization": f"Bearer {token}"}
+    finally:
+        db.close()
+
+
+def test_cambios_sin_since(headers):
+    """Sin since se entrega todo, con `hasta` como marca para la próxima sincronización"""
+    response = client.get("/api/cambios", headers=headers)
+
+    assert response.status_code == 200
+    datos = response.json()
+    assert [e["codigo_qr"] for e in datos["equipos"]] == ["QR-1", "QR-2", "QR-3"]
+    assert [t["nombre"] for t in datos["tipos_intervencion"]] == ["Preventiva"]
+    assert len(datos["intervenciones"]) == 2
+    assert datos["eliminados"] == []
+    assert datos["siguiente_cursor"] is None
+    assert datetime.fromisoformat(datos["hasta"]) < datetime.utcnow()
+
+
+def test_cambios_since(headers):
+    """Con since solo lo modificado desde ese instante (inclusive); admite zona horaria"""
+    response = client.get("/api/cambios?since=2024-03-03T05:00:00-03:00", headers=headers)
+
+    datos = response.json()
+    assert [e["codigo_qr"] for e in datos["equipos"]] == ["QR-3"]
+    assert datos["tipos_intervencion"] == []
+    assert [i["descripcion"] for i in datos["intervenciones"]] == ["Revisión 4"]
+
+
+def test_cambios_paginados_con_cursor(headers):
+    """Las páginas recorren todas las fuentes sin repetir filas ni incluir cambios posteriores al corte"""
+    vistos = []
+    response = client.get("/api/cambios?limit=1", headers=headers)
+    while True:
+        datos = response.json()
+        vistos += [("equipo", e["id"]) for e in datos["equipos"]]
+        vistos += [("intervencion", i["id"]) for i in datos["intervenciones"]]
+
+        # Un cambio hecho durante la sincronización queda para la próxima
+        db = TestingSessionLocal()
+        try:
+            crud.actualizar_equipo(db, 1, crud.schemas.EquipoUpdate(nombre="Bomba nueva"))
+        finally:
+            db.close()
+
+        if datos["siguiente_cursor"] is None:
+            break
+        response = client.get(f"/api/cambios?limit=1&cursor={datos['siguiente_cursor']}", headers=headers)
+
+    assert sorted(vistos) == [("equipo", 1), ("equipo", 2), ("equipo", 3), ("intervencion", 1), ("intervencion", 2)]
+
+    siguiente = client.get(f"/api/cambios?since={datos['hasta']}", headers=headers).json()
+    assert siguiente["equipos"] == []
+
+
+def test_cambios_bajas_y_eliminaciones(headers, monkeypatch):
+    """El equipo dado de baja llega con activo=false; la intervención borrada en eliminados"""
+    monkeypatch.setattr(crud, "CAMBIOS_MARGEN_SEGUNDOS", -60)
+    db = TestingSessionLocal()
+    try:
+        crud.eliminar_equipo(db, 2)
+        crud.eliminar_intervencion(db, 1)
+    finally:
+        db.close()
+
+    datos = client.get("/api/cambios?since=2024-03-05T00:00:00", headers=headers).json()
+    assert [(e["id"], e["activo"]) for e in datos["equipos"]] == [(2, False)]
+    assert [(e["entidad"], e["entidad_id"]) for e in datos["eliminados"]] == [("intervencion", 1)]
+
+
+def test_cambios_cursor_invalido(headers):
+    """Un cursor mal formado o con una fuente desconocida responde 400"""
+    from app import paginacion
+
+    assert client.get("/api/cambios?cursor=xyz", headers=headers).status_code == 400
+    cursor = paginacion.cursor_cambios(None, marzo(9), {"usuarios": (marzo(1), 1)})
+    assert client.get(f"/api/cambios?cursor={cursor}", headers=headers).status_code == 400
+
+
+def test_migracion_cambios_en_bd_existente():
+    """La migración agrega fecha_actualizacion a los tipos (desde fecha_creacion) y la tabla de eliminaciones"""
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_tipos_intervencion_actualizacion"))
+        conn.execute(text("ALTER TABLE tipos_intervencion DROP COLUMN fecha_actualizacion"))
+        conn.execute(text("DROP TABLE eliminaciones"))
+        conn.execute(text(
+            "INSERT INTO tipos_intervencion (nombre, fecha_creacion) VALUES ('Correctiva', '2024-01-01 00:00:00')"
+        ))
+
+    assert "0004_cambios_incrementales" in aplicar_migraciones(engine)
+
+    assert "eliminaciones" in inspect(engine).get_table_names()
+    with engine.connect() as conn:
+        fecha = conn.execute(text("SELECT fecha_actualizacion FROM tipos_intervencion")).scalar()
+    assert fecha.startswith("2024-01-01")
@@ -0,0 +1,100 @@
+"""
+Tests para las estadísticas y los contadores materializados
+"""
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app import crud, models, schemas
+
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def setup_teardown():
+    """Setup y teardown para cada test"""
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def db():
+    db = TestingSessionLocal()
+    usuario = models.Usuario(
+        email="tecnico@example.com", nombre="Tecnico", rol="TECNICO", hashed_password="x"
+    )
+    db.add_all([usuario, models.TipoIntervencion(nombre="Limpieza")])
+    db.commit()
+    yield db
+    db.close()
+
+
+def escenario(db):
+    """Altas, bajas y cambios de estado sobre equipos e intervenciones"""
+    equipos = [
+        crud.crear_equipo(db, schemas.EquipoCreate(
+            codigo_qr=f"QR-{n}", nombre="Bomba", ubicacion="A1", tipo="Bomba"
+        ))
+        for n in range(3)
+    ]
+    crud.eliminar_equipo(db, equipos[0].id)
+    crud.actualizar_equipo(db, equipos[1].id, schemas.EquipoUpdate(activo=False))
+    crud.actualizar_equipo(db, equipos[1].id, schemas.EquipoUpdate(activo=True))
+
+    intervenciones = [
+        crud.crear_intervencion(db, schemas.IntervencionCreate(
+            equipo_id=equipos[1].id, tipo_id=1, descripcion="Revisión"
+        ), usuario_id=1)
+        for _ in range(4)
+    ]
+    crud.completar_intervencion(db, intervenciones[0].id)
+    crud.completar_intervencion(db, intervenciones[0].id)
+    crud.actualizar_intervencion(db, intervenciones[1].id, schemas.IntervencionUpdate(completada=True))
+    crud.eliminar_intervencion(db, intervenciones[1].id)
+    crud.eliminar_intervencion(db, intervenciones[2].id)
+
+
+ESPERADO = {
+    "total_equipos": 2,
+    "total_intervenciones": 2,
+    "intervenciones_completadas": 1,
+    "intervenciones_pendientes": 1
+}
+
+
+def test_estadisticas_una_consulta(db):
+    """La consulta agregada resuelve todas las estadísticas en un solo SELECT"""
+    escenario(db)
+
+    consultas = []
+    def registrar(conn, cursor, statement, *args):
+        consultas.append(statement)
+
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        stats = crud.obtener_estadisticas_equipos(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+
+    assert stats == ESPERADO
+    assert len(consultas) == 1
+
+
+def test_contadores_incrementales(db, monkeypatch):
+    """Los contadores mantenidos por las escrituras coinciden con la reconstrucción"""
+    monkeypatch.setattr(crud, "ESTADISTICAS_CONTADORES", True)
+    assert crud.obtener_estadisticas_equipos(db) == dict.fromkeys(ESPERADO, 0)
+
+    escenario(db)
+
+    assert crud.obtener_estadisticas_equipos(db) == ESPERADO
+    assert crud.reconstruir_contadores(db) == ESPERADO
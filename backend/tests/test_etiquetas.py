@@ -0,0 +1,116 @@
+"""
+Tests para la generación de hojas de etiquetas QR
+"""
+
+import io
+import re
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app, get_db
+from app.database import Base
+from app.auth import create_access_token
+from app import etiquetas, models, qr_gen
+
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def setup_teardown():
+    """Setup y teardown para cada test"""
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def headers():
+    """Técnico y 20 equipos: 17 en el pasillo A y 3 en el B"""
+    db = TestingSessionLocal()
+    try:
+        usuario = models.Usuario(
+            email="tecnico@example.com", nombre="Tecnico", rol="TECNICO", hashed_password="x"
+        )
+        db.add(usuario)
+        for n in range(20):
+            db.add(models.Equipo(
+                codigo_qr=f"QR-{n}", nombre=f"Equipo {n}", ubicacion="A" if n < 17 else "B", tipo="Bomba"
+            ))
+        db.commit()
+        token = create_access_token({"sub": str(usuario.id), "email": usuario.email, "rol": "TECNICO"})
+        return {"Authorization": f"Bearer {token}"}
+    finally:
+        db.close()
+
+
+def verificar_pdf(pdf: bytes) -> int:
+    """Comprobar que la tabla xref apunta a cada objeto y devolver la cantidad de páginas"""
+    assert pdf.startswith(b"%PDF-1.4")
+    inicio_xref = int(re.search(rb"startxref\n(\d+)\n%%EOF", pdf).group(1))
+    assert pdf[inicio_xref:].startswith(b"xref")
+
+    filas = pdf[inicio_xref:].split(b"\n")
+    total = int(filas[1].split()[1])
+    for numero in range(1, total):
+        desplazamiento = int(filas[2 + numero].split()[0])
+        assert pdf[desplazamiento:].startswith(f"{numero} 0 obj".encode())
+
+    return int(re.search(rb"/Type /Pages /Kids \[[^\]]*\] /Count (\d+)", pdf).group(1))
+
+
+def test_etiquetas_pdf(headers):
+    """PDF con 15 etiquetas por página, en streaming"""
+    response = client.get("/api/equipos/etiquetas?ubicacion=A", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["X-Total-Etiquetas"] == "17"
+    assert verificar_pdf(response.content) == 2
+    assert response.content.count(b"/Subtype /Image") == 17
+
+
+def test_etiquetas_zip_por_ids(headers):
+    """ZIP con un PNG por equipo, en el orden pedido"""
+    response = client.get("/api/equipos/etiquetas?formato=zip&ids=1,2,18", headers=headers)
+
+    assert response.status_code == 200
+    archivo = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archivo.namelist() == ["00001_QR-0.png", "00002_QR-1.png", "00003_QR-17.png"]
+    assert archivo.read("00001_QR-0.png") == qr_gen.generar_qr("QR-0")
+
+
+def test_etiquetas_filtro_vacio_e_ids_invalidos(headers):
+    """Sin equipos responde 404; ids mal formados 400"""
+    assert client.get("/api/equipos/etiquetas?tipo=Molino", headers=headers).status_code == 404
+    assert client.get("/api/equipos/etiquetas?ids=1,x", headers=headers).status_code == 400
+
+
+def test_png_a_pdf_sin_recodificar():
+    """El flujo de la imagen en el PDF son los datos IDAT del PNG tal cual"""
+    png = qr_gen.generar_qr("QR-0")
+    _, _, _, _, idat = etiquetas._leer_png(png)
+    pdf = b"".join(etiquetas.pdf_etiquetas(["QR-0"]))
+    assert idat in pdf
@@ -0,0 +1,152 @@
+"""
+Tests para los eventos en vivo (SSE y WebSocket)
+"""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.websockets import WebSocketDisconnect
+
+from app.main import app, get_db
+from app.database import Base
+from app.auth import create_access_token
+from app import eventos, models
+
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def setup_teardown():
+    """Setup y teardown para cada test"""
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def datos():
+    """Técnico, un equipo y un tipo de intervención"""
+    db = TestingSessionLocal()
+    try:
+        usuario = models.Usuario(
+            email="tecnico@example.com", nombre="Tecnico", rol="TECNICO", hashed_password="x"
+        )
+        equipo = models.Equipo(codigo_qr="QR-1", nombre="Bomba", ubicacion="A1", tipo="Bomba")
+        tipo = models.TipoIntervencion(nombre="Preventiva")
+        db.add_all([usuario, equipo, tipo])
+        db.commit()
+
+        token = create_access_token({"sub": str(usuario.id), "email": usuario.email, "rol": "TECNICO"})
+        return {"token": token, "headers": {"Authorization": f"Bearer {token}"}}
+    finally:
+        db.close()
+
+
+def evento(tipo: str, entidad_id=None) -> dict:
+    return {"tipo": tipo, "accion": "actualizado", "id": entidad_id}
+
+
+def test_suscripcion_coalesce_y_desborda():
+    """Varios eventos de la misma entidad se entregan como el último; al desbordar se pide resync"""
+    async def escenario():
+        suscripcion = eventos.Suscripcion(asyncio.get_running_loop(), max_pendientes=3)
+        suscripcion.entregar({**evento("intervencion", 1), "accion": "creado"})
+        suscripcion.entregar(evento("equipo", 7))
+        suscripcion.entregar({**evento("intervencion", 1), "accion": "completado"})
+        coalescidos = await suscripcion.esperar()
+
+        for n in range(4):
+            suscripcion.entregar(evento("intervencion", n))
+        desbordados = await suscripcion.esperar()
+
+        vacio = await suscripcion.esperar(timeout=0.01)
+        return coalescidos, desbordados, vacio, suscripcion.coalescidos
+
+    coalescidos, desbordados, vacio, total_coalescidos = asyncio.run(escenario())
+    assert [(e["tipo"], e["accion"]) for e in coalescidos] == [("intervencion", "completado"), ("equipo", "actualizado")]
+    assert total_coalescidos == 1
+    assert desbordados == [eventos.RESYNC]
+    assert vacio == []
+
+
+def test_sse_publicado_desde_otro_hilo():
+    """El flujo SSE recibe lo publicado desde un hilo del threadpool"""
+    async def escenario():
+        flujo = eventos.flujo_sse(frozenset({"equipo"}))
+        assert await flujo.__anext__() == b"retry: 3000\n\n"
+
+        siguiente = asyncio.ensure_future(flujo.__anext__())
+        await asyncio.sleep(0)
+        hilo = threading.Thread(target=lambda: [
+            eventos.broker.publicar(evento("intervencion", 1)),
+            eventos.broker.publicar(evento("equipo", 2)),
+        ])
+        hilo.start()
+        hilo.join()
+        mensaje = await asyncio.wait_for(siguiente, 1)
+        await flujo.aclose()
+        return mensaje
+
+    mensaje = asyncio.run(escenario())
+    assert b"event: equipo\n" in mensaje
+    assert b'"id":2' in mensaje
+    assert b"intervencion" not in mensaje
+    assert not eventos.broker.tiene_suscriptores()
+
+
+def test_websocket_recibe_intervenciones(datos):
+    """Crear y completar una intervención llega por WebSocket junto con la invalidación de estadísticas"""
+    with client.websocket_connect(f"/api/eventos/ws?token={datos['token']}") as websocket:
+        response = client.post("/api/intervenciones", json={
+            "equipo_id": 1, "tipo_id": 1, "descripcion": "Cambio de sello"
+        }, headers=datos["headers"])
+        assert response.status_code == 200
+
+        creada = websocket.receive_json()
+        assert (creada["tipo"], creada["accion"], creada["id"]) == ("intervencion", "creado", 1)
+        assert creada["datos"]["descripcion"] == "Cambio de sello"
+        assert websocket.receive_json()["tipo"] == "estadisticas"
+
+        client.post("/api/intervenciones/1/completar", headers=datos["headers"])
+        completada = websocket.receive_json()
+        assert completada["accion"] == "completado"
+        assert completada["datos"]["completada"] is True
+
+    assert not eventos.broker.tiene_suscriptores()
+
+
+def test_websocket_token_invalido(datos):
+    """Sin token válido la conexión se cierra con 1008"""
+    with pytest.raises(WebSocketDisconnect) as error:
+        with client.websocket_connect("/api/eventos/ws?token=invalido") as websocket:
+            websocket.receive_json()
+    assert error.value.code == 1008
+
+
+def test_sse_tipo_invalido(datos):
+    """Un tipo de evento desconocido responde 400"""
+    response = client.get("/api/eventos?tipos=usuarios", headers=datos["headers"])
+    assert response.status_code == 400
@@ -0,0 +1,118 @@
+"""
+Tests para la exportación en streaming de intervenciones
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app, get_db
+from app.database import Base
+from app.auth import create_access_token
+from app import exportacion, models
+
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def setup_teardown():
+    """Setup y teardown para cada test"""
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def headers():
+    """Técnico, un equipo y 5 intervenciones modificadas el 1 al 5 de marzo"""
+    db = TestingSessionLocal()
+    try:
+        usuario = models.Usuario(
+            email="tecnico@example.com", nombre="Tecnico", rol="TECNICO", hashed_password="x"
+        )
+        equipo = models.Equipo(codigo_qr="QR-1", nombre="Bomba", ubicacion="A1", tipo="Bomba")
+        tipo = models.TipoIntervencion(nombre="Preventiva")
+        db.add_all([usuario, equipo, tipo])
+        db.flush()
+        for dia in range(5, 0, -1):
+            fecha = datetime(2024, 3, dia, 8, 0)
+            db.add(models.Intervencion(
+                equipo_id=equipo.id, usuario_id=usuario.id, tipo_id=tipo.id,
+                descripcion=f"Revisión {dia}", fecha_inicio=fecha, fecha_actualizacion=fecha
+            ))
+        db.commit()
+
+        token = create_access_token({"sub": str(usuario.id), "email": usuario.email, "rol": "TECNICO"})
+        return {"Authorization": f"Bearer {token}"}
+    finally:
+        db.close()
+
+
+def test_exportar_ndjson(headers):
+    """Una línea por intervención con equipo y tipo, ordenadas por fecha de modificación"""
+    response = client.get("/api/intervenciones/exportar", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    filas = [json.loads(linea) for linea in response.text.splitlines()]
+    assert [f["descripcion"] for f in filas] == [f"Revisión {dia}" for dia in range(1, 6)]
+    assert filas[0]["equipo_codigo_qr"] == "QR-1"
+    assert filas[0]["tipo_nombre"] == "Preventiva"
+    assert filas[0]["fecha_actualizacion"] == "2024-03-01T08:00:00"
+    assert list(filas[0]) == exportacion.COLUMNAS
+
+
+def test_exportar_csv_since(headers):
+    """CSV con encabezado; since incluye solo las modificadas desde esa fecha"""
+    response = client.get(
+        "/api/intervenciones/exportar?formato=csv&since=2024-03-04T08:00:00", headers=headers
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    filas = list(csv.DictReader(io.StringIO(response.text)))
+    assert [f["descripcion"] for f in filas] == ["Revisión 4", "Revisión 5"]
+    assert filas[0]["fecha_actualizacion"] == "2024-03-04T08:00:00"
+
+
+def test_exportar_por_bloques(headers, monkeypatch):
+    """Las filas se leen y emiten de a EXPORTACION_LOTE"""
+    monkeypatch.setattr(exportacion, "EXPORTACION_LOTE", 2)
+    db = TestingSessionLocal()
+    try:
+        bloques = list(exportacion.exportar_intervenciones(db, "ndjson"))
+    finally:
+        db.close()
+
+    assert [bloque.count(b"\n") for bloque in bloques] == [2, 2, 1]
+
+
+def test_exportar_formato_invalido(headers):
+    """Un formato desconocido responde 400"""
+    response = client.get("/api/intervenciones/exportar?formato=xml", headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,144 @@
+"""
+Tests para la importación masiva de equipos
+"""
+
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app, get_db
+from app.database import Base
+from app.auth import create_access_token
+from app import importacion, models
+
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def setup_teardown():
+    """Setup y teardown para cada test"""
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def headers():
+    """Técnico con un equipo ya registrado (QR-EXISTE)"""
+    db = TestingSessionLocal()
+    try:
+        usuario = models.Usuario(
+            email="tecnico@example.com", nombre="Tecnico", rol="TECNICO", hashed_password="x"
+        )
+        db.add_all([usuario, models.Equipo(codigo_qr="QR-EXISTE", nombre="Bomba", ubicacion="A1", tipo="Bomba")])
+        db.commit()
+        token = create_access_token({"sub": str(usuario.id), "email": usuario.email, "rol": "TECNICO"})
+        return {"Authorization": f"Bearer {token}"}
+    finally:
+        db.close()
+
+
+def contar_equipos() -> int:
+    db = TestingSessionLocal()
+    try:
+        return db.query(models.Equipo).count()
+    finally:
+        db.close()
+
+
+def test_importar_csv_con_reporte_de_errores(headers):
+    """Las filas válidas se insertan y cada rechazo se informa con su número de fila"""
+    contenido = (
+        "codigo_qr,nombre,ubicacion,tipo,serie\n"
+        "QR-1,Compresor,B2,Compresor,S-1\n"
+        "QR-2,,B2,Molino,\n"
+        "QR-1,Duplicado,B2,Bomba,\n"
+        "QR-EXISTE,Bomba,A1,Bomba,\n"
+        "QR-3,Molino,C1,Molino,\n"
+    )
+    response = client.post(
+        "/api/equipos/importar",
+        files={"archivo": ("equipos.csv", contenido.encode(), "text/csv")},
+        headers=headers
+    )
+
+    assert response.status_code == 200
+    resultado = response.json()
+    assert resultado["total_filas"] == 5
+    assert resultado["insertados"] == 2
+    assert [(e["fila"], e["codigo_qr"]) for e in resultado["errores"]] == [
+        (2, "QR-2"), (3, "QR-1"), (4, "QR-EXISTE")
+    ]
+    assert "nombre" in resultado["errores"][0]["error"]
+    assert contar_equipos() == 3
+
+
+def test_importar_ndjson(headers):
+    """NDJSON: un objeto por línea, JSON inválido se reporta sin cortar la importación"""
+    lineas = [
+        json.dumps({"codigo_qr": "QR-1", "nombre": "Bomba", "ubicacion": "A1", "tipo": "Bomba"}),
+        "",
+        "{no es json",
+        json.dumps({"codigo_qr": "QR-2", "nombre": "Bomba", "ubicacion": "A1", "tipo": "Bomba"}),
+    ]
+    response = client.post(
+        "/api/equipos/importar?formato=ndjson",
+        files={"archivo": ("equipos.txt", "\n".join(lineas).encode(), "text/plain")},
+        headers=headers
+    )
+
+    assert response.status_code == 200
+    resultado = response.json()
+    assert resultado["insertados"] == 2
+    assert resultado["errores"] == [{"fila": 3, "codigo_qr": None, "error": "JSON inválido"}]
+
+
+def test_importar_formato_desconocido(headers):
+    """Sin formato reconocible responde 400"""
+    response = client.post(
+        "/api/equipos/importar",
+        files={"archivo": ("equipos.xlsx", b"...", "application/octet-stream")},
+        headers=headers
+    )
+    assert response.status_code == 400
+
+
+def test_importar_por_lotes(headers):
+    """Con lotes pequeños el resultado es el mismo que con uno solo"""
+    contenido = "codigo_qr,nombre,ubicacion,tipo\n" + "".join(
+        f"QR-{n},Equipo {n},A1,Bomba\n" for n in range(7)
+    )
+    db = TestingSessionLocal()
+    try:
+        resultado = importacion.importar_equipos(
+            db, io.BytesIO(contenido.encode()), "csv", tamano_lote=2
+        )
+    finally:
+        db.close()
+
+    assert resultado.insertados == 7
+    assert resultado.errores == []
+    assert contar_equipos() == 8
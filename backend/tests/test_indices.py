@@ -0,0 +1,91 @@
+"""
+Tests para los índices de intervenciones y sus planes de ejecución
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.migraciones import MIGRACIONES, aplicar_migraciones, metadata_migraciones
+from app import crud, exportacion, models
+
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def setup_teardown():
+    """Setup y teardown para cada test"""
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+    metadata_migraciones.drop_all(bind=engine)
+
+
+def plan_de(operacion) -> str:
+    """Ejecutar una operación de crud y devolver el EXPLAIN QUERY PLAN de su SELECT"""
+    capturadas = []
+
+    def capturar(conn, cursor, statement, parameters, context, executemany):
+        capturadas.append((statement, parameters))
+
+    db = TestingSessionLocal()
+    event.listen(engine, "before_cursor_execute", capturar)
+    try:
+        operacion(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", capturar)
+        db.close()
+
+    statement, parameters = capturadas[-1]
+    with engine.connect() as conn:
+        filas = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+    return "\n".join(fila[-1] for fila in filas)
+
+
+@pytest.mark.parametrize("operacion, indice", [
+    (lambda db: crud.obtener_historial_equipo(db, 1), "ix_intervenciones_equipo_fecha"),
+    (lambda db: crud.obtener_intervenciones_usuario(db, 1), "ix_intervenciones_usuario_fecha"),
+    (lambda db: crud.obtener_todas_intervenciones(db, solo_activas=True), "ix_intervenciones_pendientes"),
+    (lambda db: crud.obtener_todas_intervenciones(db), "ix_intervenciones_fecha"),
+    (lambda db: crud.obtener_historial_equipo(db, 1, cursor=(datetime(2024, 1, 1), 10)),
+     "ix_intervenciones_equipo_fecha"),
+    (lambda db: db.execute(exportacion.consulta_exportacion(datetime(2024, 1, 1))).all(),
+     "ix_intervenciones_actualizacion"),
+    (lambda db: crud.obtener_cambios(db, datetime(2024, 1, 1), datetime(2025, 1, 1), {"equipos": None}),
+     "ix_equipos_actualizacion"),
+    (lambda db: crud.obtener_cambios(
+        db, None, datetime(2025, 1, 1), {"intervenciones": (datetime(2024, 1, 1), 10)}
+    ), "ix_intervenciones_actualizacion"),
+])
+def test_consultas_usan_indice(operacion, indice):
+    """Las consultas de listados usan el índice compuesto sin ordenar en memoria"""
+    plan = plan_de(operacion)
+    assert indice in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_migracion_crea_indices_en_bd_existente():
+    """La migración agrega los índices a una BD creada sin ellos"""
+    # Índices declarados en __table_args__ (ix_intervenciones_id viene de create_all original,
+    # ix_intervenciones_busqueda es solo de PostgreSQL)
+    indices = {i.name for i in models.Intervencion.__table__.indexes} - {
+        "ix_intervenciones_id", "ix_intervenciones_busqueda"
+    }
+    with engine.begin() as conn:
+        for nombre in indices:
+            conn.execute(text(f"DROP INDEX {nombre}"))
+
+    assert aplicar_migraciones(engine) == [migracion_id for migracion_id, _ in MIGRACIONES]
+    assert aplicar_migraciones(engine) == []
+
+    nombres = {i["name"] for i in inspect(engine).get_indexes("intervenciones")}
+    assert indices <= nombres
@@ -0,0 +1,127 @@
+"""
+Tests para el detalle y el listado expandido de intervenciones
+Cuentan las sentencias SQL por endpoint para detectar consultas N+1
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app, get_db
+from app.database import Base
+from app.auth import create_access_token
+from app import models
+
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+# get_current_user consulta el usuario en modo db (AUTH_MODO por defecto)
+CONSULTAS_AUTH = 1
+
+
+@pytest.fixture(autouse=True)
+def setup_teardown():
+    """Setup y teardown para cada test"""
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+def crear_datos(cantidad: int) -> dict:
+    """Usuario y `cantidad` intervenciones, cada una con su propio equipo y tipo"""
+    db = TestingSessionLocal()
+    try:
+        usuario = models.Usuario(
+            email="tecnico@example.com", nombre="Tecnico", rol="TECNICO", hashed_password="x"
+        )
+        db.add(usuario)
+        db.flush()
+
+        ids = []
+        for n in range(cantidad):
+            equipo = models.Equipo(codigo_qr=f"QR-{n}", nombre=f"Bomba {n}", ubicacion="A1", tipo="Bomba")
+            tipo = models.TipoIntervencion(nombre=f"Tipo {n}")
+            db.add_all([equipo, tipo])
+            db.flush()
+            intervencion = models.Intervencion(
+                equipo_id=equipo.id, usuario_id=usuario.id, tipo_id=tipo.id, descripcion="Revisión"
+            )
+            db.add(intervencion)
+            db.flush()
+            ids.append(intervencion.id)
+        db.commit()
+
+        token = create_access_token({"sub": str(usuario.id), "email": usuario.email, "rol": "TECNICO"})
+        return {"ids": ids, "headers": {"Authorization": f"Bearer {token}"}}
+    finally:
+        db.close()
+
+
+def test_detalle_una_consulta(contar_consultas):
+    """El detalle carga equipo, usuario y tipo en una sola consulta"""
+    datos = crear_datos(1)
+
+    with contar_consultas() as consultas:
+        response = client.get(f"/api/intervenciones/{datos['ids'][0]}", headers=datos["headers"])
+
+    assert response.status_code == 200
+    cuerpo = response.json()
+    assert cuerpo["equipo"]["codigo_qr"] == "QR-0"
+    assert cuerpo["usuario"]["email"] == "tecnico@example.com"
+    assert cuerpo["tipo_intervencion"]["nombre"] == "Tipo 0"
+    assert len(consultas) == CONSULTAS_AUTH + 1
+
+
+@pytest.mark.parametrize("cantidad", [1, 8])
+def test_listado_expandido_consultas_constantes(contar_consultas, cantidad):
+    """?expand= trae la página completa sin una consulta por relación e intervención"""
+    datos = crear_datos(cantidad)
+
+    with contar_consultas() as consultas:
+        response = client.get(
+            "/api/intervenciones?limit=20&expand=equipo,usuario,tipo", headers=datos["headers"]
+        )
+
+    assert response.status_code == 200
+    assert len(response.json()) == cantidad
+    assert {i["equipo"]["codigo_qr"] for i in response.json()} == {f"QR-{n}" for n in range(cantidad)}
+    assert len(consultas) == CONSULTAS_AUTH + 1
+
+
+def test_listado_expandido_solo_relaciones_pedidas():
+    """Solo se incluyen las relaciones pedidas; sin expand la respuesta no cambia"""
+    datos = crear_datos(2)
+
+    expandido = client.get("/api/intervenciones?expand=tipo", headers=datos["headers"]).json()
+    assert all(set(i) >= {"tipo_intervencion"} for i in expandido)
+    assert all("equipo" not in i and "usuario" not in i for i in expandido)
+
+    simple = client.get("/api/intervenciones", headers=datos["headers"]).json()
+    assert all("equipo" not in i and "tipo_intervencion" not in i for i in simple)
+
+
+def test_listado_expansion_invalida():
+    """Una relación desconocida en ?expand= responde 400"""
+    datos = crear_datos(1)
+    response = client.get("/api/intervenciones?expand=equipo,fotos", headers=datos["headers"])
+    assert response.status_code == 400
+    assert "fotos" in response.json()["detail"]
@@ -0,0 +1,146 @@
+"""
+Tests para la creación de intervenciones por lote con claves de idempotencia
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app, get_db
+from app.database import Base
+from app.auth import create_access_token
+from app.migraciones import aplicar_migraciones, metadata_migraciones
+from app import models
+
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def setup_teardown():
+    """Setup y teardown para cada test"""
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+    metadata_migraciones.drop_all(bind=engine)
+
+
+@pytest.fixture
+def datos():
+    """Técnico, equipo y tipo de intervención"""
+    db = TestingSessionLocal()
+    try:
+        usuario = models.Usuario(
+            email="tecnico@example.com", nombre="Tecnico", rol="TECNICO", hashed_password="x"
+        )
+        equipo = models.Equipo(codigo_qr="QR-1", nombre="Bomba", ubicacion="A1", tipo="Bomba")
+        tipo = models.TipoIntervencion(nombre="Limpieza")
+        db.add_all([usuario, equipo, tipo])
+        db.commit()
+
+        token = create_access_token({"sub": str(usuario.id), "email": usuario.email, "rol": "TECNICO"})
+        return {
+            "equipo_id": equipo.id,
+            "tipo_id": tipo.id,
+            "headers": {"Authorization": f"Bearer {token}"},
+        }
+    finally:
+        db.close()
+
+
+def intervencion(datos, clave=None, **cambios) -> dict:
+    item = {
+        "equipo_id": datos["equipo_id"],
+        "tipo_id": datos["tipo_id"],
+        "descripcion": "Limpieza de filtros",
+        "clave_idempotencia": clave,
+    }
+    item.update(cambios)
+    return item
+
+
+def contar_intervenciones() -> int:
+    db = TestingSessionLocal()
+    try:
+        return db.query(models.Intervencion).count()
+    finally:
+        db.close()
+
+
+def test_lote_crea_y_reporta_errores(datos, contar_consultas):
+    """Las válidas se crean en una transacción y las referencias inválidas se informan"""
+    lote = [
+        intervencion(datos, "a", fecha_inicio="2024-03-01T08:00:00"),
+        intervencion(datos, "b", equipo_id=999),
+        intervencion(datos, "c", tipo_id=999),
+        intervencion(datos),
+    ] + [intervencion(datos, f"x{n}") for n in range(20)]
+
+    with contar_consultas() as consultas:
+        response = client.post("/api/intervenciones/lote", json=lote, headers=datos["headers"])
+
+    assert response.status_code == 200
+    resultados = response.json()
+    assert [r["estado"] for r in resultados[:4]] == ["creada", "error", "error", "creada"]
+    assert resultados[1]["error"] == "El equipo no existe"
+    assert resultados[2]["error"] == "El tipo de intervención no existe"
+    assert resultados[0]["intervencion"]["fecha_inicio"] == "2024-03-01T08:00:00"
+    assert contar_intervenciones() == 22
+
+    # Usuario + equipos IN + tipos IN + claves IN, sin importar el tamaño del lote.
+    # SQLite no garantiza el orden de RETURNING en un INSERT multi-fila, así que el
+    # flush emite un INSERT por fila (en PostgreSQL van agrupados)
+    consultas = [c for c in consultas if not c.startswith("INSERT INTO intervenciones")]
+    assert len(consultas) == 4
+
+
+def test_lote_reintento_no_duplica(datos):
+    """Reenviar el mismo lote devuelve las intervenciones existentes"""
+    lote = [intervencion(datos, "k1"), intervencion(datos, "k2"), intervencion(datos, "k1")]
+
+    primera = client.post("/api/intervenciones/lote", json=lote, headers=datos["headers"]).json()
+    assert [r["estado"] for r in primera] == ["creada", "creada", "existente"]
+    assert primera[0]["intervencion"]["id"] == primera[2]["intervencion"]["id"]
+
+    segunda = client.post("/api/intervenciones/lote", json=lote, headers=datos["headers"]).json()
+    assert [r["estado"] for r in segunda] == ["existente"] * 3
+    assert [r["intervencion"]["id"] for r in segunda] == [r["intervencion"]["id"] for r in primera]
+    assert contar_intervenciones() == 2
+
+
+def test_lote_vacio(datos):
+    """Un lote vacío responde 400"""
+    response = client.post("/api/intervenciones/lote", json=[], headers=datos["headers"])
+    assert response.status_code == 400
+
+
+def test_migracion_agrega_clave_idempotencia():
+    """La migración agrega la columna y el índice único a una BD existente"""
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ux_intervenciones_usuario_clave"))
+        conn.execute(text("ALTER TABLE intervenciones DROP COLUMN clave_idempotencia"))
+
+    assert "0002_clave_idempotencia_intervenciones" in aplicar_migraciones(engine)
+
+    inspector = inspect(engine)
+    assert "clave_idempotencia" in {c["name"] for c in inspector.get_columns("intervenciones")}
+    assert "ux_intervenciones_usuario_clave" in {i["name"] for i in inspector.get_indexes("intervenciones")}
@@ -0,0 +1,118 @@
+"""
+Tests para la paginación por cursor (keyset)
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app, get_db
+from app.database import Base
+from app.auth import create_access_token
+from app import crud, models, paginacion
+
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def setup_teardown():
+    """Setup y teardown para cada test"""
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def datos():
+    """Usuario, equipo y 7 intervenciones (3 con la misma fecha_inicio)"""
+    db = TestingSessionLocal()
+    try:
+        usuario = models.Usuario(
+            email="tecnico@example.com", nombre="Tecnico", rol="TECNICO", hashed_password="x"
+        )
+        equipo = models.Equipo(codigo_qr="QR-1", nombre="Bomba", ubicacion="A1", tipo="Bomba")
+        tipo = models.TipoIntervencion(nombre="Limpieza")
+        db.add_all([usuario, equipo, tipo])
+        db.flush()
+
+        base = datetime(2024, 1, 1)
+        fechas = [base, base + timedelta(hours=1), base + timedelta(hours=1),
+                  base + timedelta(hours=1), base + timedelta(hours=2),
+                  base + timedelta(hours=3), base + timedelta(hours=4)]
+        for fecha in fechas:
+            db.add(models.Intervencion(
+                equipo_id=equipo.id,
+                usuario_id=usuario.id,
+                tipo_id=tipo.id,
+                descripcion="Revisión",
+                fecha_inicio=fecha
+            ))
+        db.commit()
+
+        token = create_access_token({"sub": str(usuario.id), "email": usuario.email, "rol": "TECNICO"})
+        return {"equipo_id": equipo.id, "headers": {"Authorization": f"Bearer {token}"}}
+    finally:
+        db.close()
+
+
+def test_cursor_recorre_sin_duplicados(datos):
+    """Las páginas por cursor cubren el listado completo en el mismo orden que offset"""
+    db = TestingSessionLocal()
+    try:
+        esperado = [i.id for i in crud.obtener_historial_equipo(db, datos["equipo_id"])]
+
+        recorrido, cursor = [], None
+        while True:
+            pagina = crud.obtener_historial_equipo(db, datos["equipo_id"], limit=2, cursor=cursor)
+            recorrido.extend(i.id for i in pagina)
+            if len(pagina) < 2:
+                break
+            cursor = paginacion.leer_cursor_intervencion(paginacion.cursor_intervencion(pagina[-1]))
+    finally:
+        db.close()
+
+    assert recorrido == esperado
+    assert len(recorrido) == 7
+
+
+def test_api_intervenciones_header_siguiente_cursor(datos):
+    """La API envía X-Next-Cursor y acepta ?cursor= para la página siguiente"""
+    primera = client.get("/api/intervenciones?limit=4", headers=datos["headers"])
+    assert primera.status_code == 200
+    cursor = primera.headers["X-Next-Cursor"]
+
+    segunda = client.get(f"/api/intervenciones?limit=4&cursor={cursor}", headers=datos["headers"])
+    assert segunda.status_code == 200
+    assert "X-Next-Cursor" not in segunda.headers
+
+    ids = [i["id"] for i in primera.json() + segunda.json()]
+    assert len(ids) == len(set(ids)) == 7
+
+
+def test_api_cursor_invalido(datos):
+    """Un cursor mal formado responde 400"""
+    response = client.get("/api/equipos?cursor=no-es-un-cursor", headers=datos["headers"])
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cursor inválido"
@@ -0,0 +1,152 @@
+"""
+Tests para la generación de QR con cache y revalidación por ETag
+"""
+
+import re
+from xml.etree import ElementTree
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app, get_db, negociar_formato_qr
+from app.database import Base
+from app.auth import create_access_token
+from app import crud, models, qr_gen
+
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def setup_teardown():
+    """Setup y teardown para cada test"""
+    Base.metadata.create_all(bind=engine)
+    qr_gen.cache_qr.limpiar()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def datos():
+    """Técnico y un equipo"""
+    db = TestingSessionLocal()
+    try:
+        usuario = models.Usuario(
+            email="tecnico@example.com", nombre="Tecnico", rol="TECNICO", hashed_password="x"
+        )
+        equipo = models.Equipo(codigo_qr="QR-1", nombre="Bomba", ubicacion="A1", tipo="Bomba")
+        db.add_all([usuario, equipo])
+        db.commit()
+
+        token = create_access_token({"sub": str(usuario.id), "email": usuario.email, "rol": "TECNICO"})
+        return {"equipo_id": equipo.id, "headers": {"Authorization": f"Bearer {token}"}}
+    finally:
+        db.close()
+
+
+def test_qr_etag_y_304(datos):
+    """La respuesta trae ETag y Cache-Control; revalidar con If-None-Match da 304 sin cuerpo"""
+    primera = client.get("/api/equipos/qr/QR-1/generar", headers=datos["headers"])
+    assert primera.status_code == 200
+    assert primera.json()["qr_image"] == qr_gen.generar_qr_base64("QR-1")
+    assert primera.headers["Cache-Control"].startswith("private")
+    etag = primera.headers["ETag"]
+
+    revalidada = client.get(
+        "/api/equipos/qr/QR-1/generar",
+        headers={**datos["headers"], "If-None-Match": f"W/{etag}"}
+    )
+    assert revalidada.status_code == 304
+    assert revalidada.content == b""
+    assert revalidada.headers["ETag"] == etag
+
+
+def test_qr_cache_en_memoria(datos):
+    """La segunda petición no vuelve a generar la imagen"""
+    client.get("/api/equipos/qr/QR-1/generar", headers=datos["headers"])
+    aciertos = qr_gen.cache_qr.estadisticas()["aciertos"]
+
+    client.get("/api/equipos/qr/QR-1/generar", headers=datos["headers"])
+    assert qr_gen.cache_qr.estadisticas()["aciertos"] == aciertos + 1
+
+
+def test_qr_cache_en_disco_e_invalidacion(datos, tmp_path, monkeypatch):
+    """El nivel en disco sobrevive a la memoria y se descarta al eliminar el equipo"""
+    monkeypatch.setattr(qr_gen, "QR_CACHE_DIR", str(tmp_path))
+
+    imagen = qr_gen.obtener_qr("QR-1")
+    assert len(list(tmp_path.rglob("*.png"))) == 1
+
+    # Sin memoria, la imagen sale del disco
+    qr_gen.cache_qr.limpiar()
+    monkeypatch.setattr(qr_gen, "generar_qr", lambda *args: pytest.fail("no debería generar"))
+    assert qr_gen.obtener_qr("QR-1") == imagen
+
+    db = TestingSessionLocal()
+    try:
+        crud.eliminar_equipo(db, datos["equipo_id"])
+    finally:
+        db.close()
+
+    assert list(tmp_path.rglob("*.png")) == []
+    assert qr_gen.cache_qr.estadisticas()["entradas"] == 0
+
+
+def test_qr_png_binario(datos):
+    """Accept: image/png devuelve los bytes PNG sin base64"""
+    response = client.get(
+        "/api/equipos/qr/QR-1/generar", headers={**datos["headers"], "Accept": "image/png"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert response.content == qr_gen.generar_qr("QR-1")
+    assert response.headers["Vary"] == "Accept"
+
+
+def test_qr_svg_igual_a_la_matriz(datos):
+    """El SVG dibuja exactamente los módulos oscuros de la matriz QR"""
+    response = client.get("/api/equipos/qr/QR-1/generar?formato=svg", headers=datos["headers"])
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/svg+xml"
+
+    raiz = ElementTree.fromstring(response.content)
+    trazo = raiz.find("{http://www.w3.org/2000/svg}path").get("d")
+    matriz = qr_gen._crear_qr("QR-1", 10).get_matrix()
+    dibujada = [[False] * len(matriz) for _ in matriz]
+    for x, y, largo in re.findall(r"M(\d+) (\d+)h(\d+)", trazo):
+        for columna in range(int(x), int(x) + int(largo)):
+            dibujada[int(y)][columna] = True
+
+    assert dibujada == matriz
+
+
+@pytest.mark.parametrize("accept, formato", [
+    (None, "json"),
+    ("*/*", "json"),
+    ("image/svg+xml", "svg"),
+    ("image/png;q=0.9, image/svg+xml;q=0.5", "png"),
+    ("application/json, image/png;q=0.1", "json"),
+])
+def test_negociar_formato_qr(accept, formato):
+    """Se elige el formato con mayor q; sin preferencia se mantiene el JSON"""
+    assert negociar_formato_qr(accept) == formato
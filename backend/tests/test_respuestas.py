@@ -0,0 +1,40 @@
+"""
+Tests para las respuestas JSON serializadas una sola vez
+"""
+
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+from app import respuestas, schemas
+
+
+def intervencion(n: int) -> SimpleNamespace:
+    """Objeto con los atributos de una intervención, como lo entrega el ORM"""
+    return SimpleNamespace(
+        id=n, equipo_id=1, usuario_id=2, tipo_id=3,
+        descripcion=f"Revisión {n}", observaciones=None, tiempo_duracion=30,
+        completada=False, fecha_inicio=datetime(2024, 3, 1, 8, 0, 0, 123000),
+        fecha_fin=None, fecha_creacion=datetime(2024, 3, 1), fecha_actualizacion=datetime(2024, 3, 1),
+    )
+
+
+def test_json_de_igual_que_response_model():
+    """El cuerpo es el mismo JSON que generaba from_orm + response_model"""
+    items = [intervencion(n) for n in range(3)]
+    response = respuestas.json_de(list[schemas.IntervencionResponse], items, headers={"X-Next-Cursor": "c"})
+
+    esperado = [json.loads(schemas.IntervencionResponse.from_orm(i).model_dump_json()) for i in items]
+    assert json.loads(response.body) == esperado
+    assert response.media_type == "application/json"
+    assert response.headers["X-Next-Cursor"] == "c"
+    assert esperado[0]["fecha_inicio"] == "2024-03-01T08:00:00.123000"
+
+
+def test_json_de_exclude_unset():
+    """Las relaciones no pedidas en ?expand= no aparecen en el JSON"""
+    datos = {campo: getattr(intervencion(1), campo) for campo in schemas.IntervencionResponse.model_fields}
+    response = respuestas.json_de(
+        list[schemas.IntervencionExpandidaResponse], [datos], exclude_unset=True
+    )
+    assert "equipo" not in json.loads(response.body)[0]